@@ -0,0 +1,188 @@
+import hashlib
+import json
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+GLOBAL_VERSION_KEY = 'analytics:version'
+ORGANIZATION_VERSION_KEY = 'analytics:org:{org_id}:version'
+REPORT_KEY = 'analytics:report:{report_name}:{org_id}:{global_version}:{org_version}:{params}'
+HITS_KEY = 'analytics:report_cache:hits'
+MISSES_KEY = 'analytics:report_cache:misses'
+
+
+def get_cache():
+    """Returns the cache backend the analytics reports are stored in."""
+    return caches[settings.ANALYTICS_CACHE_ALIAS]
+
+
+def is_shared_cache() -> bool:
+    """
+    Returns True if the report cache is shared by every process.
+
+    The locmem cache lives in the memory of one process, so versions bumped and
+    reports stored by a worker or a management command never reach the web server.
+    """
+    return not isinstance(get_cache(), LocMemCache)
+
+
+def get_version(key: str) -> int:
+    """
+    Returns the version stored under the given key, initializing it if missing.
+
+    Versions are initialized from the current time rather than from 1, so that
+    a version evicted from the cache never comes back with a value whose reports
+    may still be cached.
+    """
+    cache = get_cache()
+    version = cache.get(key)
+
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+
+    return version
+
+
+def bump_version(key: str) -> None:
+    """Increments the version stored under the given key."""
+    cache = get_cache()
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def get_organization_version(org_id: int) -> int:
+    """Returns the version of the organization's analytics data."""
+    return get_version(ORGANIZATION_VERSION_KEY.format(org_id=org_id))
+
+
+def bump_organization_version(org_id: int) -> None:
+    """Invalidates every cached report of the organization."""
+    bump_version(ORGANIZATION_VERSION_KEY.format(org_id=org_id))
+
+
+def bump_global_version() -> None:
+    """Invalidates every cached report of every organization."""
+    bump_version(GLOBAL_VERSION_KEY)
+
+
+def invalidate_organization_reports(org_id: int) -> None:
+    """
+    Invalidates the organization's cached reports right away and once again
+    when the current transaction is committed, so that a report computed
+    by a concurrent request before the commit is not served afterwards.
+    """
+    bump_organization_version(org_id)
+    transaction.on_commit(lambda: bump_organization_version(org_id))
+
+
+def invalidate_all_reports() -> None:
+    """Invalidates the cached reports of every organization, see invalidate_organization_reports."""
+    bump_global_version()
+    transaction.on_commit(bump_global_version)
+
+
+def get_report_cache_key(report_name: str, org_id: int, params: dict[str, Any]) -> str:
+    """Returns the cache key of the report for the current versions of the organization's data."""
+    serialized_params = json.dumps(params, sort_keys=True, default=str)
+    return REPORT_KEY.format(
+        report_name=report_name,
+        org_id=org_id,
+        global_version=get_version(GLOBAL_VERSION_KEY),
+        org_version=get_organization_version(org_id),
+        params=hashlib.md5(serialized_params.encode()).hexdigest(),
+    )
+
+
+def get_report_etag(report_name: str, org_id: int, params: dict[str, Any]) -> str:
+    """Returns a tag of the report data that changes whenever its cache key changes."""
+    key = get_report_cache_key(report_name, org_id, params)
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def increment_counter(key: str) -> None:
+    """Increments the counter stored under the given key."""
+    cache = get_cache()
+
+    try:
+        cache.incr(key)
+    except ValueError:
+        if not cache.add(key, 1, timeout=None):
+            cache.incr(key)
+
+
+def get_cached_report(
+    report_name: str,
+    org_id: int,
+    params: dict[str, Any]
+) -> tuple[str, Optional[dict[str, Any]]]:
+    """Returns the cache key of the report and its cached data, None on cache miss."""
+    key = get_report_cache_key(report_name, org_id, params)
+    report_data = get_cache().get(key)
+    increment_counter(MISSES_KEY if report_data is None else HITS_KEY)
+    return key, report_data
+
+
+def get_report(
+    report_name: str,
+    org_id: int,
+    params: dict[str, Any],
+    compute: Callable[[], dict[str, Any]]
+) -> dict[str, Any]:
+    """Returns the cached report data if present, computes and caches it otherwise."""
+    key, report_data = get_cached_report(report_name, org_id, params)
+
+    if report_data is None:
+        report_data = compute()
+        get_cache().set(key, report_data, timeout=settings.ANALYTICS_CACHE_TIMEOUT)
+
+    return report_data
+
+
+async def aget_report(
+    report_name: str,
+    org_id: int,
+    params: dict[str, Any],
+    compute: Callable[[], Awaitable[dict[str, Any]]]
+) -> dict[str, Any]:
+    """Async version of get_report, computing the report data with the given coroutine function."""
+    key, report_data = await sync_to_async(get_cached_report)(report_name, org_id, params)
+
+    if report_data is None:
+        report_data = await compute()
+        await get_cache().aset(key, report_data, timeout=settings.ANALYTICS_CACHE_TIMEOUT)
+
+    return report_data
+
+
+def set_report(
+    report_name: str,
+    org_id: int,
+    params: dict[str, Any],
+    report_data: dict[str, Any]
+) -> None:
+    """Stores the report data computed ahead of time, so that views get a cache hit."""
+    key = get_report_cache_key(report_name, org_id, params)
+    get_cache().set(key, report_data, timeout=settings.ANALYTICS_CACHE_TIMEOUT)
+
+
+def get_report_cache_stats() -> dict[str, int]:
+    """Returns the number of report cache hits and misses."""
+    counters = get_cache().get_many([HITS_KEY, MISSES_KEY])
+    return {
+        'hits': counters.get(HITS_KEY, 0),
+        'misses': counters.get(MISSES_KEY, 0),
+    }
+
+
+def reset_report_cache_stats() -> None:
+    """Resets the report cache hit and miss counters."""
+    get_cache().delete_many([HITS_KEY, MISSES_KEY])
@@ -0,0 +1,221 @@
+import csv
+import logging
+import os
+import tempfile
+import uuid
+from datetime import timedelta
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from openpyxl import Workbook
+
+from jobs.models import Job
+
+logger = logging.getLogger(__name__)
+
+CSV_CONTENT_TYPE = 'text/csv; charset=utf-8'
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+EXPORTS_ROOT = 'exports'
+EXPORTS_DIRECTORY = EXPORTS_ROOT + '/{org_id}/{token}'
+PENDING_MARKER = 'pending'
+FAILED_MARKER = 'failed'
+MARKERS = (PENDING_MARKER, FAILED_MARKER)
+
+
+class Echo:
+    """An object implementing just the write method of the file-like interface."""
+
+    def write(self, value: str) -> str:
+        """Returns the value instead of storing it in a buffer."""
+        return value
+
+
+def iter_csv(header: Sequence, rows: Iterable[Sequence]) -> Iterator[str]:
+    """Yields the header and the rows as CSV lines, one at a time."""
+    writer = csv.writer(Echo())
+    # Byte order mark lets spreadsheet applications detect the encoding.
+    yield '\ufeff'
+    yield writer.writerow(header)
+
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def get_csv_response(
+    filename: str,
+    header: Sequence,
+    rows: Iterable[Sequence]
+) -> StreamingHttpResponse:
+    """Returns a response streaming the rows as a CSV file while they are produced."""
+    response = StreamingHttpResponse(iter_csv(header, rows), content_type=CSV_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def write_xlsx(file, header: Sequence, rows: Iterable[Sequence]) -> None:
+    """
+    Writes the header and the rows to the file as an XLSX workbook.
+
+    The workbook is created in write-only mode, which streams rows to disk
+    instead of keeping them in memory.
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(list(header))
+
+    for row in rows:
+        worksheet.append(list(row))
+
+    workbook.save(file)
+
+
+def get_export_directory(org_id: int, token: uuid.UUID) -> str:
+    """Returns the storage directory of the export."""
+    return EXPORTS_DIRECTORY.format(org_id=org_id, token=token)
+
+
+def generate_xlsx_export(
+    directory: str,
+    filename: str,
+    header: Sequence,
+    get_rows: Callable[[], Iterable[Sequence]]
+) -> None:
+    """Writes the XLSX export to the storage and removes its pending marker."""
+    try:
+        with tempfile.TemporaryFile() as file:
+            write_xlsx(file, header, get_rows())
+            file.seek(0)
+            default_storage.save(os.path.join(directory, filename), File(file))
+    except Exception:
+        logger.exception('Failed to generate %s', os.path.join(directory, filename))
+        default_storage.save(os.path.join(directory, FAILED_MARKER), ContentFile(b''))
+    finally:
+        default_storage.delete(os.path.join(directory, PENDING_MARKER))
+
+
+def start_xlsx_export(
+    report_name: str,
+    org_id: int,
+    filename: str,
+    params: dict[str, Any]
+) -> uuid.UUID:
+    """
+    Queues a job generating the XLSX export of the report, see the
+    'generate_report_export' task, and returns the token of the export.
+
+    Args:
+        report_name: The report_name of the export view.
+        org_id: The id of the organization.
+        filename: The name of the exported file.
+        params: The report parameters as JSON-serializable values.
+    """
+    # The tasks module imports the views, which import this one.
+    from .tasks import generate_report_export
+
+    token = uuid.uuid4()
+    directory = get_export_directory(org_id, token)
+
+    # The job is only claimed once committed, after its marker is saved.
+    with transaction.atomic():
+        job = generate_report_export.enqueue(
+            report_name=report_name,
+            org_id=org_id,
+            token=str(token),
+            filename=filename,
+            params=params,
+        )
+        marker = ContentFile(str(job.id).encode())
+        default_storage.save(os.path.join(directory, PENDING_MARKER), marker)
+
+    return token
+
+
+def is_expired(path: str) -> bool:
+    """Returns whether the file is older than ANALYTICS_EXPORT_MAX_AGE seconds."""
+    max_age = timedelta(seconds=settings.ANALYTICS_EXPORT_MAX_AGE)
+    return default_storage.get_modified_time(path) < timezone.now() - max_age
+
+
+def is_abandoned(directory: str) -> bool:
+    """
+    Returns whether the job of the pending export is no longer queued or running
+    although the export's pending marker is left, as its worker died.
+    """
+    with default_storage.open(os.path.join(directory, PENDING_MARKER)) as marker:
+        content = marker.read().strip()
+
+    return not content.isdigit() or not Job.objects.filter(
+        id=int(content),
+        status__in=[Job.QUEUED, Job.RUNNING],
+    ).exists()
+
+
+def get_export_status(org_id: int, token: uuid.UUID) -> tuple[Optional[str], Optional[str]]:
+    """
+    Returns the status of the export: 'pending', 'failed' or 'done' and,
+    for finished exports, the storage path of the file. The status is None
+    for unknown and expired exports. Abandoned exports are marked as failed.
+    """
+    directory = get_export_directory(org_id, token)
+
+    try:
+        _, filenames = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return None, None
+
+    if any(is_expired(os.path.join(directory, filename)) for filename in filenames):
+        return None, None
+
+    # The file is saved before the pending marker is removed.
+    exported = [filename for filename in filenames if filename not in MARKERS]
+
+    if exported:
+        return 'done', os.path.join(directory, exported[0])
+
+    if PENDING_MARKER in filenames:
+        if not is_abandoned(directory):
+            return 'pending', None
+
+        default_storage.save(os.path.join(directory, FAILED_MARKER), ContentFile(b''))
+        default_storage.delete(os.path.join(directory, PENDING_MARKER))
+        return 'failed', None
+
+    if FAILED_MARKER in filenames:
+        return 'failed', None
+
+    return None, None
+
+
+def delete_expired_exports() -> int:
+    """
+    Deletes the files and markers of the exports older than ANALYTICS_EXPORT_MAX_AGE
+    seconds and returns the number of deleted exports.
+    """
+    if not default_storage.exists(EXPORTS_ROOT):
+        return 0
+
+    deleted_count = 0
+
+    for org_directory in default_storage.listdir(EXPORTS_ROOT)[0]:
+        org_path = os.path.join(EXPORTS_ROOT, org_directory)
+
+        for token in default_storage.listdir(org_path)[0]:
+            directory = os.path.join(org_path, token)
+            paths = [
+                os.path.join(directory, filename)
+                for filename in default_storage.listdir(directory)[1]
+            ]
+
+            if paths and all(is_expired(path) for path in paths):
+                for path in paths:
+                    default_storage.delete(path)
+
+                deleted_count += 1
+
+    return deleted_count
@@ -1,7 +1,14 @@
 from django import forms
 from bootstrap_datepicker_plus.widgets import DatePickerInput
 
+GRANULARITY_CHOICES = (
+    ('day', 'По дням'),
+    ('week', 'По неделям'),
+    ('month', 'По месяцам'),
+)
+
 
 class DateRangeForm(forms.Form):
     start_date = forms.DateField(widget=DatePickerInput())
     end_date = forms.DateField(widget=DatePickerInput(range_from="start_date"))
+    granularity = forms.ChoiceField(choices=GRANULARITY_CHOICES, required=False)
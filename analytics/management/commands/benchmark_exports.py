@@ -0,0 +1,83 @@
+import os
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from leads.models import Lead
+from organizations.models import Organization
+from analytics import exports
+from analytics.views import GeneralReportExport, ManagerReportExport, PeriodReportExport
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the time and peak memory of exporting the reports of an organization '
+        'as CSV and XLSX. Use the seed_leads command to create an organization to measure.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_id', type=int, help='Id of the organization to export.')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Number of days, ending today, the period report is exported for.',
+        )
+
+    def get_exports(self, days):
+        """Returns the export views with the parameters of the measured reports."""
+        today = timezone.localdate()
+        period_params = {
+            'start_date': today - timedelta(days=days - 1),
+            'end_date': today,
+            'granularity': 'day',
+        }
+        return [
+            ('general', GeneralReportExport(), {'today': today}),
+            ('manager', ManagerReportExport(), {}),
+            ('period', PeriodReportExport(), period_params),
+        ]
+
+    def write_file(self, export_format, header, rows):
+        """Writes the export to the null device, the way the responses consume it."""
+        with open(os.devnull, 'w' if export_format == 'csv' else 'wb') as file:
+            if export_format == 'csv':
+                for line in exports.iter_csv(header, rows):
+                    file.write(line)
+            else:
+                exports.write_xlsx(file, header, rows)
+
+    def measure(self, view, organization, params, export_format):
+        """Returns the time in seconds and the peak of allocated memory in bytes of an export."""
+        tracemalloc.start()
+        started_at = time.perf_counter()
+        self.write_file(
+            export_format,
+            view.get_export_header(),
+            view.get_export_rows(organization, **params),
+        )
+        elapsed = time.perf_counter() - started_at
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return elapsed, peak
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options['org_id'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Organization with id {options["org_id"]} does not exist')
+
+        lead_count = Lead.objects.filter(organization=organization).count()
+        self.stdout.write(f'Organization {organization} with {lead_count} leads')
+        self.stdout.write(f'{"Report":<10} {"Format":<6} {"Time":>10} {"Peak memory":>12}')
+
+        for report_name, view, params in self.get_exports(options['days']):
+            for export_format in view.export_formats:
+                elapsed, peak = self.measure(view, organization, params, export_format)
+                self.stdout.write(
+                    f'{report_name:<10} {export_format:<6} '
+                    f'{elapsed * 1000:>8.1f}ms {peak / 1024:>10.1f}KB'
+                )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from analytics.exports import delete_expired_exports
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes the XLSX report exports generated in the background more than '
+        'ANALYTICS_EXPORT_MAX_AGE seconds ago. Meant to be run periodically, e.g. by cron.'
+    )
+
+    def handle(self, *args, **options):
+        deleted_count = delete_expired_exports()
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted_count} exports'))
@@ -0,0 +1,135 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils.dateparse import parse_date
+
+from organizations.models import Organization
+from analytics import cache as report_cache
+from analytics.models import LeadDailyRollup
+from analytics.views import GeneralReport, ManagerReport, PeriodReport
+
+REPORT_VIEWS = (GeneralReport, ManagerReport, PeriodReport)
+
+
+def init_worker() -> None:
+    """Sets up Django in a worker process, which opens its own database connection."""
+    django.setup()
+
+
+def precompute_organization_reports(org_id: int) -> tuple[int, dict[str, float]]:
+    """
+    Computes the reports of the organization opened without request parameters
+    and stores them in the report cache.
+
+    Returns:
+        tuple: The organization id and the time spent on each report in seconds.
+    """
+    organization = Organization.objects.get(id=org_id)
+    timings = dict()
+
+    for report_view in REPORT_VIEWS:
+        started_at = time.perf_counter()
+        view = report_view()
+        params = view.get_default_report_params()
+        report_data = view.get_report_data(organization, **params)
+        report_cache.set_report(view.report_name, org_id, params, report_data)
+        timings[view.report_name] = time.perf_counter() - started_at
+
+    return org_id, timings
+
+
+class Command(BaseCommand):
+    help = (
+        'Computes the general, manager and last 30 days period reports of organizations '
+        'and stores them in the report cache, so that the first visit of a dashboard is warm. '
+        'Requires a cache shared by every process, such as redis.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--org',
+            type=int,
+            action='append',
+            dest='org_ids',
+            help='Id of the organization to precompute the reports of. Can be repeated.',
+        )
+        parser.add_argument(
+            '--since',
+            help='Only organizations with leads created on or after this date (YYYY-MM-DD).',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=os.cpu_count(),
+            help='Number of worker processes. 1 computes the reports in the current process.',
+        )
+
+    def get_organizations(self, org_ids, since):
+        """Returns the ids and names of the organizations matching the filters."""
+        organizations = Organization.objects.order_by('id')
+
+        if org_ids:
+            organizations = organizations.filter(id__in=org_ids)
+
+        if since:
+            since_date = parse_date(since)
+
+            if since_date is None:
+                raise CommandError(f'Invalid --since date: {since}')
+
+            active_organizations = LeadDailyRollup.objects.filter(
+                day__gte=since_date,
+                lead_count__gt=0,
+            ).values('organization')
+            organizations = organizations.filter(id__in=active_organizations)
+
+        return dict(organizations.values_list('id', 'name'))
+
+    def compute(self, org_ids, workers):
+        """Yields the results of precompute_organization_reports for every organization."""
+        if workers <= 1:
+            for org_id in org_ids:
+                yield precompute_organization_reports(org_id)
+            return
+
+        # Worker processes must not share the connection of the current process.
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as executor:
+            futures = [
+                executor.submit(precompute_organization_reports, org_id)
+                for org_id in org_ids
+            ]
+
+            for future in as_completed(futures):
+                yield future.result()
+
+    def handle(self, *args, **options):
+        if not report_cache.is_shared_cache():
+            raise CommandError(
+                'The report cache is process-local, so reports computed by this command '
+                'would not be visible to the web server. Set CACHE_BACKEND=redis.'
+            )
+
+        organizations = self.get_organizations(options['org_ids'], options['since'])
+        started_at = time.perf_counter()
+        report_names = [report_view.report_name for report_view in REPORT_VIEWS]
+        self.stdout.write(' '.join(
+            [f'{"Organization":<40}'] + [f'{name:>10}' for name in report_names + ['total']]
+        ))
+
+        for org_id, timings in self.compute(list(organizations), options['workers']):
+            self.stdout.write(' '.join(
+                [f'{org_id:>6} {organizations[org_id][:33]:<33}']
+                + [f'{timings[name] * 1000:>8.1f}ms' for name in report_names]
+                + [f'{sum(timings.values()) * 1000:>8.1f}ms']
+            ))
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f'Precomputed reports of {len(organizations)} organizations in {elapsed:.2f}s'
+        ))
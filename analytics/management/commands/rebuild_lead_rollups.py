@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from leads.models import Lead
+from organizations.models import Organization
+from analytics.models import LeadDailyRollup
+from analytics.rollups import rebuild_rollups
+from analytics.cache import invalidate_all_reports
+
+
+class Command(BaseCommand):
+    help = 'Rebuilds the daily lead rollups used by analytics reports from the Lead table.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--org',
+            type=int,
+            help='Id of the organization to rebuild the rollups of. All organizations by default.',
+        )
+
+    def handle(self, *args, **options):
+        leads = Lead.objects.all()
+        rollups = LeadDailyRollup.objects.all()
+        org_id = options['org']
+
+        if org_id is not None:
+            try:
+                organization = Organization.objects.get(id=org_id)
+            except Organization.DoesNotExist:
+                raise CommandError(f'Organization with id {org_id} does not exist')
+
+            leads = leads.filter(organization=organization)
+            rollups = rollups.filter(organization=organization)
+
+        created_count = rebuild_rollups(leads, rollups)
+        invalidate_all_reports()
+        self.stdout.write(self.style.SUCCESS(f'Created {created_count} rollup rows'))
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from analytics.cache import get_report_cache_stats, is_shared_cache, reset_report_cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Shows the number of analytics report cache hits and misses. '
+        'Requires a cache shared by every process, such as redis.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after showing them.',
+        )
+
+    def handle(self, *args, **options):
+        if not is_shared_cache():
+            raise CommandError(
+                'The report cache is process-local, so the counters of the web server '
+                'are not visible to this command. Set CACHE_BACKEND=redis.'
+            )
+
+        stats = get_report_cache_stats()
+        requests_count = stats['hits'] + stats['misses']
+        hit_ratio = stats['hits'] / requests_count * 100 if requests_count else 0
+        self.stdout.write(
+            f"Hits: {stats['hits']}, misses: {stats['misses']}, hit ratio: {hit_ratio:.1f}%"
+        )
+
+        if options['reset']:
+            reset_report_cache_stats()
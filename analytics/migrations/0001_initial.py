@@ -0,0 +1,65 @@
+# Generated by Django 4.2.2 on 2026-10-18 19:45
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Sum
+
+
+def populate_lead_rollups(apps, schema_editor):
+    Lead = apps.get_model('leads', 'Lead')
+    LeadDailyRollup = apps.get_model('analytics', 'LeadDailyRollup')
+    rows = Lead.objects.values(
+        'organization',
+        'date_created',
+        'status__group',
+        'manager',
+    ).annotate(lead_count=Count('id'), price_sum=Sum('price')).order_by()
+    LeadDailyRollup.objects.bulk_create(
+        (
+            LeadDailyRollup(
+                organization=row['organization'],
+                day=row['date_created'],
+                status_group=row['status__group'] or '',
+                manager_id=row['manager'],
+                lead_count=row['lead_count'],
+                price_sum=row['price_sum'] or 0,
+            )
+            for row in rows.iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('leads', '0008_alter_lead_organization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeadDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('organization', models.CharField(max_length=100)),
+                ('day', models.DateField()),
+                ('status_group', models.CharField(blank=True, default='', max_length=25)),
+                ('lead_count', models.IntegerField(default=0)),
+                ('price_sum', models.BigIntegerField(default=0)),
+                ('manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='lead_rollups', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='leaddailyrollup',
+            constraint=models.UniqueConstraint(fields=('organization', 'day', 'status_group', 'manager'), name='unique_lead_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='leaddailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('manager__isnull', True)), fields=('organization', 'day', 'status_group'), name='unique_lead_rollup_without_manager'),
+        ),
+        migrations.RunPython(populate_lead_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,66 @@
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+import django.db.models.deletion
+
+
+def populate_lead_rollups(apps, schema_editor):
+    Lead = apps.get_model('leads', 'Lead')
+    LeadDailyRollup = apps.get_model('analytics', 'LeadDailyRollup')
+    rows = Lead.objects.filter(organization__isnull=False).values(
+        'organization',
+        'date_created',
+        'status__group',
+        'manager',
+    ).annotate(lead_count=Count('id'), price_sum=Sum('price')).order_by()
+    LeadDailyRollup.objects.bulk_create(
+        (
+            LeadDailyRollup(
+                organization_id=row['organization'],
+                day=row['date_created'],
+                status_group=row['status__group'] or '',
+                manager_id=row['manager'],
+                lead_count=row['lead_count'],
+                price_sum=row['price_sum'] or 0,
+            )
+            for row in rows.iterator(chunk_size=1000)
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('organizations', '0002_alter_membership_role'),
+        ('leads', '0009_lead_organization_foreign_key'),
+        ('analytics', '0001_initial'),
+    ]
+
+    operations = [
+        # Rollups were keyed by organization name, the table is recreated
+        # and populated from the leads' organizations.
+        migrations.DeleteModel(
+            name='LeadDailyRollup',
+        ),
+        migrations.CreateModel(
+            name='LeadDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('status_group', models.CharField(blank=True, default='', max_length=25)),
+                ('lead_count', models.IntegerField(default=0)),
+                ('price_sum', models.BigIntegerField(default=0)),
+                ('manager', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='lead_rollups', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lead_rollups', to='organizations.organization')),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(fields=('organization', 'day', 'status_group', 'manager'), name='unique_lead_rollup'),
+                    models.UniqueConstraint(condition=models.Q(('manager__isnull', True)), fields=('organization', 'day', 'status_group'), name='unique_lead_rollup_without_manager'),
+                ],
+            },
+        ),
+        migrations.RunPython(populate_lead_rollups, migrations.RunPython.noop),
+    ]
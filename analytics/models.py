@@ -1,3 +1,46 @@
 from django.db import models
+from django.contrib.auth import get_user_model
 
-# Create your models here.
+from organizations.models import Organization
+
+User = get_user_model()
+
+
+class LeadDailyRollup(models.Model):
+    """
+    Number and total price of the leads created on a specific day,
+    grouped by organization, status group and manager.
+
+    Rows are maintained incrementally on every Lead write and can be rebuilt
+    from scratch with the 'rebuild_lead_rollups' management command.
+    """
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE,
+                                     related_name='lead_rollups')
+    day = models.DateField()
+    status_group = models.CharField(max_length=25, blank=True, default='')
+    manager = models.ForeignKey(User, blank=True, null=True, on_delete=models.CASCADE,
+                                related_name='lead_rollups')
+    lead_count = models.IntegerField(default=0)
+    price_sum = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['organization', 'day', 'status_group', 'manager'],
+                name='unique_lead_rollup',
+            ),
+            models.UniqueConstraint(
+                fields=['organization', 'day', 'status_group'],
+                condition=models.Q(manager__isnull=True),
+                name='unique_lead_rollup_without_manager',
+            ),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns a human-readable string representation of the LeadDailyRollup Model object.
+
+        Returns:
+            str: Containing the organization, day and status group.
+        """
+        return f'{self.organization} {self.day} {self.status_group}'
@@ -0,0 +1,150 @@
+from collections import defaultdict
+from datetime import date
+from itertools import islice
+from typing import Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import Coalesce
+from django.db.models.query import QuerySet
+
+from leads.models import Lead, Status
+from leads.registry import status_registry
+from .models import LeadDailyRollup
+
+RollupKey = tuple[Optional[int], date, str, Optional[int]]
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def get_lead_rollup_key(lead: Lead) -> RollupKey:
+    """Returns the key of the LeadDailyRollup row the given lead is counted in."""
+    status_group = status_registry.get_group(lead.status_id)
+    return lead.organization_id, lead.date_created, status_group, lead.manager_id
+
+
+def new_changes() -> defaultdict:
+    """Returns an empty mapping of rollup keys to [lead count, price sum] deltas."""
+    return defaultdict(lambda: [0, 0])
+
+
+def collect_change(changes: defaultdict, key: RollupKey, lead_count: int, price_sum: int) -> None:
+    """Adds the lead count and price sum deltas of the given rollup key to the changes."""
+    changes[key][0] += lead_count
+    changes[key][1] += price_sum
+
+
+def apply_changes(changes: defaultdict) -> None:
+    """
+    Applies the collected deltas to LeadDailyRollup rows, creating missing rows.
+
+    Keys are applied in a fixed order so that concurrent writers lock the rows
+    in the same order. Leads without organization are not counted in any row.
+    """
+    for key in sorted(changes, key=lambda key: (key[0] or 0, *key[1:3], key[3] or 0)):
+        lead_count, price_sum = changes[key]
+        organization_id, day, status_group, manager_id = key
+
+        if organization_id is None or (not lead_count and not price_sum):
+            continue
+
+        rollups = LeadDailyRollup.objects.filter(
+            organization_id=organization_id,
+            day=day,
+            status_group=status_group,
+            manager_id=manager_id,
+        )
+        increment = {
+            'lead_count': F('lead_count') + lead_count,
+            'price_sum': F('price_sum') + price_sum,
+        }
+
+        # A missing row is only created for added leads. Removed leads have
+        # no row left when it's deleted along with the organization.
+        if rollups.update(**increment) or lead_count <= 0:
+            continue
+
+        try:
+            with transaction.atomic():
+                LeadDailyRollup.objects.create(
+                    organization_id=organization_id,
+                    day=day,
+                    status_group=status_group,
+                    manager_id=manager_id,
+                    lead_count=lead_count,
+                    price_sum=price_sum,
+                )
+        except IntegrityError:
+            # The row was created by a concurrent writer in the meantime.
+            rollups.update(**increment)
+
+
+def move_status_rollups(status: Status, old_group: str, new_group: str) -> None:
+    """Moves the figures of the leads with the given status from one status group to another."""
+    rows = Lead.objects.filter(status=status).values(
+        'organization',
+        'date_created',
+        'manager',
+    ).annotate(
+        lead_count=Count('id'),
+        price_sum=Coalesce(Sum('price'), 0),
+    ).order_by()
+    changes = new_changes()
+
+    for row in rows:
+        for status_group, sign in ((old_group, -1), (new_group, 1)):
+            key = (row['organization'], row['date_created'], status_group, row['manager'])
+            collect_change(changes, key, sign * row['lead_count'], sign * row['price_sum'])
+
+    apply_changes(changes)
+
+
+def move_manager_rollups(manager_id: int) -> None:
+    """
+    Moves the figures of the given manager to the rows without manager,
+    as the manager's leads lose their manager when the user is deleted.
+    """
+    changes = new_changes()
+
+    for rollup in LeadDailyRollup.objects.filter(manager_id=manager_id):
+        key = (rollup.organization_id, rollup.day, rollup.status_group, None)
+        collect_change(changes, key, rollup.lead_count, rollup.price_sum)
+
+    apply_changes(changes)
+
+
+def rebuild_rollups(leads: QuerySet[Lead], rollups: QuerySet[LeadDailyRollup]) -> int:
+    """
+    Replaces the given rollups with ones aggregated from the given leads
+    and returns the number of created rows.
+    """
+    rows = leads.filter(organization__isnull=False).values(
+        'organization',
+        'date_created',
+        'status__group',
+        'manager',
+    ).annotate(
+        lead_count=Count('id'),
+        price_sum=Coalesce(Sum('price'), 0),
+    ).order_by()
+    new_rollups = (
+        LeadDailyRollup(
+            organization_id=row['organization'],
+            day=row['date_created'],
+            status_group=row['status__group'] or '',
+            manager_id=row['manager'],
+            lead_count=row['lead_count'],
+            price_sum=row['price_sum'],
+        )
+        for row in rows.iterator(chunk_size=REBUILD_BATCH_SIZE)
+    )
+    created_count = 0
+
+    with transaction.atomic():
+        rollups.delete()
+
+        while batch := list(islice(new_rollups, REBUILD_BATCH_SIZE)):
+            LeadDailyRollup.objects.bulk_create(batch)
+            created_count += len(batch)
+
+    return created_count
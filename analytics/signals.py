@@ -0,0 +1,120 @@
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete
+from django.dispatch import receiver
+from django.contrib.auth import get_user_model
+
+from leads.models import Lead, Status
+from leads.registry import status_registry
+from organizations.models import Membership
+from .cache import invalidate_all_reports, invalidate_organization_reports
+from .rollups import (
+    apply_changes,
+    collect_change,
+    get_lead_rollup_key,
+    move_manager_rollups,
+    move_status_rollups,
+    new_changes,
+)
+
+User = get_user_model()
+
+
+@receiver(pre_save, sender=Lead)
+def remember_lead_rollup_key(sender, instance: Lead, raw: bool = False, **kwargs) -> None:
+    """Remembers the rollup key and price the lead had before it's updated."""
+    instance._previous_rollup = None
+
+    if raw or instance.pk is None:
+        return
+
+    previous = Lead.objects.filter(pk=instance.pk).values_list(
+        'organization',
+        'date_created',
+        'status',
+        'manager',
+        'price',
+    ).first()
+
+    if previous:
+        organization, day, status_id, manager_id, price = previous
+        status_group = status_registry.get_group(status_id)
+        instance._previous_rollup = ((organization, day, status_group, manager_id), price)
+
+
+@receiver(post_save, sender=Lead)
+def update_rollups_on_lead_save(sender, instance: Lead, raw: bool = False, **kwargs) -> None:
+    """Moves the lead's figures from its previous rollup row to the current one."""
+    if raw:
+        return
+
+    changes = new_changes()
+    previous = getattr(instance, '_previous_rollup', None)
+
+    if previous:
+        previous_key, previous_price = previous
+        collect_change(changes, previous_key, -1, -previous_price)
+
+    collect_change(changes, get_lead_rollup_key(instance), 1, int(instance.price))
+    apply_changes(changes)
+
+
+@receiver(post_delete, sender=Lead)
+def update_rollups_on_lead_delete(sender, instance: Lead, **kwargs) -> None:
+    """Subtracts the deleted lead's figures from its rollup row."""
+    changes = new_changes()
+    collect_change(changes, get_lead_rollup_key(instance), -1, -int(instance.price))
+    apply_changes(changes)
+
+
+@receiver(pre_save, sender=Status)
+def remember_status_group(sender, instance: Status, raw: bool = False, **kwargs) -> None:
+    """Remembers the group the status had before it's updated."""
+    instance._previous_group = None
+
+    if not raw and instance.pk is not None:
+        instance._previous_group = Status.objects.filter(pk=instance.pk).values_list(
+            'group',
+            flat=True,
+        ).first()
+
+
+@receiver(post_save, sender=Status)
+def update_rollups_on_status_group_change(sender, instance: Status, **kwargs) -> None:
+    """Moves the figures of the status's leads to its new status group."""
+    previous_group = getattr(instance, '_previous_group', None)
+
+    if previous_group is not None and previous_group != instance.group:
+        move_status_rollups(instance, previous_group, instance.group)
+
+
+@receiver(pre_delete, sender=Status)
+def update_rollups_on_status_delete(sender, instance: Status, **kwargs) -> None:
+    """Moves the figures of the status's leads to the rows without status group."""
+    move_status_rollups(instance, instance.group, '')
+
+
+@receiver(pre_delete, sender=User)
+def update_rollups_on_manager_delete(sender, instance, **kwargs) -> None:
+    """Moves the figures of the deleted user's leads to the rows without manager."""
+    move_manager_rollups(instance.pk)
+
+
+@receiver(post_save, sender=Lead)
+@receiver(post_delete, sender=Lead)
+def invalidate_reports_on_lead_change(sender, instance: Lead, **kwargs) -> None:
+    """Invalidates the cached reports of the lead's organization."""
+    if instance.organization_id is not None:
+        invalidate_organization_reports(instance.organization_id)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_reports_on_membership_change(sender, instance: Membership, **kwargs) -> None:
+    """Invalidates the cached reports of the organization, as they list its members."""
+    invalidate_organization_reports(instance.organization_id)
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+def invalidate_reports_on_status_change(sender, instance: Status, **kwargs) -> None:
+    """Invalidates the cached reports of every organization, as statuses are shared."""
+    invalidate_all_reports()
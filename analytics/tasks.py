@@ -0,0 +1,32 @@
+import uuid
+from typing import Any
+
+from jobs.tasks import task
+from organizations.models import Organization
+from . import exports
+from .views import GeneralReportExport, ManagerReportExport, PeriodReportExport
+
+EXPORT_VIEWS = {
+    view.report_name: view
+    for view in (GeneralReportExport, ManagerReportExport, PeriodReportExport)
+}
+
+
+@task()
+def generate_report_export(
+    report_name: str,
+    org_id: int,
+    token: str,
+    filename: str,
+    params: dict[str, Any],
+) -> None:
+    """Generates an XLSX export started by ReportExportMixin, see generate_xlsx_export."""
+    view = EXPORT_VIEWS[report_name]()
+    organization = Organization.objects.get(id=org_id)
+    params = view.load_export_params(params)
+    exports.generate_xlsx_export(
+        exports.get_export_directory(org_id, uuid.UUID(token)),
+        filename,
+        view.get_export_header(),
+        lambda: view.get_export_rows(organization, **params),
+    )
@@ -1,3 +1,583 @@
-from django.test import TestCase
+import csv
+import tempfile
+from datetime import date
+from io import BytesIO, StringIO
 
-# Create your tests here.
+from openpyxl import load_workbook
+
+from asgiref.sync import sync_to_async
+
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+from jobs.models import Job
+from jobs.worker import Worker
+from leads.models import Lead, Status
+from organizations.models import Organization, Membership
+from .models import LeadDailyRollup
+from .cache import get_report_cache_stats
+
+User = get_user_model()
+
+# Management commands refuse to work with the process-local default cache.
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': tempfile.mkdtemp(),
+    },
+}
+
+
+class ReportTestCase(TestCase):
+    """Clears the cache so that reports cached by other tests are not served."""
+
+    def setUp(self):
+        cache.clear()
+
+
+class GeneralReportTest(ReportTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='AnalyticsUser')
+        cls.organization = Organization.objects.create(name='AnalyticsOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        new_status = Status.objects.create(name='New lead', group='New')
+        done_status = Status.objects.create(name='Closed', group='Done')
+
+        for price, status in ((100, new_status), (200, done_status), (300, done_status)):
+            Lead.objects.create(
+                first_name='Test',
+                last_name='Lead',
+                order='Test order',
+                price=price,
+                status=status,
+                comment='',
+                organization=cls.organization,
+            )
+
+        Lead.objects.create(
+            first_name='Other',
+            last_name='Lead',
+            order='Other order',
+            price=1000,
+            status=done_status,
+            comment='',
+            # Organizations with the same name don't share leads.
+            organization=Organization.objects.create(name=cls.organization.name),
+        )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('organizations:analytics:general_report', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def test_general_stats(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['leads_created_today_count'], 3)
+        self.assertEqual(response.context['leads_created_this_month_count'], 3)
+        self.assertEqual(response.context['leads_created_this_month_price'], 600)
+        self.assertEqual(response.context['leads_created_this_month_and_done_price'], 500)
+
+    def test_leads_by_statuses(self):
+        response = self.client.get(self.url)
+        leads_by_statuses = response.context['leads_by_statuses']
+        self.assertEqual(list(leads_by_statuses), ['Новый', 'В работе', 'Оплачен', 'Выполнен'])
+        self.assertEqual(leads_by_statuses['Новый'], {'count': 1, 'price': 100})
+        self.assertEqual(leads_by_statuses['В работе'], {'count': 0, 'price': 0})
+        self.assertEqual(leads_by_statuses['Выполнен'], {'count': 2, 'price': 500})
+
+
+class ManagerReportTest(ReportTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='ReportOwner')
+        cls.organization = Organization.objects.create(name='ManagersOrg')
+        Membership.objects.create(user=cls.owner, organization=cls.organization, role='owner')
+        cls.done_status = Status.objects.create(name='Closed', group='Done')
+        cls.reject_status = Status.objects.create(name='Lost', group='Rejected')
+        cls.create_manager_with_leads('Manager0')
+
+    @classmethod
+    def create_manager_with_leads(cls, username):
+        manager = User.objects.create(username=username)
+        Membership.objects.create(user=manager, organization=cls.organization)
+
+        for price, status in ((100, cls.done_status), (200, cls.done_status),
+                              (300, cls.reject_status), (400, None)):
+            Lead.objects.create(
+                first_name='Test',
+                last_name='Lead',
+                order='Test order',
+                price=price,
+                status=status,
+                comment='',
+                manager=manager,
+                organization=cls.organization,
+            )
+
+        return manager
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.owner)
+        self.url = reverse('organizations:analytics:manager_report', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def test_manager_stats(self):
+        response = self.client.get(self.url)
+        managers_stats = response.context['managers_stats']
+        self.assertEqual(managers_stats['ReportOwner']['leads_count'], 0)
+        self.assertEqual(managers_stats['Manager0']['sales_sum'], 300)
+        self.assertEqual(managers_stats['Manager0']['leads_count'], 4)
+        self.assertEqual(managers_stats['Manager0']['leads_rejected_count'], 25)
+
+    def test_manager_stats_query_count_does_not_depend_on_managers_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+        queries_count = len(queries)
+
+        for i in range(1, 20):
+            self.create_manager_with_leads(f'Manager{i}')
+
+        cache.clear()
+        with self.assertNumQueries(queries_count):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.context['managers_stats']), 21)
+
+
+class PeriodReportTest(ReportTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='PeriodUser')
+        cls.organization = Organization.objects.create(name='PeriodOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        other_organization = Organization.objects.create(name='OtherOrg')
+
+        for day, price, organization in ((date(2023, 7, 3), 100, cls.organization),
+                                         (date(2023, 7, 5), 200, cls.organization),
+                                         (date(2023, 7, 17), 300, cls.organization),
+                                         (date(2023, 7, 17), 1000, other_organization)):
+            lead = Lead.objects.create(
+                first_name='Test',
+                last_name='Lead',
+                order='Test order',
+                price=price,
+                comment='',
+                organization=organization,
+            )
+            Lead.objects.filter(pk=lead.pk).update(date_created=day)
+
+        # Queryset updates bypass the incremental rollup maintenance.
+        call_command('rebuild_lead_rollups', stdout=StringIO())
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('organizations:analytics:period_report', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def get_leads_by_date(self, granularity):
+        response = self.client.get(self.url, {
+            'start_date': '2023-07-01',
+            'end_date': '2023-07-20',
+            'granularity': granularity,
+        })
+        return response.context['leads_by_date']
+
+    def test_daily_buckets(self):
+        leads_by_date = self.get_leads_by_date('day')
+        self.assertEqual(len(leads_by_date), 20)
+        self.assertEqual(list(leads_by_date)[0], '2023-07-20')
+        self.assertEqual(leads_by_date['2023-07-17'], {'count': 1, 'price': 300})
+        self.assertEqual(leads_by_date['2023-07-04'], {'count': 0, 'price': 0})
+
+    def test_weekly_buckets(self):
+        leads_by_date = self.get_leads_by_date('week')
+        self.assertEqual(list(leads_by_date), ['2023-W29', '2023-W28', '2023-W27', '2023-W26'])
+        self.assertEqual(leads_by_date['2023-W27'], {'count': 2, 'price': 300})
+        self.assertEqual(leads_by_date['2023-W28'], {'count': 0, 'price': 0})
+
+    def test_monthly_buckets(self):
+        leads_by_date = self.get_leads_by_date('month')
+        self.assertEqual(leads_by_date, {'2023-07': {'count': 3, 'price': 600}})
+
+    def test_first_day_of_calendar(self):
+        for granularity in ('day', 'week', 'month'):
+            response = self.client.get(self.url, {
+                'start_date': '0001-01-01',
+                'end_date': '0001-01-10',
+                'granularity': granularity,
+            })
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context['leads_by_date'])
+
+    def test_invalid_range(self):
+        for start_date, end_date in (('2023-07-01', 'today'),
+                                     ('2023-07-20', '2023-07-01'),
+                                     ('0001-01-01', '9999-12-31'),
+                                     ('2023-07-01', '')):
+            response = self.client.get(self.url, {'start_date': start_date, 'end_date': end_date})
+            self.assertEqual(response.status_code, 400)
+
+    @override_settings(ANALYTICS_PERIOD_MAX_DAYS=20)
+    def test_max_range(self):
+        response = self.client.get(self.url, {'start_date': '2023-07-01', 'end_date': '2023-07-20'})
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(self.url, {'start_date': '2023-07-01', 'end_date': '2023-07-21'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_query_count_does_not_depend_on_range(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'start_date': '2023-07-01', 'end_date': '2023-07-02'})
+
+        cache.clear()
+        with self.assertNumQueries(len(queries)):
+            self.client.get(self.url, {'start_date': '2020-01-01', 'end_date': '2023-07-31'})
+
+
+class LeadDailyRollupTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.manager = User.objects.create(username='RollupManager')
+        cls.organization = Organization.objects.create(name='RollupOrg')
+        cls.new_status = Status.objects.create(name='New lead', group='New')
+        cls.done_status = Status.objects.create(name='Closed', group='Done')
+
+    def create_lead(self, price, status=None, manager=None):
+        return Lead.objects.create(
+            first_name='Test',
+            last_name='Lead',
+            order='Test order',
+            price=price,
+            status=status,
+            comment='',
+            manager=manager,
+            organization=self.organization,
+        )
+
+    def get_rollups(self):
+        return set(LeadDailyRollup.objects.filter(lead_count__gt=0).values_list(
+            'status_group',
+            'manager',
+            'lead_count',
+            'price_sum',
+        ))
+
+    def assert_rollups_match_rebuild(self):
+        rollups = self.get_rollups()
+        call_command('rebuild_lead_rollups', stdout=StringIO())
+        self.assertEqual(rollups, self.get_rollups())
+
+    def test_lead_create(self):
+        self.create_lead(100, self.new_status, self.manager)
+        self.create_lead(200, self.new_status, self.manager)
+        self.create_lead(300)
+        self.assertEqual(self.get_rollups(), {
+            ('New', self.manager.pk, 2, 300),
+            ('', None, 1, 300),
+        })
+        self.assert_rollups_match_rebuild()
+
+    def test_lead_update(self):
+        lead = self.create_lead(100, self.new_status, self.manager)
+        lead.status = self.done_status
+        lead.price = 500
+        lead.save()
+        self.assertEqual(self.get_rollups(), {('Done', self.manager.pk, 1, 500)})
+        self.assert_rollups_match_rebuild()
+
+    def test_lead_delete(self):
+        lead = self.create_lead(100, self.new_status)
+        self.create_lead(200, self.new_status)
+        lead.delete()
+        self.assertEqual(self.get_rollups(), {('New', None, 1, 200)})
+        self.assert_rollups_match_rebuild()
+
+    def test_status_group_change_and_delete(self):
+        self.create_lead(100, self.new_status)
+        self.new_status.group = 'Paid'
+        self.new_status.save()
+        self.assertEqual(self.get_rollups(), {('Paid', None, 1, 100)})
+        self.new_status.delete()
+        self.assertEqual(self.get_rollups(), {('', None, 1, 100)})
+        self.assert_rollups_match_rebuild()
+
+    def test_manager_delete(self):
+        manager = User.objects.create(username='LeavingManager')
+        self.create_lead(100, self.new_status, manager)
+        self.create_lead(200, self.new_status)
+        manager.delete()
+        self.assertEqual(self.get_rollups(), {('New', None, 2, 300)})
+        self.assert_rollups_match_rebuild()
+
+    def test_organization_rename(self):
+        self.create_lead(100, self.new_status)
+        self.organization.name = 'RenamedOrg'
+        self.organization.save()
+        self.assertEqual(self.get_rollups(), {('New', None, 1, 100)})
+        self.assert_rollups_match_rebuild()
+
+    def test_organization_delete(self):
+        self.create_lead(100, self.new_status, self.manager)
+        self.organization.delete()
+        self.assertFalse(Lead.objects.exists())
+        self.assertFalse(LeadDailyRollup.objects.exists())
+
+
+class ReportCacheTest(ReportTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='CacheUser')
+        cls.organization = Organization.objects.create(name='CacheOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.url = reverse('organizations:analytics:general_report', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def create_lead(self):
+        return Lead.objects.create(
+            first_name='Test',
+            last_name='Lead',
+            order='Test order',
+            price=100,
+            comment='',
+            organization=self.organization,
+        )
+
+    def test_report_is_served_from_cache(self):
+        self.create_lead()
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url)
+
+        # Neither the two report queries nor the organization context query are made.
+        with self.assertNumQueries(len(queries) - 3):
+            response = self.client.get(self.url)
+        self.assertEqual(response.context['leads_created_this_month_count'], 1)
+        self.assertEqual(get_report_cache_stats(), {'hits': 1, 'misses': 1})
+
+    def test_lead_write_invalidates_cached_report(self):
+        lead = self.create_lead()
+        self.client.get(self.url)
+
+        self.create_lead()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['leads_created_this_month_count'], 2)
+
+        lead.delete()
+        response = self.client.get(self.url)
+        self.assertEqual(response.context['leads_created_this_month_count'], 1)
+        self.assertEqual(get_report_cache_stats(), {'hits': 0, 'misses': 3})
+
+    def test_stats_command_requires_shared_cache(self):
+        with self.assertRaises(CommandError):
+            call_command('report_cache_stats', stdout=StringIO())
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_stats_command(self):
+        cache.clear()
+        self.client.get(self.url)
+        self.client.get(self.url)
+        out = StringIO()
+        call_command('report_cache_stats', reset=True, stdout=out)
+        self.assertIn('Hits: 1, misses: 1, hit ratio: 50.0%', out.getvalue())
+        self.assertEqual(get_report_cache_stats(), {'hits': 0, 'misses': 0})
+
+
+class AsyncReportTest(ReportTestCase):
+    """Serves the reports the way ASGI does, so that no query is made in the event loop."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='AsyncUser')
+        cls.organization = Organization.objects.create(name='AsyncOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        Lead.objects.create(
+            first_name='Test',
+            last_name='Lead',
+            order='Test order',
+            price=100,
+            status=Status.objects.create(name='New lead', group='New'),
+            comment='',
+            manager=cls.user,
+            organization=cls.organization,
+        )
+
+    async def get_report(self, report):
+        url = reverse(f'organizations:analytics:{report}', kwargs={
+            'org_id': self.organization.id,
+        })
+        response = await self.async_client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    async def test_reports_are_computed_then_served_from_cache(self):
+        # force_login saves the session, so it can't be called in the event loop.
+        await sync_to_async(self.async_client.force_login)(self.user)
+
+        for _ in range(2):
+            context = await self.get_report('general_report')
+            self.assertEqual(context['leads_created_this_month_count'], 1)
+            self.assertEqual(context['leads_by_statuses']['Новый'], {'count': 1, 'price': 100})
+
+            context = await self.get_report('manager_report')
+            self.assertEqual(context['managers_stats']['AsyncUser']['leads_count'], 1)
+
+            context = await self.get_report('period_report')
+            self.assertEqual(list(context['leads_by_date'].values())[0], {'count': 1, 'price': 100})
+
+        stats = await sync_to_async(get_report_cache_stats)()
+        self.assertEqual(stats, {'hits': 3, 'misses': 3})
+
+
+class PrecomputeReportsTest(ReportTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='PrecomputeUser')
+        cls.organization = Organization.objects.create(name='PrecomputeOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_requires_shared_cache(self):
+        with self.assertRaises(CommandError):
+            call_command('precompute_reports', workers=1, stdout=StringIO())
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_precomputed_reports_are_served_from_cache(self):
+        cache.clear()
+        out = StringIO()
+        call_command('precompute_reports', org_ids=[self.organization.id], workers=1, stdout=out)
+        self.assertIn('Precomputed reports of 1 organizations', out.getvalue())
+
+        for report in ('general_report', 'manager_report', 'period_report'):
+            url = reverse(f'organizations:analytics:{report}', kwargs={
+                'org_id': self.organization.id,
+            })
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.assertEqual(get_report_cache_stats(), {'hits': 3, 'misses': 0})
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ReportExportTest(ReportTestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='ExportUser', first_name='Export', last_name='User')
+        cls.organization = Organization.objects.create(name='ExportOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        done_status = Status.objects.create(name='Closed', group='Done')
+
+        for price in (100, 200):
+            Lead.objects.create(
+                first_name='Test',
+                last_name='Lead',
+                order='Test order',
+                price=price,
+                status=done_status,
+                comment='',
+                manager=cls.user,
+                organization=cls.organization,
+            )
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def get_export_url(self, report, export_format):
+        return reverse(f'organizations:analytics:{report}_export', kwargs={
+            'org_id': self.organization.id,
+            'export_format': export_format,
+        })
+
+    def read_csv(self, response):
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        content = b''.join(response.streaming_content).decode('utf-8-sig')
+        return list(csv.reader(StringIO(content)))
+
+    def test_general_report_csv(self):
+        response = self.client.get(self.get_export_url('general_report', 'csv'))
+        rows = self.read_csv(response)
+        self.assertEqual(rows[0], ['Показатель', 'Значение'])
+        self.assertIn(['Подтвержденная выручка', '300'], rows)
+
+    def test_manager_report_csv(self):
+        response = self.client.get(self.get_export_url('manager_report', 'csv'))
+        rows = self.read_csv(response)
+        self.assertEqual(rows[1], ['Export User ()', '300', '2', '0.0'])
+
+    def test_period_report_csv(self):
+        today = timezone.localdate()
+        url = self.get_export_url('period_report', 'csv')
+        response = self.client.get(url, {'start_date': today, 'end_date': today})
+        rows = self.read_csv(response)
+        self.assertEqual(rows, [['Дата', 'Кол-во заявок', 'На сумму'], [str(today), '2', '300']])
+
+    def test_period_report_xlsx(self):
+        response = self.client.get(self.get_export_url('period_report', 'xlsx'))
+        worksheet = load_workbook(BytesIO(response.content)).active
+        self.assertEqual(worksheet.max_row, 32)
+        self.assertEqual(worksheet['B2'].value, 2)
+
+    def test_unknown_export_format(self):
+        response = self.client.get(self.get_export_url('period_report', 'pdf'))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ANALYTICS_EXPORT_BACKGROUND_DAYS=0)
+    def test_large_period_report_xlsx_is_generated_in_background(self):
+        response = self.client.get(self.get_export_url('period_report', 'xlsx'))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self.client.get(response.url).status_code, 202)
+
+        Worker(['default']).run_once()
+
+        response = self.client.get(response.url)
+        self.assertEqual(response.status_code, 200)
+        worksheet = load_workbook(BytesIO(b''.join(response.streaming_content))).active
+        self.assertEqual(worksheet.max_row, 32)
+        self.assertEqual(worksheet['B2'].value, 2)
+
+    @override_settings(ANALYTICS_EXPORT_BACKGROUND_DAYS=0)
+    def test_abandoned_export_failed(self):
+        response = self.client.get(self.get_export_url('period_report', 'xlsx'))
+        Job.objects.update(status=Job.DEAD)
+
+        self.assertEqual(self.client.get(response.url).status_code, 500)
+        self.assertEqual(self.client.get(response.url).status_code, 500)
+
+    @override_settings(ANALYTICS_EXPORT_BACKGROUND_DAYS=0, MEDIA_ROOT=tempfile.mkdtemp())
+    def test_expired_export_deleted(self):
+        response = self.client.get(self.get_export_url('period_report', 'xlsx'))
+        Worker(['default']).run_once()
+        call_command('delete_expired_exports', stdout=StringIO())
+        self.assertEqual(self.client.get(response.url).status_code, 200)
+
+        with override_settings(ANALYTICS_EXPORT_MAX_AGE=-1):
+            self.assertEqual(self.client.get(response.url).status_code, 404)
+            stdout = StringIO()
+            call_command('delete_expired_exports', stdout=stdout)
+
+        self.assertIn('Deleted 1 exports', stdout.getvalue())
+        self.assertEqual(self.client.get(response.url).status_code, 404)
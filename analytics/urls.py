@@ -8,4 +8,11 @@ urlpatterns = [
     path('', views.GeneralReport.as_view(), name='general_report'),
     path('managers/', views.ManagerReport.as_view(), name='manager_report'),
     path('period/', views.PeriodReport.as_view(), name='period_report'),
+    path('export/<str:export_format>/', views.GeneralReportExport.as_view(),
+         name='general_report_export'),
+    path('managers/export/<str:export_format>/', views.ManagerReportExport.as_view(),
+         name='manager_report_export'),
+    path('period/export/<str:export_format>/', views.PeriodReportExport.as_view(),
+         name='period_report_export'),
+    path('exports/<uuid:token>/', views.ReportExportView.as_view(), name='report_export'),
 ]
@@ -1,26 +1,37 @@
-from typing import Any, Dict
-from datetime import timedelta
-
-from django.shortcuts import get_object_or_404
+import os
+from io import BytesIO
+from typing import Any, Iterable, Iterator, Sequence
+from datetime import date, timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import BadRequest
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpRequest, HttpResponse
+from django.shortcuts import get_object_or_404, redirect
 from django.views.generic import TemplateView
 from django.utils import timezone
 from django.utils.dateparse import parse_date
 from django.contrib.auth import get_user_model
+from django.db.models import DateField, Q, Sum
+from django.db.models.functions import Coalesce, Trunc
 from django.db.models.query import QuerySet
 
 from leads.models import Lead, Status
 from organizations.models import Organization, Membership
 from leads.views import VerifyMembershipMixin
-from .forms import DateRangeForm
+from organizations.context import get_organization_context
+from .forms import DateRangeForm, GRANULARITY_CHOICES
+from .models import LeadDailyRollup
+from . import cache as report_cache
+from . import exports
 
 User = get_user_model()
 
-now = timezone.now()
-yesterday = now - timedelta(days=1)
-year = now.year
-month = now.month
 status_groups = Status.GROUP_CHOICES
 
+ITERATOR_CHUNK_SIZE = 2000
+
 
 class OrganizationMixin:
     """Provides various methods to retrieve data from Organization model."""
@@ -30,7 +41,17 @@ class OrganizationMixin:
         return self.kwargs.get('org_id')
 
     def get_organization(self, org_id: int) -> Organization:
-        """Returns the Organization model object if exists, else raises a 404 eror."""
+        """
+        Returns the Organization model object if exists, else raises a 404 eror.
+
+        The organization of the current route is taken from the organization
+        context of the request, which is loaded once per request.
+        """
+        request = getattr(self, 'request', None)
+
+        if request is not None and str(org_id) == str(self.get_organization_id()):
+            return get_organization_context(request, org_id).organization
+
         organization = get_object_or_404(Organization, id=org_id)
         return organization
 
@@ -41,25 +62,24 @@ class OrganizationMixin:
 
     def get_organization_members(self, memberships: QuerySet[Membership]) -> QuerySet[User]:
         "Returns User model objects, related to the specific organization."
-        members = User.objects.filter(membership__in=memberships)
+        members = User.objects.filter(id__in=memberships.values('user'))
         return members
 
 
 class StatusMixin:
     """Provides methods to retrieve data from Status model."""
 
-    def get_done_statuses(self) -> QuerySet[Status]:
-        """Returns queryset of Status model objects related to 'Done' status group."""
+    def get_done_status_group(self) -> str:
+        """Returns the private name of 'Done' status group."""
         # 1st slice corresponds to status group
         # and 2nd slice to group names where 0 is private name and 1 is public name.
-        done_statuses = Status.objects.filter(group=status_groups[3][0])
-        return done_statuses
+        done_status_group = status_groups[3][0]
+        return done_status_group
 
-    def get_reject_statuses(self) -> QuerySet[Status]:
-        """Returns queryset of Status model objects related to 'Reject' status group."""
+    def get_reject_status_group(self) -> str:
+        """Returns the private name of 'Rejected' status group."""
         reject_status_group = status_groups[4][0]
-        reject_statuses = Status.objects.filter(group=reject_status_group)
-        return reject_statuses
+        return reject_status_group
 
     def get_status_group_names(self) -> list[str]:
         """
@@ -72,95 +92,471 @@ class StatusMixin:
 
 
 class LeadMixin:
-    """Provides various methods to retrieve data from Status model."""
+    """
+    Provides various methods to retrieve data about Lead model objects.
 
-    def get_leads_created_today(self, organization: Organization) -> QuerySet[Lead]:
-        """
-        Return queryset of Lead model objects which were created today
-        and belong to specific organization.
-        """
-        leads_created_today = Lead.objects.filter(
-            organization=organization,
-            date_created__gt=yesterday
-        )
-        return leads_created_today
-
-    def get_leads_created_this_month(self, organization: Organization) -> QuerySet[Lead]:
-        """
-        Returns queryset of Lead model objects which were created in this month
-        and belong to specific organization.
-        """
-        leads_created_this_month = Lead.objects.filter(
-            organization=organization,
-            date_created__year=year,
-            date_created__month=month
-        )
-        return leads_created_this_month
+    The figures are read from LeadDailyRollup rows, so their cost depends
+    on the number of days and managers rather than on the number of leads.
+    """
 
     def get_all_leads(self, organization: Organization) -> QuerySet[Lead]:
         """Returns queryset of Lead model objects that belong to specific organization."""
         leads = Lead.objects.filter(organization=organization)
         return leads
 
-    def get_leads_price(self, leads: QuerySet[Lead]) -> int:
-        """Returns the sum of prices of Lead model objects in given queryset."""
-        leads_price = sum(lead.price for lead in leads)
-        return leads_price
-
-    def get_leads_by_statuses(self, status_group_names: list[str]) -> QuerySet[Lead]:
+    def get_organization_rollups(self, organization: Organization) -> QuerySet[LeadDailyRollup]:
+        """Returns queryset of LeadDailyRollup model objects related to specific organization."""
+        rollups = LeadDailyRollup.objects.filter(organization=organization)
+        return rollups
+
+    def get_general_stats_query(
+        self,
+        organization: Organization,
+        done_status_group: str,
+        today: date
+    ) -> tuple[QuerySet[LeadDailyRollup], dict[str, Any]]:
+        """Returns the rollups of the current month and the aggregates of get_general_stats."""
+        month_start = today.replace(day=1)
+        rollups = self.get_organization_rollups(organization).filter(day__gte=month_start)
+        aggregates = {
+            'leads_created_today_count': Coalesce(Sum('lead_count', filter=Q(day=today)), 0),
+            'leads_created_this_month_count': Coalesce(Sum('lead_count'), 0),
+            'leads_created_this_month_price': Coalesce(Sum('price_sum'), 0),
+            'leads_created_this_month_and_done_price': Coalesce(
+                Sum('price_sum', filter=Q(status_group=done_status_group)),
+                0
+            ),
+        }
+        return rollups, aggregates
+
+    def get_general_stats(
+        self,
+        organization: Organization,
+        done_status_group: str,
+        today: date
+    ) -> dict[str, int]:
         """
-        Returns dict with Public status group names as keys and queryset
-        of Lead model objects that belongs to specific organization and
-        specific status group as values.
-        """
-        leads_by_statuses = dict()
+        Returns the key figures of the current month for specific organization:
+        the number of leads created today and this month, their total price and
+        the price of the ones in 'Done' status group.
 
-        for i, status_group_name in enumerate(status_group_names):
-            statuses = Status.objects.filter(group=status_group_name)
-            leads = Lead.objects.filter(status__in=statuses)
-            leads_by_statuses[f'{status_groups[i][1]}'] = leads
+        All figures are computed by a single aggregate query on the database side.
+        """
+        rollups, aggregates = self.get_general_stats_query(organization, done_status_group, today)
+        general_stats = rollups.aggregate(**aggregates)
+        return general_stats
+
+    async def aget_general_stats(
+        self,
+        organization: Organization,
+        done_status_group: str,
+        today: date
+    ) -> dict[str, int]:
+        """Async version of get_general_stats."""
+        rollups, aggregates = self.get_general_stats_query(organization, done_status_group, today)
+        return await rollups.aaggregate(**aggregates)
+
+    def get_status_group_rows(
+        self,
+        organization: Organization,
+        status_group_names: list[str]
+    ) -> QuerySet[LeadDailyRollup]:
+        """Returns the number and the total price of the organization's leads by status group."""
+        rows = self.get_organization_rollups(organization).filter(
+            status_group__in=status_group_names,
+        ).values('status_group').annotate(
+            count=Coalesce(Sum('lead_count'), 0),
+            price=Coalesce(Sum('price_sum'), 0),
+        ).order_by()
+        return rows
+
+    def build_leads_by_statuses(
+        self,
+        rows: Iterable[dict[str, Any]],
+        status_group_names: list[str]
+    ) -> dict[str, dict[str, int]]:
+        """Returns the rows of get_status_group_rows by public status group name."""
+        public_group_names = dict(status_groups)
+        leads_by_statuses = {
+            public_group_names[status_group_name]: {'count': 0, 'price': 0}
+            for status_group_name in status_group_names
+        }
+
+        for row in rows:
+            leads_by_statuses[public_group_names[row['status_group']]] = {
+                'count': row['count'],
+                'price': row['price'],
+            }
 
         return leads_by_statuses
 
-    def get_manager_stats(self, managers, done_statuses, reject_statuses, leads) -> dict[str: any]:
+    def get_leads_by_statuses(
+        self,
+        organization: Organization,
+        status_group_names: list[str]
+    ) -> dict[str, dict[str, int]]:
+        """
+        Returns dict with public status group names as keys and the number
+        and the total price of the organization's leads of that status group as values.
+        """
+        rows = self.get_status_group_rows(organization, status_group_names)
+        return self.build_leads_by_statuses(rows, status_group_names)
+
+    async def aget_leads_by_statuses(
+        self,
+        organization: Organization,
+        status_group_names: list[str]
+    ) -> dict[str, dict[str, int]]:
+        """Async version of get_leads_by_statuses."""
+        rows = self.get_status_group_rows(organization, status_group_names)
+        return self.build_leads_by_statuses([row async for row in rows], status_group_names)
+
+    def get_manager_stats(
+        self,
+        organization: Organization,
+        managers: QuerySet[User],
+        done_status_group: str,
+        reject_status_group: str
+    ) -> dict[str, dict[str, Any]]:
         """
         Returns dictionary with User model objects string representations as keys
         and data related to manager performance as values.
         """
-        managers_stats = dict()
-
-        for manager in managers:
-            manager_name = f'{manager.first_name} {manager.last_name} ({manager.email})'
-            manager_leads = leads.filter(manager=manager)
-            manager_sales_sum = sum(
-                lead.price for lead in manager_leads.filter(status__in=done_statuses)
-                )
-            manager_leads_count = len(manager_leads)
-            manager_leads_rejected_count = len(manager_leads.filter(status__in=reject_statuses))
-            manager_leads_rejected_percentage = round(
-                manager_leads_rejected_count / manager_leads_count,
-                2
-                ) * 100 if manager_leads_count else 0
-
-            managers_stats[f'{manager}'] = {
-                'name': manager_name,
-                'sales_sum': manager_sales_sum,
-                'leads_count': manager_leads_count,
-                'leads_rejected_count': manager_leads_rejected_percentage
-            }
-
+        managers_stats = dict(self.iter_manager_stats(
+            organization,
+            managers,
+            done_status_group,
+            reject_status_group
+        ))
         return managers_stats
 
+    async def aget_manager_stats(
+        self,
+        organization: Organization,
+        managers: QuerySet[User],
+        done_status_group: str,
+        reject_status_group: str
+    ) -> dict[str, dict[str, Any]]:
+        """Async version of get_manager_stats."""
+        managers = self.get_managers_with_stats(
+            organization,
+            managers,
+            done_status_group,
+            reject_status_group
+        )
+        return dict([
+            self.get_manager_stats_item(manager)
+            async for manager in managers.aiterator(chunk_size=ITERATOR_CHUNK_SIZE)
+        ])
+
+    def iter_manager_stats(
+        self,
+        organization: Organization,
+        managers: QuerySet[User],
+        done_status_group: str,
+        reject_status_group: str
+    ) -> Iterator[tuple[str, dict[str, Any]]]:
+        """
+        Yields User model objects string representations and data related
+        to manager performance as the database cursor produces them.
+        """
+        managers = self.get_managers_with_stats(
+            organization,
+            managers,
+            done_status_group,
+            reject_status_group
+        )
+
+        for manager in managers.iterator(chunk_size=ITERATOR_CHUNK_SIZE):
+            yield self.get_manager_stats_item(manager)
+
+    def get_managers_with_stats(
+        self,
+        organization: Organization,
+        managers: QuerySet[User],
+        done_status_group: str,
+        reject_status_group: str
+    ) -> QuerySet[User]:
+        """
+        Returns the managers annotated with their sales sum, number of leads
+        and number of rejected leads in the organization.
+
+        The figures of all managers are computed by a single query grouped by manager,
+        so the number of queries doesn't depend on the size of the organization.
+        """
+        organization_rollups = Q(lead_rollups__organization=organization)
+        managers = managers.annotate(
+            sales_sum=Coalesce(
+                Sum(
+                    'lead_rollups__price_sum',
+                    filter=organization_rollups & Q(lead_rollups__status_group=done_status_group)
+                ),
+                0
+            ),
+            leads_count=Coalesce(Sum('lead_rollups__lead_count', filter=organization_rollups), 0),
+            leads_rejected_count=Coalesce(
+                Sum(
+                    'lead_rollups__lead_count',
+                    filter=organization_rollups & Q(lead_rollups__status_group=reject_status_group)
+                ),
+                0
+            ),
+        ).order_by('id')
+        return managers
+
+    def get_manager_stats_item(self, manager: User) -> tuple[str, dict[str, Any]]:
+        """Returns the string representation and the performance data of an annotated manager."""
+        manager_name = f'{manager.first_name} {manager.last_name} ({manager.email})'
+        manager_leads_rejected_percentage = round(
+            manager.leads_rejected_count / manager.leads_count,
+            2
+            ) * 100 if manager.leads_count else 0
+
+        return f'{manager}', {
+            'name': manager_name,
+            'sales_sum': manager.sales_sum,
+            'leads_count': manager.leads_count,
+            'leads_rejected_count': manager_leads_rejected_percentage
+        }
+
+
+class TimeSeriesMixin:
+    """Provides methods to group Lead model objects into time buckets."""
+
+    def get_bucket_start(self, day: date, granularity: str) -> date:
+        """Returns the first day of the day, ISO week or month bucket the given day belongs to."""
+        if granularity == 'week':
+            return day - timedelta(days=day.weekday())
+        if granularity == 'month':
+            return day.replace(day=1)
+        return day
+
+    def get_previous_bucket_start(self, bucket_start: date, granularity: str) -> date:
+        """Returns the first day of the bucket preceding the given one."""
+        if granularity == 'week':
+            return bucket_start - timedelta(days=7)
+        if granularity == 'month':
+            return (bucket_start - timedelta(days=1)).replace(day=1)
+        return bucket_start - timedelta(days=1)
+
+    def get_bucket_label(self, bucket_start: date, granularity: str) -> str:
+        """Returns a human-readable label of the bucket."""
+        if granularity == 'week':
+            iso_year, iso_week, _ = bucket_start.isocalendar()
+            return f'{iso_year}-W{iso_week:02d}'
+        if granularity == 'month':
+            return bucket_start.strftime('%Y-%m')
+        return str(bucket_start)
+
+    def get_leads_time_series(
+        self,
+        organization: Organization,
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> dict[str, dict[str, int]]:
+        """
+        Returns dict with bucket labels as keys and the number and the total price
+        of the organization's leads created within the bucket as values, latest bucket first.
+        """
+        leads_by_date = {
+            label: {'count': count, 'price': price}
+            for label, count, price in self.iter_leads_time_series(
+                organization,
+                start_date,
+                end_date,
+                granularity
+            )
+        }
+        return leads_by_date
+
+    async def aget_leads_time_series(
+        self,
+        organization: Organization,
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> dict[str, dict[str, int]]:
+        """Async version of get_leads_time_series."""
+        rows = self.get_time_series_rows(organization, start_date, end_date, granularity)
+        rows = [row async for row in rows.aiterator(chunk_size=ITERATOR_CHUNK_SIZE)]
+        leads_by_date = {
+            label: {'count': count, 'price': price}
+            for label, count, price in self.iter_time_series_buckets(
+                iter(rows),
+                start_date,
+                end_date,
+                granularity
+            )
+        }
+        return leads_by_date
+
+    def get_time_series_rows(
+        self,
+        organization: Organization,
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> QuerySet[LeadDailyRollup]:
+        """
+        Returns the start, the number and the total price of the organization's
+        leads of every bucket with leads, latest bucket first.
+
+        Daily rollups are grouped by a single query, buckets without leads are filled in Python.
+        """
+        rows = LeadDailyRollup.objects.filter(
+            organization=organization,
+            day__range=(start_date, end_date),
+        ).annotate(
+            bucket=Trunc('day', granularity, output_field=DateField()),
+        ).values('bucket').annotate(
+            count=Coalesce(Sum('lead_count'), 0),
+            price=Coalesce(Sum('price_sum'), 0),
+        ).order_by('-bucket')
+        return rows
+
+    def iter_leads_time_series(
+        self,
+        organization: Organization,
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> Iterator[tuple[str, int, int]]:
+        """
+        Yields the label, the number and the total price of the organization's leads
+        of every bucket, latest bucket first, as the database cursor produces them.
+        """
+        rows = self.get_time_series_rows(organization, start_date, end_date, granularity)
+        return self.iter_time_series_buckets(
+            rows.iterator(chunk_size=ITERATOR_CHUNK_SIZE),
+            start_date,
+            end_date,
+            granularity
+        )
+
+    def iter_time_series_buckets(
+        self,
+        rows: Iterator[dict[str, Any]],
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> Iterator[tuple[str, int, int]]:
+        """Yields the rows of get_time_series_rows for every bucket, filling the empty ones."""
+        row = next(rows, None)
+        first_bucket_start = self.get_bucket_start(start_date, granularity)
+        bucket_start = self.get_bucket_start(end_date, granularity)
+
+        while bucket_start >= first_bucket_start:
+            label = self.get_bucket_label(bucket_start, granularity)
+
+            if row is not None and row['bucket'] == bucket_start:
+                yield label, row['count'], row['price']
+                row = next(rows, None)
+            else:
+                yield label, 0, 0
+
+            # The bucket preceding the first one may start before date.min.
+            if bucket_start == first_bucket_start:
+                break
+
+            bucket_start = self.get_previous_bucket_start(bucket_start, granularity)
+
+
+class CachedReportMixin:
+    """
+    Provides report data cached per organization and request parameters.
+
+    Cached data is versioned by organization, so it's never served after
+    the organization's leads have been written.
+    """
+    report_name = None
+
+    def get_default_report_params(self) -> dict[str, Any]:
+        """Returns the parameters of the report opened without request parameters."""
+        return dict()
+
+    def get_report_params(self) -> dict[str, Any]:
+        """Returns the request parameters the report data depends on."""
+        return self.get_default_report_params()
+
+    def get_report_data(self, organization: Organization, **params: Any) -> dict[str, Any]:
+        """Computes the report data for the given organization and parameters."""
+        raise NotImplementedError
+
+    async def aget_report_data(self, organization: Organization, **params: Any) -> dict[str, Any]:
+        """Async version of get_report_data, running it in a worker thread unless overridden."""
+        return await sync_to_async(self.get_report_data)(organization, **params)
+
+    def get_cached_report_data(self, organization: Organization) -> dict[str, Any]:
+        """Returns the report data from the cache, computes it on cache miss."""
+        params = self.get_report_params()
+        report_data = report_cache.get_report(
+            self.report_name,
+            organization.id,
+            params,
+            lambda: self.get_report_data(organization, **params),
+        )
+        return report_data
+
+    async def aget_cached_report_data(self, organization: Organization) -> dict[str, Any]:
+        """Async version of get_cached_report_data."""
+        params = self.get_report_params()
+        report_data = await report_cache.aget_report(
+            self.report_name,
+            organization.id,
+            params,
+            lambda: self.aget_report_data(organization, **params),
+        )
+        return report_data
+
+    async def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """
+        Renders the report, computed with the async ORM on cache miss, so that
+        slow reports wait for the database without holding a worker under ASGI.
+        """
+        context = self.get_context_data(**kwargs)
+        context.update(await self.aget_cached_report_data(context['organization']))
+        return self.render_to_response(context)
+
 
 class GeneralReport(
     OrganizationMixin,
     StatusMixin,
     LeadMixin,
+    CachedReportMixin,
     VerifyMembershipMixin,
     TemplateView,
 ):
     """A view for displaying general data."""
     template_name = 'analytics/general_report.html'
+    report_name = 'general'
+
+    def get_default_report_params(self) -> dict[str, Any]:
+        """Returns the current date, as the report covers today and the current month."""
+        return {'today': timezone.localdate()}
+
+    def get_report_data(self, organization: Organization, today: date) -> dict[str, Any]:
+        """Returns the general statistics and leads by statuses of the organization."""
+        done_status_group = self.get_done_status_group()
+        report_data = self.get_general_stats(organization, done_status_group, today)
+
+        status_group_names = self.get_status_group_names()
+        leads_by_statuses = self.get_leads_by_statuses(organization, status_group_names)
+        report_data['leads_by_statuses'] = leads_by_statuses
+        return report_data
+
+    async def aget_report_data(self, organization: Organization, today: date) -> dict[str, Any]:
+        """Async version of get_report_data."""
+        # The queries are independent, but not gathered: the async ORM runs them
+        # on the request's thread and connection one after the other anyway, and
+        # gathering thread-sensitive calls deadlocks behind sync-only middleware.
+        done_status_group = self.get_done_status_group()
+        report_data = await self.aget_general_stats(organization, done_status_group, today)
+
+        status_group_names = self.get_status_group_names()
+        leads_by_statuses = await self.aget_leads_by_statuses(organization, status_group_names)
+        report_data['leads_by_statuses'] = leads_by_statuses
+        return report_data
 
     def get_context_data(self, **kwargs) -> dict[str: any]:
         """Adds data to the context dictionary."""
@@ -169,29 +565,6 @@ class GeneralReport(
         organization = self.get_organization(org_id)
         context['org_id'] = org_id
         context['organization'] = organization
-
-        leads_created_today = self.get_leads_created_today(organization)
-        leads_created_today_count = len(leads_created_today)
-        context['leads_created_today_count'] = leads_created_today_count
-
-        leads_created_this_month = self.get_leads_created_this_month(organization)
-        leads_created_this_month_count = len(leads_created_this_month)
-        context['leads_created_this_month_count'] = leads_created_this_month_count
-        leads_created_this_month_price = self.get_leads_price(leads_created_this_month)
-        context['leads_created_this_month_price'] = leads_created_this_month_price
-
-        done_statuses = self.get_done_statuses()
-        leads_created_this_month_and_done = leads_created_this_month.filter(
-            status__in=done_statuses
-            )
-        leads_created_this_month_and_done_price = self.get_leads_price(
-            leads_created_this_month_and_done
-            )
-        context['leads_created_this_month_and_done_price'] = leads_created_this_month_and_done_price
-
-        status_group_names = self.get_status_group_names()
-        leads_by_statuses = self.get_leads_by_statuses(status_group_names)
-        context['leads_by_statuses'] = leads_by_statuses
         return context
 
 
@@ -199,11 +572,39 @@ class ManagerReport(
     OrganizationMixin,
     StatusMixin,
     LeadMixin,
+    CachedReportMixin,
     VerifyMembershipMixin,
     TemplateView
 ):
     """A view for displaying data by manager."""
     template_name = 'analytics/manager_report.html'
+    report_name = 'manager'
+
+    def get_report_data(self, organization: Organization) -> dict[str, Any]:
+        """Returns the performance statistics of the organization's managers."""
+        memberships = self.get_organization_memberships(organization)
+        managers = self.get_organization_members(memberships)
+
+        done_status_group = self.get_done_status_group()
+        reject_status_group = self.get_reject_status_group()
+        managers_stats = self.get_manager_stats(
+            organization,
+            managers,
+            done_status_group,
+            reject_status_group
+        )
+        return {'managers_stats': managers_stats}
+
+    async def aget_report_data(self, organization: Organization) -> dict[str, Any]:
+        """Async version of get_report_data."""
+        memberships = self.get_organization_memberships(organization)
+        managers_stats = await self.aget_manager_stats(
+            organization,
+            self.get_organization_members(memberships),
+            self.get_done_status_group(),
+            self.get_reject_status_group()
+        )
+        return {'managers_stats': managers_stats}
 
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         """Adds data to the context dictionary."""
@@ -214,41 +615,108 @@ class ManagerReport(
         context['org_id'] = org_id
         context['organization'] = organization
 
-        memberships = self.get_organization_memberships(organization)
-        managers = self.get_organization_members(memberships)
-
-        done_statuses = self.get_done_statuses()
-        reject_statuses = self.get_reject_statuses()
-        leads = self.get_all_leads(organization)
-        managers_stats = self.get_manager_stats(
-            managers,
-            done_statuses,
-            reject_statuses,
-            leads
-        )
-        context['managers_stats'] = managers_stats
-
         return context
 
 
-class PeriodReport(OrganizationMixin, VerifyMembershipMixin, TemplateView):
+class PeriodReport(
+    OrganizationMixin,
+    TimeSeriesMixin,
+    CachedReportMixin,
+    VerifyMembershipMixin,
+    TemplateView
+):
     """A view for displaying data by period."""
     template_name = 'analytics/period_report.html'
+    report_name = 'period'
 
     def parse_date_parameters(self) -> tuple:
         """
         Parses the start_date and end_date parameters from the request if present,
         sets them as the last 30 days otherwise.
+
+        Raises:
+            BadRequest: If a date is invalid, the start date is later than the end date,
+                or the range spans more days than ANALYTICS_PERIOD_MAX_DAYS.
         """
+        start_date = self.request.GET.get('start_date')
+        end_date = self.request.GET.get('end_date')
+
+        if not start_date and not end_date:
+            return self.get_default_date_range()
+
         try:
-            start_date = parse_date(self.request.GET.get('start_date'))
-            end_date = parse_date(self.request.GET.get('end_date'))
-        except TypeError:
-            end_date = now.date()
-            start_date = end_date - timedelta(days=30)
+            start_date = parse_date(start_date)
+            end_date = parse_date(end_date)
+        except (TypeError, ValueError):
+            start_date = end_date = None
+
+        if start_date is None or end_date is None:
+            raise BadRequest('Invalid start_date or end_date')
+
+        if start_date > end_date:
+            raise BadRequest('start_date is later than end_date')
+
+        max_days = settings.ANALYTICS_PERIOD_MAX_DAYS
+
+        if (end_date - start_date).days >= max_days:
+            raise BadRequest(f'The period spans more than {max_days} days')
 
         return start_date, end_date
 
+    def get_default_date_range(self) -> tuple:
+        """Returns the last 30 days as the start and end dates of the report."""
+        end_date = timezone.localdate()
+        start_date = end_date - timedelta(days=30)
+        return start_date, end_date
+
+    def parse_granularity_parameter(self) -> str:
+        """Parses the granularity parameter from the request, falls back to 'day' if invalid."""
+        granularity = self.request.GET.get('granularity')
+
+        if granularity not in dict(GRANULARITY_CHOICES):
+            granularity = GRANULARITY_CHOICES[0][0]
+
+        return granularity
+
+    def get_default_report_params(self) -> dict[str, Any]:
+        """Returns the last 30 days with daily granularity."""
+        start_date, end_date = self.get_default_date_range()
+        granularity = GRANULARITY_CHOICES[0][0]
+        return {'start_date': start_date, 'end_date': end_date, 'granularity': granularity}
+
+    def get_report_params(self) -> dict[str, Any]:
+        """Returns the parsed date range and granularity of the report."""
+        start_date, end_date = self.parse_date_parameters()
+        granularity = self.parse_granularity_parameter()
+        return {'start_date': start_date, 'end_date': end_date, 'granularity': granularity}
+
+    def get_report_data(
+        self,
+        organization: Organization,
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> dict[str, Any]:
+        """Returns the organization's leads grouped into time buckets."""
+        leads_by_date = self.get_leads_time_series(organization, start_date, end_date, granularity)
+        return {'leads_by_date': leads_by_date}
+
+    async def aget_report_data(
+        self,
+        organization: Organization,
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> dict[str, Any]:
+        """Async version of get_report_data."""
+        leads_by_date = await self.aget_leads_time_series(
+            organization,
+            start_date,
+            end_date,
+            granularity
+        )
+        return {'leads_by_date': leads_by_date}
+
     def get_context_data(self, **kwargs: Any) -> dict[str, Any]:
         """Provides data to the context dictionary."""
         context = super().get_context_data(**kwargs)
@@ -256,21 +724,171 @@ class PeriodReport(OrganizationMixin, VerifyMembershipMixin, TemplateView):
         organization = self.get_organization(org_id)
         context['org_id'] = org_id
         context['organization'] = organization
+        context['form'] = DateRangeForm(initial=self.get_report_params())
 
-        start_date, end_date = self.parse_date_parameters()
-        leads = Lead.objects.filter(date_created__range=(start_date, end_date))
-        leads_by_date = dict()
+        return context
 
-        for i in range((end_date - start_date).days + 1):
-            day = end_date - timedelta(days=i)
-            date_leads = leads.filter(date_created=day)
-            date_leads_data = {
-                'count': len(date_leads),
-                'price': sum(lead.price for lead in date_leads)
-                }
-            leads_by_date[str(day)] = date_leads_data
 
-        context['leads_by_date'] = leads_by_date
-        context['form'] = DateRangeForm
+class ReportExportMixin:
+    """Provides export of the report data as a streamed CSV file or an XLSX file."""
+    export_formats = ('csv', 'xlsx')
+    # The report parameters holding dates, passed to background exports as ISO strings.
+    export_date_params = ()
 
-        return context
+    def get_export_header(self) -> list[str]:
+        """Returns the column names of the exported file."""
+        raise NotImplementedError
+
+    def get_export_rows(self, organization: Organization, **params: Any) -> Iterator[Sequence]:
+        """Yields the rows of the exported file as the database cursor produces them."""
+        raise NotImplementedError
+
+    def is_background_export(self, params: dict[str, Any]) -> bool:
+        """Returns True if the XLSX file is too large to be generated within the request."""
+        return False
+
+    def dump_export_params(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Returns the report parameters as JSON-serializable values."""
+        return {
+            name: value.isoformat() if name in self.export_date_params else value
+            for name, value in params.items()
+        }
+
+    def load_export_params(self, params: dict[str, Any]) -> dict[str, Any]:
+        """Returns the report parameters dumped by dump_export_params."""
+        return {
+            name: date.fromisoformat(value) if name in self.export_date_params else value
+            for name, value in params.items()
+        }
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """Returns the exported file, or redirects to its status page if it's generated later."""
+        export_format = self.kwargs['export_format']
+
+        if export_format not in self.export_formats:
+            raise Http404
+
+        org_id = self.get_organization_id()
+        organization = self.get_organization(org_id)
+        params = self.get_report_params()
+        filename = f'{self.report_name}_report_{org_id}.{export_format}'
+        header = self.get_export_header()
+
+        def get_rows():
+            return self.get_export_rows(organization, **params)
+
+        if export_format == 'csv':
+            return exports.get_csv_response(filename, header, get_rows())
+
+        if self.is_background_export(params):
+            token = exports.start_xlsx_export(
+                self.report_name,
+                org_id,
+                filename,
+                self.dump_export_params(params),
+            )
+            return redirect('organizations:analytics:report_export', org_id=org_id, token=token)
+
+        file = BytesIO()
+        exports.write_xlsx(file, header, get_rows())
+        response = HttpResponse(file.getvalue(), content_type=exports.XLSX_CONTENT_TYPE)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+
+class GeneralReportExport(ReportExportMixin, GeneralReport):
+    """A view for exporting general data."""
+    export_date_params = ('today',)
+
+    def get_export_header(self) -> list[str]:
+        """Returns the column names of the exported file."""
+        return ['Показатель', 'Значение']
+
+    def get_export_rows(self, organization: Organization, today: date) -> Iterator[Sequence]:
+        """Yields the general statistics followed by the leads by statuses."""
+        report_data = self.get_report_data(organization, today)
+        yield 'Заявки за сегодня', report_data['leads_created_today_count']
+        yield 'Заявки за месяц', report_data['leads_created_this_month_count']
+        yield 'Потенциальная выручка', report_data['leads_created_this_month_price']
+        yield 'Подтвержденная выручка', report_data['leads_created_this_month_and_done_price']
+
+        for status, stats in report_data['leads_by_statuses'].items():
+            yield f'{status}: кол-во заявок', stats['count']
+            yield f'{status}: на сумму', stats['price']
+
+
+class ManagerReportExport(ReportExportMixin, ManagerReport):
+    """A view for exporting data by manager."""
+
+    def get_export_header(self) -> list[str]:
+        """Returns the column names of the exported file."""
+        return ['Менеджер', 'Сумма продаж', 'Кол-во обработанных заявок', '% отказов по заявкам']
+
+    def get_export_rows(self, organization: Organization) -> Iterator[Sequence]:
+        """Yields the performance statistics of every manager of the organization."""
+        memberships = self.get_organization_memberships(organization)
+        managers = self.get_organization_members(memberships)
+        managers_stats = self.iter_manager_stats(
+            organization,
+            managers,
+            self.get_done_status_group(),
+            self.get_reject_status_group()
+        )
+
+        for _, stats in managers_stats:
+            yield (
+                stats['name'],
+                stats['sales_sum'],
+                stats['leads_count'],
+                stats['leads_rejected_count'],
+            )
+
+
+class PeriodReportExport(ReportExportMixin, PeriodReport):
+    """A view for exporting data by period."""
+    export_date_params = ('start_date', 'end_date')
+
+    def get_export_header(self) -> list[str]:
+        """Returns the column names of the exported file."""
+        return ['Дата', 'Кол-во заявок', 'На сумму']
+
+    def get_export_rows(
+        self,
+        organization: Organization,
+        start_date: date,
+        end_date: date,
+        granularity: str
+    ) -> Iterator[Sequence]:
+        """Yields the organization's leads grouped into time buckets."""
+        return self.iter_leads_time_series(organization, start_date, end_date, granularity)
+
+    def is_background_export(self, params: dict[str, Any]) -> bool:
+        """Returns True if the report spans more days than configured for inline export."""
+        days = (params['end_date'] - params['start_date']).days
+        return days > settings.ANALYTICS_EXPORT_BACKGROUND_DAYS
+
+
+class ReportExportView(OrganizationMixin, VerifyMembershipMixin, TemplateView):
+    """A view for downloading the XLSX export generated in the background."""
+    template_name = 'analytics/report_export.html'
+
+    def get(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        """Returns the exported file if it's ready, its status page otherwise."""
+        org_id = self.get_organization_id()
+        status, path = exports.get_export_status(org_id, self.kwargs['token'])
+
+        if status is None:
+            raise Http404
+
+        if status == 'done':
+            return FileResponse(
+                default_storage.open(path, 'rb'),
+                as_attachment=True,
+                filename=os.path.basename(path),
+            )
+
+        context = self.get_context_data(**kwargs)
+        context['org_id'] = org_id
+        context['organization'] = self.get_organization(org_id)
+        context['status'] = status
+        return self.render_to_response(context, status=202 if status == 'pending' else 500)
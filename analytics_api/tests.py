@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from leads.models import Lead, Status
+from organizations.models import Membership, Organization
+
+User = get_user_model()
+
+
+class ReportAPITest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='ApiUser', first_name='Api', last_name='User')
+        cls.organization = Organization.objects.create(name='ApiOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        cls.status = Status.objects.create(name='Closed', group='Done')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get_url(self, name):
+        return reverse(f'organizations:analytics_api:{name}', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def create_lead(self, price=100):
+        return Lead.objects.create(
+            first_name='Test',
+            last_name='Lead',
+            order='Test order',
+            price=price,
+            status=self.status,
+            comment='',
+            manager=self.user,
+            organization=self.organization,
+        )
+
+    def test_general_report(self):
+        self.create_lead(price=300)
+        response = self.client.get(self.get_url('general_report'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['leads_created_this_month_and_done_price'], 300)
+        self.assertTrue(response.has_header('ETag'))
+
+    def test_manager_report(self):
+        self.create_lead(price=300)
+        response = self.client.get(self.get_url('manager_report'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['managers_stats'][str(self.user)]['sales_sum'], 300)
+
+    def test_period_report(self):
+        self.create_lead(price=300)
+        response = self.client.get(self.get_url('period_report'), {'granularity': 'month'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['granularity'], 'month')
+        self.assertEqual(sum(row['price'] for row in response.data['leads_by_date'].values()), 300)
+
+    def test_not_modified_response(self):
+        url = self.get_url('period_report')
+        etag = self.client.get(url)['ETag']
+
+        # The membership is cached and the report is not computed.
+        with self.assertNumQueries(0):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_etag_changes_after_lead_write(self):
+        url = self.get_url('general_report')
+        etag = self.client.get(url)['ETag']
+        self.create_lead()
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_parameters(self):
+        url = self.get_url('period_report')
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, {'granularity': 'week'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_non_member_is_forbidden(self):
+        self.client.force_authenticate(User.objects.create(username='Stranger'))
+        response = self.client.get(self.get_url('general_report'))
+        self.assertEqual(response.status_code, 403)
+
+    def test_anonymous_user_is_rejected(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(self.get_url('general_report'))
+        self.assertEqual(response.status_code, 401)
@@ -0,0 +1,11 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'analytics_api'
+
+urlpatterns = [
+    path('', views.GeneralReportAPIView.as_view(), name='general_report'),
+    path('managers/', views.ManagerReportAPIView.as_view(), name='manager_report'),
+    path('period/', views.PeriodReportAPIView.as_view(), name='period_report'),
+]
@@ -0,0 +1,61 @@
+from typing import Any
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.request import Request
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from analytics import cache as report_cache
+from analytics.views import CachedReportMixin, GeneralReport, ManagerReport, PeriodReport
+from leads_api.permissions import MembershipPermission
+
+
+class ReportAPIView(APIView):
+    """
+    Returns the data of an analytics report as JSON.
+
+    Responses carry an ETag derived from the versions of the report cache,
+    which change on every write of the organization's leads, so that
+    repeated polls get a 304 response without computing the report.
+    """
+    permission_classes = [IsAuthenticated, MembershipPermission]
+    report_view_class = None
+
+    def get_report_view(self, request: Request) -> CachedReportMixin:
+        """Returns the analytics view computing the report, set up for the current request."""
+        report_view = self.report_view_class()
+        report_view.setup(request._request, *self.args, **self.kwargs)
+        return report_view
+
+    def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        """Returns the report data, or 304 if it hasn't changed since the client's ETag."""
+        report_view = self.get_report_view(request)
+        org_id = report_view.get_organization_id()
+        params = report_view.get_report_params()
+        # The ETag is computed before the data, so a write in between makes
+        # the next poll fetch the data again instead of keeping stale data.
+        etag = quote_etag(report_cache.get_report_etag(report_view.report_name, org_id, params))
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            organization = report_view.get_organization(org_id)
+            report_data = report_view.get_cached_report_data(organization)
+            response = Response({**params, **report_data})
+
+        response['ETag'] = etag
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+class GeneralReportAPIView(ReportAPIView):
+    report_view_class = GeneralReport
+
+
+class ManagerReportAPIView(ReportAPIView):
+    report_view_class = ManagerReport
+
+
+class PeriodReportAPIView(ReportAPIView):
+    report_view_class = PeriodReport
@@ -0,0 +1,88 @@
+import io
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from jobs.models import Job
+from jobs.tasks import task
+
+DEFAULT_WORKERS = ('1x1', '1x4', '2x4')
+
+
+# Registered only by this command, the worker processes it runs are forked and inherit it.
+@task(queue='benchmark')
+def noop() -> None:
+    """Does nothing, used to measure the throughput of the workers."""
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the number of jobs per second enqueued one at a time, and run by '
+        'run_workers in burst mode with the given numbers of processes and threads. '
+        'The jobs of the benchmark queue are deleted before and after every run.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=10000, help='Number of jobs per run.')
+        parser.add_argument(
+            '--workers',
+            action='append',
+            help='Number of processes and threads of a run, such as 2x4. Can be repeated.',
+        )
+        parser.add_argument('--batch-size', type=int, default=10)
+
+    def measure_enqueue(self, job_count):
+        """Returns the number of jobs enqueued per second with Task.enqueue."""
+        started_at = time.perf_counter()
+
+        for _ in range(job_count):
+            noop.enqueue()
+
+        return job_count / (time.perf_counter() - started_at)
+
+    def measure_run(self, job_count, processes, threads, batch_size):
+        """Returns the number of jobs run per second."""
+        Job.objects.bulk_create(
+            (Job(task=noop.name, queue=noop.queue) for _ in range(job_count)),
+            batch_size=1000,
+        )
+        started_at = time.perf_counter()
+        call_command(
+            'run_workers',
+            queues=[noop.queue],
+            processes=processes,
+            threads=threads,
+            batch_size=batch_size,
+            burst=True,
+            stdout=io.StringIO(),
+        )
+        elapsed = time.perf_counter() - started_at
+        run_count = Job.objects.filter(queue=noop.queue, status=Job.DONE).count()
+
+        if run_count != job_count:
+            raise CommandError(f'{run_count} of {job_count} jobs were run')
+
+        return job_count / elapsed
+
+    def handle(self, *args, **options):
+        benchmark_jobs = Job.objects.filter(queue=noop.queue)
+        benchmark_jobs.delete()
+
+        try:
+            enqueue_rate = self.measure_enqueue(min(options['jobs'], 1000))
+            self.stdout.write(f'Enqueued {enqueue_rate:.0f} jobs/s')
+            self.stdout.write(f'{"Processes":>9} {"Threads":>8} {"jobs/s":>8}')
+
+            for workers in options['workers'] or DEFAULT_WORKERS:
+                processes, threads = (int(count) for count in workers.split('x'))
+                benchmark_jobs.delete()
+                run_rate = self.measure_run(
+                    options['jobs'],
+                    processes,
+                    threads,
+                    options['batch_size'],
+                )
+                self.stdout.write(f'{processes:>9} {threads:>8} {run_rate:>8.0f}')
+        finally:
+            benchmark_jobs.delete()
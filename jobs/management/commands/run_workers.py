@@ -0,0 +1,130 @@
+import multiprocessing
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from jobs.worker import Worker
+
+
+def run_threads(queues: list[str], threads: int, batch_size: int, interval: float,
+                burst: bool) -> int:
+    """
+    Runs workers in the given number of threads until SIGTERM or SIGINT is received,
+    or until no job is due in burst mode, and returns the number of claimed jobs.
+    """
+    stop = threading.Event()
+    counts = []
+
+    def run_worker():
+        counts.append(Worker(queues, batch_size).run(stop, interval, burst))
+
+    for signal_number in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signal_number, lambda *args: stop.set())
+
+    workers = [threading.Thread(target=run_worker) for _ in range(threads)]
+
+    for worker in workers:
+        worker.start()
+
+    for worker in workers:
+        # Joins with a timeout, so that signals are handled by the main thread meanwhile.
+        while worker.is_alive():
+            worker.join(timeout=1)
+
+    return sum(counts)
+
+
+def run_process(results: multiprocessing.SimpleQueue, arguments: tuple) -> None:
+    """Runs the worker threads of a worker process and passes on their number of claimed jobs."""
+    results.put(run_threads(*arguments))
+
+
+class Command(BaseCommand):
+    help = (
+        'Runs the queued background jobs in worker threads of one or more processes, '
+        'until SIGTERM or SIGINT is received. Any number of commands can run at the same time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            dest='queues',
+            help='Queue to run the jobs of. Can be repeated. Defaults to the default queue.',
+        )
+        parser.add_argument('--processes', type=int, default=1, help='Number of processes.')
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=1,
+            help='Number of worker threads of every process.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1,
+            help='Number of jobs claimed at once by a worker.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=1,
+            help='Number of seconds a worker waits when no job is due.',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit as soon as no job is due.',
+        )
+
+    def run_processes(self, process_count, arguments):
+        """
+        Runs the worker threads in the given number of processes, which are stopped
+        when this process receives SIGTERM or SIGINT, and returns the number of claimed jobs.
+        """
+        # Worker processes must not share the connection of the current process.
+        connections.close_all()
+        results = multiprocessing.SimpleQueue()
+        processes = [
+            multiprocessing.Process(target=run_process, args=(results, arguments))
+            for _ in range(process_count)
+        ]
+
+        def stop(*args):
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+
+        for process in processes:
+            process.start()
+
+        for signal_number in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signal_number, stop)
+
+        for process in processes:
+            process.join()
+
+        claimed_count = 0
+
+        while not results.empty():
+            claimed_count += results.get()
+
+        return claimed_count
+
+    def handle(self, *args, **options):
+        arguments = (
+            options['queues'] or ['default'],
+            options['threads'],
+            options['batch_size'],
+            options['interval'],
+            options['burst'],
+        )
+
+        if options['processes'] <= 1:
+            claimed_count = run_threads(*arguments)
+        else:
+            claimed_count = self.run_processes(options['processes'], arguments)
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {claimed_count} jobs'))
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+def get_default_max_attempts() -> int:
+    """Returns the number of attempts of jobs enqueued without max_attempts."""
+    return settings.JOBS_MAX_ATTEMPTS
+
+
+class Job(models.Model):
+    """
+    A call of a registered task, run in the background by the 'run_workers' command.
+
+    Queued jobs are claimed by the workers in the order of their priority,
+    highest first, then of their run_at time. Failed jobs are queued again
+    with an exponential backoff until max_attempts attempts have failed,
+    after which they are left dead for inspection.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    DEAD = 'dead'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (DEAD, 'Не выполнена'),
+    )
+
+    task = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    queue = models.CharField(max_length=50, default='default')
+    priority = models.IntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=get_default_max_attempts)
+    last_error = models.TextField(blank=True, default='')
+    locked_by = models.CharField(max_length=100, blank=True, default='')
+    locked_until = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['queue', '-priority', 'run_at', 'id'],
+                         condition=models.Q(status='queued'), name='job_queued_idx'),
+            models.Index(fields=['locked_until'],
+                         condition=models.Q(status='running'), name='job_running_idx'),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns a human-readable string representation of the Job Model object.
+
+        Returns:
+            str: Containing the task, the queue and the status.
+        """
+        return f'{self.task} {self.queue} {self.status}'
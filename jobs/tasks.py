@@ -0,0 +1,88 @@
+from datetime import datetime
+from typing import Any, Callable, Optional
+
+from .models import Job
+
+registry: dict[str, 'Task'] = dict()
+
+
+class Task:
+    """A function that can be run in the background, registered under a name."""
+
+    def __init__(
+        self,
+        func: Callable[..., Any],
+        name: str,
+        queue: str,
+        priority: int,
+        max_attempts: Optional[int],
+    ):
+        self.func = func
+        self.name = name
+        self.queue = queue
+        self.priority = priority
+        self.max_attempts = max_attempts
+
+    def __call__(self, **kwargs: Any) -> Any:
+        """Runs the task in the current thread."""
+        return self.func(**kwargs)
+
+    def enqueue(
+        self,
+        *,
+        queue: Optional[str] = None,
+        priority: Optional[int] = None,
+        run_at: Optional[datetime] = None,
+        max_attempts: Optional[int] = None,
+        **kwargs: Any,
+    ) -> Job:
+        """
+        Writes a job running the task with the given JSON-serializable kwargs.
+
+        The job is written in the current transaction, if any, so that it only
+        runs if the transaction is committed.
+
+        Args:
+            queue: The queue of the job, the queue of the task by default.
+            priority: The priority of the job, the priority of the task by default.
+            run_at: The time the job is run at the earliest, now by default.
+            max_attempts: The number of attempts before the job is left dead.
+        """
+        job = Job(
+            task=self.name,
+            kwargs=kwargs,
+            queue=queue or self.queue,
+            priority=self.priority if priority is None else priority,
+        )
+
+        if run_at is not None:
+            job.run_at = run_at
+
+        if max_attempts or self.max_attempts:
+            job.max_attempts = max_attempts or self.max_attempts
+
+        job.save()
+        return job
+
+
+def task(
+    name: Optional[str] = None,
+    queue: str = 'default',
+    priority: int = 0,
+    max_attempts: Optional[int] = None,
+) -> Callable[[Callable[..., Any]], Task]:
+    """
+    Registers the decorated function as a task, by default under its module and
+    function name. Tasks are defined in the tasks modules of the apps, which are
+    imported when Django starts, so that workers know every task.
+    """
+    def decorator(func: Callable[..., Any]) -> Task:
+        task_name = name or f'{func.__module__}.{func.__name__}'
+
+        if task_name in registry:
+            raise ValueError(f'Task {task_name} is already registered')
+
+        registry[task_name] = Task(func, task_name, queue, priority, max_attempts)
+        return registry[task_name]
+
+    return decorator
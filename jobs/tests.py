@@ -0,0 +1,147 @@
+import threading
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from .models import Job
+from .tasks import task
+from .worker import Worker, requeue_expired_jobs
+
+calls = []
+
+
+@task(queue='tests')
+def record(value):
+    calls.append(value)
+
+
+@task(queue='tests')
+def fail():
+    raise ValueError('Failed on purpose')
+
+
+class WorkerTest(TestCase):
+
+    def setUp(self):
+        calls.clear()
+        self.worker = Worker(['tests'], batch_size=10)
+
+    def test_enqueued_job_runs(self):
+        job = record.enqueue(value=1)
+        self.assertEqual(job.queue, 'tests')
+        self.assertEqual(self.worker.run_once(), 1)
+        self.assertEqual(calls, [1])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 1)
+        self.assertIsNotNone(job.finished_at)
+        self.assertEqual(self.worker.run_once(), 0)
+
+    def test_jobs_run_by_priority_then_run_at(self):
+        now = timezone.now()
+        record.enqueue(value='late', run_at=now - timedelta(minutes=1))
+        record.enqueue(value='early', run_at=now - timedelta(minutes=2))
+        record.enqueue(value='urgent', priority=10)
+        self.worker.run_once()
+        self.assertEqual(calls, ['urgent', 'early', 'late'])
+
+    def test_scheduled_and_other_queue_jobs_not_run(self):
+        record.enqueue(value=1, run_at=timezone.now() + timedelta(minutes=1))
+        record.enqueue(value=2, queue='other')
+        self.assertEqual(self.worker.run_once(), 0)
+        self.assertEqual(calls, [])
+
+    @override_settings(JOBS_RETRY_DELAY=60)
+    def test_failed_job_retried_with_backoff_then_dead(self):
+        job = fail.enqueue(max_attempts=2)
+        started_at = timezone.now()
+
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.worker.run_once()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn('Failed on purpose', job.last_error)
+        self.assertGreaterEqual(job.run_at, started_at + timedelta(seconds=60))
+        self.assertEqual(self.worker.run_once(), 0)
+
+        Job.objects.filter(id=job.id).update(run_at=timezone.now())
+
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.worker.run_once()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DEAD)
+        self.assertEqual(job.attempts, 2)
+
+    def test_unknown_task_fails(self):
+        job = Job.objects.create(task='jobs.tests.missing', queue='tests', max_attempts=1)
+        self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DEAD)
+        self.assertIn('Unknown task', job.last_error)
+
+    def test_expired_lease_requeued(self):
+        job = record.enqueue(value=1)
+        Job.objects.filter(id=job.id).update(
+            status=Job.RUNNING,
+            attempts=1,
+            locked_by='dead-worker',
+            locked_until=timezone.now() - timedelta(seconds=1),
+        )
+        self.assertEqual(requeue_expired_jobs(), 1)
+        self.worker.run_once()
+        self.assertEqual(calls, [1])
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 2)
+
+
+class ConcurrentWorkersTest(TransactionTestCase):
+
+    def test_jobs_run_once_across_threads(self):
+        calls.clear()
+
+        for value in range(100):
+            record.enqueue(value=value)
+
+        stop = threading.Event()
+        threads = [
+            threading.Thread(target=Worker(['tests'], batch_size=3).run, args=(stop, 0, True))
+            for _ in range(4)
+        ]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(calls), list(range(100)))
+        self.assertEqual(Job.objects.filter(status=Job.DONE).count(), 100)
+
+    def test_worker_survives_database_errors(self):
+        calls.clear()
+        record.enqueue(value=1)
+        stop = threading.Event()
+        worker = Worker(['tests'], batch_size=10)
+        run_once = worker.run_once
+        results = [OperationalError('server closed the connection unexpectedly')]
+
+        def run_once_then_stop():
+            if results:
+                raise results.pop()
+
+            stop.set()
+            return run_once()
+
+        with patch.object(worker, 'run_once', side_effect=run_once_then_stop):
+            with self.assertLogs('jobs.worker', 'ERROR'):
+                self.assertEqual(worker.run(stop, interval=0), 1)
+
+        self.assertEqual(calls, [1])
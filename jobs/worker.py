@@ -0,0 +1,215 @@
+import json
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from typing import Any, Optional
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .tasks import registry
+
+logger = logging.getLogger(__name__)
+
+# Largest number of seconds a worker waits after consecutive errors of the database.
+MAX_ERROR_DELAY = 60
+
+CLAIM_SQL = f'''
+    UPDATE {Job._meta.db_table}
+    SET status = %(running)s,
+        attempts = attempts + 1,
+        locked_by = %(worker_id)s,
+        locked_until = %(locked_until)s
+    WHERE id IN (
+        SELECT id FROM {Job._meta.db_table}
+        WHERE status = %(queued)s AND queue = ANY(%(queues)s) AND run_at <= %(now)s
+        ORDER BY priority DESC, run_at, id
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING id, task, kwargs, attempts, max_attempts, priority, run_at
+'''
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Returns the delay before the next attempt after the given number of failed attempts."""
+    return timedelta(seconds=settings.JOBS_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def requeue_expired_jobs() -> int:
+    """
+    Queues again the running jobs whose lease has expired, as their worker has
+    most likely died, and returns their number. Jobs out of attempts are left dead.
+    """
+    expired = Job.objects.filter(status=Job.RUNNING, locked_until__lt=timezone.now())
+    dead_count = expired.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.DEAD,
+        last_error='The lease of the job expired.',
+        finished_at=timezone.now(),
+    )
+    return expired.update(status=Job.QUEUED, locked_by='', locked_until=None) + dead_count
+
+
+class Worker:
+    """
+    Claims queued jobs in batches with SELECT ... FOR UPDATE SKIP LOCKED
+    and runs them, so that any number of workers can run in any number of
+    threads and processes without claiming a job twice.
+
+    Claimed jobs are leased for JOBS_LEASE_TIMEOUT seconds. Jobs running
+    longer than that are considered abandoned and may run again.
+    """
+
+    def __init__(self, queues: list[str], batch_size: int = 1, worker_id: Optional[str] = None):
+        self.queues = queues
+        self.batch_size = batch_size
+        self.worker_id = worker_id or (
+            f'{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}'
+        )
+
+    def claim(self) -> list[dict[str, Any]]:
+        """Claims a batch of due jobs in the order they are run in."""
+        now = timezone.now()
+
+        with connection.cursor() as cursor:
+            cursor.execute(CLAIM_SQL, {
+                'running': Job.RUNNING,
+                'queued': Job.QUEUED,
+                'worker_id': self.worker_id,
+                'now': now,
+                'locked_until': now + timedelta(seconds=settings.JOBS_LEASE_TIMEOUT),
+                'queues': self.queues,
+                'limit': self.batch_size,
+            })
+            columns = [column.name for column in cursor.description]
+            jobs = [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        for job in jobs:
+            # The database adapter leaves the decoding of JSON to JSONField.
+            if isinstance(job['kwargs'], str):
+                job['kwargs'] = json.loads(job['kwargs'])
+
+        jobs.sort(key=lambda job: (-job['priority'], job['run_at'], job['id']))
+        return jobs
+
+    def run_job(self, job: dict[str, Any]) -> Optional[str]:
+        """Runs the job and returns its error, None if it succeeded."""
+        task = registry.get(job['task'])
+
+        if task is None:
+            return f'Unknown task {job["task"]}'
+
+        try:
+            task(**job['kwargs'])
+        except Exception:
+            logger.exception('Job %s of task %s failed', job['id'], job['task'])
+            return traceback.format_exc()
+
+        return None
+
+    def set_failed(self, job: dict[str, Any], error: str) -> None:
+        """Queues the failed job again with a backoff, or leaves it dead if out of attempts."""
+        jobs = Job.objects.filter(id=job['id'], locked_by=self.worker_id)
+
+        if job['attempts'] >= job['max_attempts']:
+            jobs.update(status=Job.DEAD, last_error=error, finished_at=timezone.now())
+        else:
+            jobs.update(
+                status=Job.QUEUED,
+                last_error=error,
+                run_at=timezone.now() + get_retry_delay(job['attempts']),
+                locked_by='',
+                locked_until=None,
+            )
+
+    def run_once(self) -> int:
+        """Claims and runs a batch of jobs and returns the number of claimed jobs."""
+        jobs = self.claim()
+        done_ids = []
+
+        for job in jobs:
+            error = self.run_job(job)
+
+            if error is None:
+                done_ids.append(job['id'])
+            else:
+                self.set_failed(job, error)
+
+        if done_ids:
+            # Jobs whose lease expired and were claimed by another worker are left to it.
+            Job.objects.filter(id__in=done_ids, locked_by=self.worker_id).update(
+                status=Job.DONE,
+                locked_until=None,
+                finished_at=timezone.now(),
+            )
+
+        return len(jobs)
+
+    def run_batch(self, requeue_expired: bool) -> int:
+        """
+        Claims and runs a batch of jobs and returns the number of claimed jobs.
+        If fewer jobs than a batch were due, queues the expired jobs again if asked.
+        """
+        count = self.run_once()
+
+        if count < self.batch_size and requeue_expired:
+            requeue_expired_jobs()
+
+        return count
+
+    def wait_after_error(self, stop: threading.Event, delay: float) -> None:
+        """Logs the error of the worker and waits before it goes on with a new connection."""
+        logger.exception('Worker %s failed, retrying in %s seconds', self.worker_id, delay)
+        # The connection may be broken, the next query opens a new one.
+        connection.close()
+        stop.wait(delay)
+
+    def run(self, stop: threading.Event, interval: float, burst: bool = False) -> int:
+        """
+        Runs jobs until stop is set, waiting for the given number of seconds
+        when no job is due, and returns the number of claimed jobs.
+
+        Errors of the worker itself, such as a dropped database connection, are
+        logged and the worker goes on with a new connection after a delay doubled
+        by every consecutive error, up to MAX_ERROR_DELAY seconds.
+
+        Args:
+            burst: Return as soon as no job is due, or on the first error.
+        """
+        claimed_count = 0
+        error_count = 0
+
+        try:
+            while not stop.is_set():
+                try:
+                    count = self.run_batch(requeue_expired=not burst)
+                except Exception:
+                    if burst:
+                        raise
+
+                    error_count += 1
+                    self.wait_after_error(
+                        stop,
+                        min(interval * 2 ** (error_count - 1), MAX_ERROR_DELAY),
+                    )
+                    continue
+
+                error_count = 0
+                claimed_count += count
+
+                if count < self.batch_size:
+                    if burst:
+                        break
+
+                    stop.wait(interval)
+        finally:
+            # Worker threads are not closed by the request lifecycle.
+            connection.close()
+
+        return claimed_count
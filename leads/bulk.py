@@ -0,0 +1,134 @@
+from collections import defaultdict
+from typing import Iterable
+
+from django.db import connection, transaction
+
+from analytics.cache import invalidate_organization_reports
+from analytics.rollups import apply_changes, collect_change, get_lead_rollup_key, new_changes
+from .duplicates import link_duplicates, set_duplicate_keys
+from .models import Lead
+from .registry import status_registry
+
+BATCH_SIZE = 1000
+
+
+def collect_saved_leads(changes: defaultdict, lead_ids: Iterable[int], sign: int) -> set[int]:
+    """
+    Adds the figures of the saved leads to the rollup changes with the given sign,
+    locking the leads until the end of the transaction.
+
+    Returns:
+        set: The ids of the organizations of the leads.
+    """
+    rows = Lead.objects.select_for_update().filter(id__in=lead_ids).values_list(
+        'organization',
+        'date_created',
+        'status',
+        'manager',
+        'price',
+    ).order_by('id')
+    org_ids = set()
+
+    for org_id, day, status_id, manager_id, price in rows:
+        key = (org_id, day, status_registry.get_group(status_id), manager_id)
+        collect_change(changes, key, sign, sign * price)
+        org_ids.add(org_id)
+
+    return org_ids
+
+
+def invalidate_reports(org_ids: Iterable[int]) -> None:
+    """Invalidates the cached reports of the organizations."""
+    for org_id in org_ids:
+        if org_id is not None:
+            invalidate_organization_reports(org_id)
+
+
+def bulk_create_leads(leads: list[Lead]) -> None:
+    """
+    Inserts unsaved leads of one organization with bulk_create.
+
+    Since bulk_create sends no signals, this also maintains what the Lead
+    signal receivers maintain for single leads: the duplicate keys and links,
+    the daily rollups and the organization's cached reports. The search
+    vector is set by a database trigger.
+    """
+    if not leads:
+        return
+
+    for lead in leads:
+        set_duplicate_keys(lead)
+
+    with transaction.atomic():
+        pending_links = link_duplicates(leads)
+        Lead.objects.bulk_create(leads, batch_size=BATCH_SIZE)
+
+        for lead, original in pending_links:
+            lead.duplicate_of_id = original.id
+
+        Lead.objects.bulk_update(
+            [lead for lead, _ in pending_links],
+            ['duplicate_of'],
+            batch_size=BATCH_SIZE,
+        )
+        changes = new_changes()
+
+        for lead in leads:
+            collect_change(changes, get_lead_rollup_key(lead), 1, int(lead.price))
+
+        apply_changes(changes)
+        invalidate_reports({lead.organization_id for lead in leads})
+
+
+def bulk_update_leads(leads: list[Lead], fields: list[str]) -> None:
+    """
+    Saves the given fields of the leads with bulk_update, along with
+    their duplicate keys, daily rollups and cached reports, see bulk_create_leads.
+    """
+    if not leads:
+        return
+
+    for lead in leads:
+        set_duplicate_keys(lead)
+
+    with transaction.atomic():
+        changes = new_changes()
+        org_ids = collect_saved_leads(changes, [lead.id for lead in leads], -1)
+        Lead.objects.bulk_update(
+            leads,
+            list(fields) + ['phone_key', 'email_key'],
+            batch_size=BATCH_SIZE,
+        )
+
+        for lead in leads:
+            collect_change(changes, get_lead_rollup_key(lead), 1, int(lead.price))
+
+        apply_changes(changes)
+        invalidate_reports(org_ids)
+
+
+def bulk_delete_leads(lead_ids: list[int]) -> None:
+    """
+    Deletes the leads with a single statement, along with their figures
+    in the daily rollups and the cached reports, see bulk_create_leads.
+
+    QuerySet.delete() can't be used, as it sends post_delete for every lead.
+    The leads linked to the deleted ones as duplicates are unlinked, as
+    on_delete=SET_NULL would do.
+    """
+    if not lead_ids:
+        return
+
+    with transaction.atomic():
+        changes = new_changes()
+        org_ids = collect_saved_leads(changes, lead_ids, -1)
+        Lead.objects.filter(duplicate_of__in=lead_ids).update(duplicate_of=None)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {Lead._meta.db_table} WHERE id = ANY(%s)',
+                [list(lead_ids)],
+            )
+
+        apply_changes(changes)
+        invalidate_reports(org_ids)
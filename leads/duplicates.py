@@ -0,0 +1,203 @@
+import re
+from typing import Iterable, Iterator, Optional
+
+from django.db.models import Value
+from django.db.models.query import QuerySet
+
+from .models import Lead
+
+# Leads created without a phone get the default one, which identifies nobody.
+DEFAULT_PHONE = Lead._meta.get_field('phone').default
+COUNTRY_CODE = '7'
+# Largest number of keys looked up by one query.
+KEY_LOOKUP_BATCH_SIZE = 500
+
+
+def get_phone_key(phone: str) -> str:
+    """
+    Returns the digits of the phone number with the country code, so that
+    '8 (900) 123-45-67' and '+79001234567' have the same key. The key is empty
+    for the default phone and for numbers too short to identify a customer.
+    """
+    digits = re.sub(r'\D', '', phone or '')
+
+    if len(digits) == 10:
+        digits = COUNTRY_CODE + digits
+    elif len(digits) == 11 and digits.startswith('8'):
+        digits = COUNTRY_CODE + digits[1:]
+
+    if len(digits) < 10 or phone == DEFAULT_PHONE:
+        return ''
+
+    return digits
+
+
+def get_email_key(email: str) -> str:
+    """Returns the email without surrounding whitespace and in lower case."""
+    return (email or '').strip().lower()
+
+
+def set_duplicate_keys(lead: Lead) -> None:
+    """Sets the phone and email keys of the lead from its contacts."""
+    lead.phone_key = get_phone_key(lead.phone)
+    lead.email_key = get_email_key(lead.email)
+
+
+def get_keys(phone_key: str, email_key: str) -> list[tuple[str, str]]:
+    """Returns the non-empty keys tagged with their kind, so that they never collide."""
+    return [key for key in (('phone', phone_key), ('email', email_key)) if key[1]]
+
+
+def get_key_match_query(
+    organization_id: int,
+    key: tuple[str, str],
+    exclude_id: Optional[int] = None,
+) -> QuerySet[Lead]:
+    """
+    Returns a query of the id of the oldest lead of the organization having
+    the tagged key, the id of its original and the key.
+
+    The query reads a single entry of the organization's index of the key.
+    """
+    kind, value = key
+    leads = Lead.objects.filter(organization_id=organization_id, **{f'{kind}_key': value})
+
+    if exclude_id is not None:
+        leads = leads.exclude(pk=exclude_id)
+
+    return leads.annotate(
+        kind=Value(kind),
+        key=Value(value),
+    ).order_by('id').values_list('id', 'duplicate_of', 'kind', 'key')[:1]
+
+
+def get_key_matches(
+    organization_id: int,
+    phone_keys: set[str],
+    email_keys: set[str],
+    exclude_id: Optional[int] = None,
+) -> dict[tuple[str, str], tuple[int, int]]:
+    """
+    Returns the oldest lead of the organization having each of the given keys.
+
+    Every key is looked up by its own subquery of a union, which reads a single
+    entry of the (organization, key, id) index, so the lookup doesn't depend on
+    the number of leads sharing the key.
+
+    Returns:
+        dict: The id of the oldest lead having the key and the id of its original,
+        by tagged key, see get_keys.
+    """
+    keys = [('phone', key) for key in sorted(phone_keys - {''})]
+    keys += [('email', key) for key in sorted(email_keys - {''})]
+    matches = dict()
+
+    for start in range(0, len(keys), KEY_LOOKUP_BATCH_SIZE):
+        queries = [
+            get_key_match_query(organization_id, key, exclude_id)
+            for key in keys[start:start + KEY_LOOKUP_BATCH_SIZE]
+        ]
+        rows = queries[0].union(*queries[1:], all=True) if len(queries) > 1 else queries[0]
+
+        for match_id, duplicate_of_id, kind, key in rows:
+            matches[(kind, key)] = (match_id, duplicate_of_id or match_id)
+
+    return matches
+
+
+def find_duplicate(lead: Lead) -> Optional[int]:
+    """
+    Returns the id of the original of the oldest lead of the organization
+    with the same phone or email key as the given lead, None if there is none.
+    """
+    if lead.organization_id is None:
+        return None
+
+    matches = get_key_matches(lead.organization_id, {lead.phone_key}, {lead.email_key},
+                              exclude_id=lead.pk)
+    return min(matches.values())[1] if matches else None
+
+
+def link_duplicates(leads: list[Lead]) -> list[tuple[Lead, Lead]]:
+    """
+    Links unsaved leads of one organization with keys set to the original
+    of the oldest lead of the organization sharing either key, with a single
+    query for all of them.
+
+    Leads duplicating a lead earlier in the list can only be linked once it's
+    saved, they are returned along with that lead instead.
+    """
+    matches = get_key_matches(
+        leads[0].organization_id,
+        {lead.phone_key for lead in leads},
+        {lead.email_key for lead in leads},
+    )
+
+    # The original of every key seen so far: the id of a saved lead or an unsaved lead.
+    originals = dict()
+    pending_links = []
+
+    for lead in leads:
+        keys = get_keys(lead.phone_key, lead.email_key)
+        saved_matches = [matches[key] for key in keys if key in matches]
+
+        if saved_matches:
+            original = lead.duplicate_of_id = min(saved_matches)[1]
+        else:
+            original = next((originals[key] for key in keys if key in originals), None)
+
+            if isinstance(original, Lead):
+                pending_links.append((lead, original))
+            else:
+                lead.duplicate_of_id = original
+
+        for key in keys:
+            originals.setdefault(key, lead if original is None else original)
+
+    return pending_links
+
+
+def find_root(parents: dict[int, int], lead_id: int) -> int:
+    """Returns the oldest lead of the lead's cluster, shortening the path to it."""
+    root = lead_id
+
+    while root in parents:
+        root = parents[root]
+
+    while lead_id != root:
+        parents[lead_id], lead_id = root, parents[lead_id]
+
+    return root
+
+
+def cluster_duplicates(leads: Iterable[tuple[int, str, str]]) -> Iterator[tuple[int, int]]:
+    """
+    Groups leads sharing a phone or email key, directly or through other leads.
+
+    Args:
+        leads: The id, phone key and email key of leads of one organization, by id.
+
+    Yields:
+        tuple: The id of every lead having an older duplicate and the id of
+        the oldest lead of its cluster.
+    """
+    key_leads = dict()
+    parents = dict()
+
+    for lead_id, phone_key, email_key in leads:
+        keys = get_keys(phone_key, email_key)
+        roots = {find_root(parents, key_leads[key]) for key in keys if key in key_leads}
+
+        if roots:
+            root = min(roots)
+
+            for other_root in roots - {root}:
+                parents[other_root] = root
+
+            parents[lead_id] = root
+
+        for key in keys:
+            key_leads.setdefault(key, lead_id)
+
+    for lead_id in list(parents):
+        yield lead_id, find_root(parents, lead_id)
@@ -1,6 +1,18 @@
+import os
+from typing import Optional
+
 from django import forms
+from django.contrib.auth import get_user_model
+
+from .models import Lead, Status
+from .registry import status_registry
+
+User = get_user_model()
 
-from .models import Lead
+IMPORT_FORMAT_CHOICES = (
+    ('csv', 'CSV'),
+    ('jsonl', 'JSON Lines'),
+)
 
 
 class LeadCreateUpdateForm(forms.ModelForm):
@@ -23,4 +35,74 @@ class LeadCreateUpdateForm(forms.ModelForm):
         super().__init__(*args, **kwargs)
         self.empty_permitted = True
         self.use_required_attribute = False
+        self.set_reference_choices(managers)
+
+    def set_reference_choices(self, managers) -> None:
+        """Limits the managers to the given users and the statuses to the registered ones."""
         self.fields['manager'].queryset = managers
+        status_field = self.fields['status']
+        status_field.choices = [('', status_field.empty_label)] + status_registry.get_choices()
+
+
+class LeadImportRowForm(LeadCreateUpdateForm):
+    """
+    Validates a row of an imported file with the rules of LeadCreateUpdateForm,
+    except that the price is required, as the column can't be NULL.
+
+    The manager and the status are given by id or by username and name, and are
+    looked up in maps loaded once per import instead of querying every row.
+    """
+    manager = forms.CharField(required=False)
+    status = forms.CharField(required=False)
+
+    def __init__(self, *args, statuses: dict[str, Status], **kwargs):
+        self.statuses = statuses
+        super().__init__(*args, **kwargs)
+        self.empty_permitted = False
+        self.fields['price'].required = True
+
+    def set_reference_choices(self, managers: dict[str, User]) -> None:
+        """Remembers the map of the managers the rows can reference."""
+        self.managers = managers
+
+    def get_reference(self, references: dict, field_name: str) -> Optional[object]:
+        """Returns the object the field's value references, None if the value is empty."""
+        value = self.cleaned_data[field_name].strip().lower()
+
+        if not value:
+            return None
+
+        if value not in references:
+            raise forms.ValidationError(f'Unknown {field_name} "{value}".', code='invalid_choice')
+
+        return references[value]
+
+    def clean_manager(self) -> Optional[User]:
+        return self.get_reference(self.managers, 'manager')
+
+    def clean_status(self) -> Optional[Status]:
+        return self.get_reference(self.statuses, 'status')
+
+
+class LeadImportForm(forms.Form):
+    file = forms.FileField(label='Файл')
+    format = forms.ChoiceField(
+        label='Формат',
+        choices=[('', 'По расширению файла')] + list(IMPORT_FORMAT_CHOICES),
+        required=False,
+    )
+
+    def clean(self):
+        """Detects the format of the file by its extension if it's not chosen."""
+        cleaned_data = super().clean()
+        file = cleaned_data.get('file')
+
+        if file and not cleaned_data.get('format'):
+            extension = os.path.splitext(file.name)[1].lstrip('.').lower()
+
+            if extension not in dict(IMPORT_FORMAT_CHOICES):
+                raise forms.ValidationError('Не удалось определить формат файла, выберите его.')
+
+            cleaned_data['format'] = extension
+
+        return cleaned_data
@@ -0,0 +1,361 @@
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import IO, Any, Callable, Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import DataError, IntegrityError
+
+from jobs.models import Job
+
+from organizations.models import Membership, Organization
+from .bulk import bulk_create_leads
+from .forms import LeadImportRowForm
+from .models import Lead, Status
+from .registry import status_registry
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+IMPORT_FIELDS = LeadImportRowForm.Meta.fields
+IMPORTS_DIRECTORY = 'imports/{org_id}/{token}'
+ERRORS_FILENAME = 'errors.csv'
+PROGRESS_KEY = 'leads:import:{org_id}:{token}'
+PROGRESS_TIMEOUT = 60 * 60 * 24 * 7
+# Number of seconds without progress after which an unfinished import whose job
+# is no longer queued or running is considered failed.
+STALE_PROGRESS_TIMEOUT = 60
+
+
+@dataclass
+class ImportProgress:
+    """Numbers of the rows of an import processed so far."""
+    status: str = 'pending'
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    job_id: Optional[int] = None
+    updated_at: float = 0
+
+
+def iter_csv_rows(file: IO[bytes]) -> Iterator[tuple[int, Optional[dict[str, Any]]]]:
+    """Yields the line number and the values of every row of the CSV file, one at a time."""
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_jsonl_rows(file: IO[bytes]) -> Iterator[tuple[int, Optional[dict[str, Any]]]]:
+    """
+    Yields the line number and the object of every non-empty line of
+    the JSON Lines file, one at a time. Lines that are not JSON objects
+    are yielded as None.
+    """
+    lines = io.TextIOWrapper(file, encoding='utf-8-sig')
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+
+        yield line_number, row if isinstance(row, dict) else None
+
+
+ROW_READERS = {
+    'csv': iter_csv_rows,
+    'jsonl': iter_jsonl_rows,
+}
+
+
+def get_manager_map(organization: Organization) -> dict[str, User]:
+    """Returns the members of the organization by id and by lower-cased username."""
+    members = User.objects.filter(
+        id__in=Membership.objects.filter(organization=organization).values('user'),
+    )
+    managers = dict()
+
+    for user in members:
+        managers[str(user.id)] = user
+        managers.setdefault(user.username.lower(), user)
+
+    return managers
+
+
+def get_status_map() -> dict[str, Status]:
+    """Returns the statuses by id and by lower-cased name, the oldest one for repeated names."""
+    statuses = dict()
+
+    for status in status_registry.get_statuses():
+        statuses[str(status.id)] = status
+        statuses.setdefault(status.name.lower(), status)
+
+    return statuses
+
+
+class LeadImporter:
+    """
+    Creates leads of an organization from a stream of rows.
+
+    Rows are validated with LeadImportRowForm and valid ones are inserted with
+    bulk_create, one batch per transaction, so that memory use doesn't depend
+    on the number of rows and an interrupted import keeps the leads inserted
+    so far. Rows that fail validation are written to the error file. When the
+    database rejects a batch, its leads are inserted one at a time, so that
+    only the rejected ones are written to the error file.
+
+    The derived data of the leads is maintained by bulk_create_leads, as
+    bulk_create sends no signals.
+    """
+
+    def __init__(
+        self,
+        organization: Organization,
+        batch_size: Optional[int] = None,
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+    ):
+        self.organization = organization
+        self.batch_size = batch_size or settings.LEADS_IMPORT_BATCH_SIZE
+        self.on_progress = on_progress
+        self.managers = get_manager_map(organization)
+        self.statuses = get_status_map()
+        self.progress = ImportProgress(status='running')
+        self.error_writer = None
+
+    def validate(self, row: Optional[dict[str, Any]]) -> tuple[Optional[Lead], dict[str, list]]:
+        """Returns the unsaved lead built from the row, or the errors of the row."""
+        if row is None:
+            return None, {'__all__': ['The line is not a JSON object.']}
+
+        form = LeadImportRowForm(data=row, managers=self.managers, statuses=self.statuses)
+
+        if not form.is_valid():
+            return None, form.errors
+
+        lead = form.instance
+        lead.organization = self.organization
+        return lead, dict()
+
+    def insert(self, batch: list[tuple[int, dict[str, Any], Lead]]) -> None:
+        """
+        Inserts the leads of the batch in a single transaction along with their
+        derived data, or one at a time if the database rejects the batch.
+
+        Args:
+            batch: The line number, the values and the lead of every valid row.
+        """
+        try:
+            bulk_create_leads([lead for _, _, lead in batch])
+        except (DataError, IntegrityError):
+            for line_number, row, lead in batch:
+                self.insert_one(line_number, row, lead)
+        else:
+            self.progress.created += len(batch)
+
+    def insert_one(self, line_number: int, row: dict[str, Any], lead: Lead) -> None:
+        """Inserts the lead of a row, or writes the row to the error file if it's rejected."""
+        # The lead keeps the id returned by the rolled back insert of its batch.
+        lead.id = None
+
+        try:
+            bulk_create_leads([lead])
+        except (DataError, IntegrityError) as error:
+            self.reject(line_number, row, {'__all__': [str(error).splitlines()[0]]})
+        else:
+            self.progress.created += 1
+
+    def reject(
+        self,
+        line_number: int,
+        row: Optional[dict[str, Any]],
+        errors: dict[str, list],
+    ) -> None:
+        """Counts the row as failed and writes it to the error file with its errors."""
+        self.progress.failed += 1
+
+        if self.error_writer is not None:
+            self.error_writer.writerow([line_number, format_errors(errors)] + [
+                (row or dict()).get(field_name, '') for field_name in IMPORT_FIELDS
+            ])
+
+    def report_progress(self) -> None:
+        """Passes the current progress to the progress callback."""
+        if self.on_progress is not None:
+            self.on_progress(self.progress)
+
+    def run(
+        self,
+        rows: Iterable[tuple[int, Optional[dict[str, Any]]]],
+        error_file: Optional[IO[str]] = None,
+    ) -> ImportProgress:
+        """
+        Imports the rows and returns the final progress.
+
+        Args:
+            rows: The line number and the values of every row.
+            error_file: The text file the rejected rows are written to as CSV,
+                with their line number and errors.
+        """
+        self.error_writer = csv.writer(error_file) if error_file is not None else None
+        batch = []
+
+        if self.error_writer is not None:
+            self.error_writer.writerow(['line', 'errors'] + IMPORT_FIELDS)
+
+        for line_number, row in rows:
+            self.progress.processed += 1
+            lead, errors = self.validate(row)
+
+            if lead is not None:
+                batch.append((line_number, row, lead))
+            else:
+                self.reject(line_number, row, errors)
+
+            if len(batch) >= self.batch_size:
+                self.insert(batch)
+                batch = []
+                self.report_progress()
+
+        if batch:
+            self.insert(batch)
+
+        self.progress.status = 'done'
+        self.report_progress()
+        return self.progress
+
+
+def format_errors(errors: dict[str, list]) -> str:
+    """Returns the form errors as a single line."""
+    return '; '.join(
+        f'{field_name}: {" ".join(messages)}' if field_name != '__all__' else ' '.join(messages)
+        for field_name, messages in errors.items()
+    )
+
+
+def get_import_directory(org_id: int, token: uuid.UUID) -> str:
+    """Returns the storage directory of the import."""
+    return IMPORTS_DIRECTORY.format(org_id=org_id, token=token)
+
+
+def get_errors_path(org_id: int, token: uuid.UUID) -> str:
+    """Returns the storage path of the error file of the import."""
+    return os.path.join(get_import_directory(org_id, token), ERRORS_FILENAME)
+
+
+def is_stale(progress: ImportProgress) -> bool:
+    """
+    Returns whether the import is unfinished although its job is no longer
+    queued or running, as its worker died, and made no progress lately.
+    """
+    return (
+        progress.status in ('pending', 'running')
+        and time.time() - progress.updated_at > STALE_PROGRESS_TIMEOUT
+        and not Job.objects.filter(
+            id=progress.job_id,
+            status__in=[Job.QUEUED, Job.RUNNING],
+        ).exists()
+    )
+
+
+def delete_source(org_id: int, token: uuid.UUID) -> None:
+    """Deletes the uploaded file of the import, if it's still stored."""
+    directory = get_import_directory(org_id, token)
+
+    if not default_storage.exists(directory):
+        return
+
+    for filename in default_storage.listdir(directory)[1]:
+        if filename.startswith('source.'):
+            default_storage.delete(os.path.join(directory, filename))
+
+
+def get_import_progress(org_id: int, token: uuid.UUID) -> Optional[ImportProgress]:
+    """
+    Returns the progress of the import, None for unknown imports. Stale imports
+    are marked as failed and their uploaded file is deleted.
+    """
+    progress = cache.get(PROGRESS_KEY.format(org_id=org_id, token=token))
+
+    if progress is None:
+        return None
+
+    progress = ImportProgress(**progress)
+
+    if is_stale(progress):
+        progress.status = 'failed'
+        set_import_progress(org_id, token, progress)
+        delete_source(org_id, token)
+
+    return progress
+
+
+def set_import_progress(org_id: int, token: uuid.UUID, progress: ImportProgress) -> None:
+    """Stores the progress of the import where every process can read it."""
+    progress.updated_at = time.time()
+    key = PROGRESS_KEY.format(org_id=org_id, token=token)
+    cache.set(key, asdict(progress), timeout=PROGRESS_TIMEOUT)
+
+
+def run_import(org_id: int, token: uuid.UUID, source_path: str, import_format: str) -> None:
+    """Imports the uploaded file, stores its error file and removes the uploaded file."""
+    job_id = (get_import_progress(org_id, token) or ImportProgress()).job_id
+
+    def on_progress(progress):
+        progress.job_id = job_id
+        set_import_progress(org_id, token, progress)
+
+    try:
+        organization = Organization.objects.get(id=org_id)
+        importer = LeadImporter(organization, on_progress=on_progress)
+        importer.report_progress()
+
+        with default_storage.open(source_path, 'rb') as source, \
+                tempfile.TemporaryFile('w+', encoding='utf-8', newline='') as error_file:
+            importer.run(ROW_READERS[import_format](source), error_file)
+
+            if importer.progress.failed:
+                error_file.seek(0)
+                default_storage.save(get_errors_path(org_id, token), File(error_file))
+    except Exception:
+        logger.exception('Failed to import %s', source_path)
+        progress = get_import_progress(org_id, token) or ImportProgress(job_id=job_id)
+        progress.status = 'failed'
+        set_import_progress(org_id, token, progress)
+    finally:
+        default_storage.delete(source_path)
+
+
+def start_import(organization: Organization, file: File, import_format: str) -> uuid.UUID:
+    """
+    Stores the uploaded file and queues a job importing it, see the 'import_leads'
+    task, and returns the token of the import.
+    """
+    # The tasks module imports this one.
+    from .tasks import import_leads
+
+    token = uuid.uuid4()
+    directory = get_import_directory(organization.id, token)
+    source_path = default_storage.save(os.path.join(directory, f'source.{import_format}'), file)
+    job = import_leads.enqueue(
+        org_id=organization.id,
+        token=str(token),
+        source_path=source_path,
+        import_format=import_format,
+    )
+    set_import_progress(organization.id, token, ImportProgress(job_id=job.id))
+    return token
@@ -0,0 +1,90 @@
+import time
+from itertools import groupby
+
+from django.core.management.base import BaseCommand
+
+from leads.duplicates import cluster_duplicates, get_email_key, get_phone_key
+from leads.models import Lead
+
+
+class Command(BaseCommand):
+    help = (
+        'Sets the phone and email keys of existing leads and links every lead sharing '
+        'a phone or email with older leads of its organization to the oldest one.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--org',
+            type=int,
+            action='append',
+            dest='org_ids',
+            help='Id of the organization to process the leads of. Can be repeated.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def update_keys(self, leads, batch_size):
+        """Saves the keys of the given leads."""
+        Lead.objects.bulk_update(leads, ['phone_key', 'email_key'], batch_size=batch_size)
+
+    def update_duplicates(self, org_leads, batch_size):
+        """
+        Links the leads of one organization to the oldest lead of their cluster
+        and returns the number of changed leads.
+
+        Args:
+            org_leads: The id, phone key, email key and duplicate_of id of the leads, by id.
+        """
+        current_roots = {lead_id: root_id for lead_id, _, _, root_id in org_leads if root_id}
+        roots = dict(cluster_duplicates(
+            (lead_id, phone_key, email_key) for lead_id, phone_key, email_key, _ in org_leads
+        ))
+        changed = [
+            Lead(id=lead_id, duplicate_of_id=roots.get(lead_id))
+            for lead_id in current_roots.keys() | roots.keys()
+            if current_roots.get(lead_id) != roots.get(lead_id)
+        ]
+        Lead.objects.bulk_update(changed, ['duplicate_of'], batch_size=batch_size)
+        return len(changed)
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        leads = Lead.objects.filter(organization__isnull=False).order_by('organization', 'id')
+
+        if options['org_ids']:
+            leads = leads.filter(organization__in=options['org_ids'])
+
+        rows = leads.values_list(
+            'organization', 'id', 'phone', 'email', 'phone_key', 'email_key', 'duplicate_of',
+        ).iterator(chunk_size=batch_size)
+        started_at = time.perf_counter()
+        lead_count = key_count = duplicate_count = 0
+
+        for org_id, org_rows in groupby(rows, key=lambda row: row[0]):
+            org_leads = []
+            changed_keys = []
+
+            for _, lead_id, phone, email, phone_key, email_key, duplicate_of_id in org_rows:
+                new_phone_key, new_email_key = get_phone_key(phone), get_email_key(email)
+                org_leads.append((lead_id, new_phone_key, new_email_key, duplicate_of_id))
+
+                if (new_phone_key, new_email_key) != (phone_key, email_key):
+                    changed_keys.append(
+                        Lead(id=lead_id, phone_key=new_phone_key, email_key=new_email_key)
+                    )
+
+                if len(changed_keys) >= batch_size:
+                    self.update_keys(changed_keys, batch_size)
+                    key_count += len(changed_keys)
+                    changed_keys = []
+
+            self.update_keys(changed_keys, batch_size)
+            key_count += len(changed_keys)
+            lead_count += len(org_leads)
+            duplicate_count += self.update_duplicates(org_leads, batch_size)
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f'Processed {lead_count} leads in {elapsed:.2f}s: updated the keys of {key_count} '
+            f'and the duplicate links of {duplicate_count}'
+        ))
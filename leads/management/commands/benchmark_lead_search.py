@@ -0,0 +1,51 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from leads.models import Lead
+from leads.search import search_leads
+from organizations.models import Organization
+
+DEFAULT_QUERIES = ('Lead 123456', 'order 4242', '999999', 'seed@', '123-45', 'seed')
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures the time of searching the leads of an organization, the way the lead list '
+        'and the leads API do. Use the seed_leads command to create an organization to measure.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_id', type=int, help='Id of the organization to search.')
+        parser.add_argument(
+            '--query',
+            action='append',
+            dest='queries',
+            help='Search query to measure. Can be repeated.',
+        )
+        parser.add_argument('--repeat', type=int, default=5, help='Number of runs of each query.')
+        parser.add_argument('--limit', type=int, default=50, help='Number of returned leads.')
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options['org_id'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Organization with id {options["org_id"]} does not exist')
+
+        leads = Lead.objects.filter(organization=organization)
+        self.stdout.write(f'Organization {organization} with {leads.count()} leads')
+        self.stdout.write(f'{"Query":<20} {"Results":>8} {"Median":>10} {"Max":>10}')
+
+        for query in options['queries'] or DEFAULT_QUERIES:
+            timings = []
+
+            for _ in range(options['repeat']):
+                started_at = time.perf_counter()
+                results = list(search_leads(leads, query)[:options['limit']])
+                timings.append(time.perf_counter() - started_at)
+
+            self.stdout.write(
+                f'{query:<20} {len(results):>8} '
+                f'{statistics.median(timings) * 1000:>8.1f}ms {max(timings) * 1000:>8.1f}ms'
+            )
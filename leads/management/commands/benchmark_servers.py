@@ -0,0 +1,225 @@
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from leads.models import Lead
+from organizations.models import Organization, Membership
+
+User = get_user_model()
+
+SERVERS = (
+    ('WSGI', ['pycrm.wsgi:application']),
+    ('ASGI', ['pycrm.asgi:application', '--worker-class', 'uvicorn.workers.UvicornWorker']),
+)
+DEFAULT_CLIENT_COUNTS = (50, 200)
+SERVER_START_TIMEOUT = 30
+
+
+def get_free_port() -> int:
+    """Returns a local port no server listens on."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+async def get(port: int, path: str, cookie: str) -> int:
+    """Requests the path from the local server and returns the status code of the response."""
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write((
+        f'GET {path} HTTP/1.1\r\nHost: 127.0.0.1\r\nCookie: {cookie}\r\n'
+        f'Connection: close\r\n\r\n'
+    ).encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    await writer.wait_closed()
+    return int(response.split(b' ', 2)[1])
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the throughput and latency of the lead views and the analytics reports '
+        'served by gunicorn with sync WSGI workers and with uvicorn ASGI workers, under '
+        'the given numbers of concurrent clients. Both servers are started with the same '
+        'number of workers and settings. Reports are computed on every request unless '
+        '--cached-reports is given. A temporary member of the organization is created '
+        'and deleted afterwards. Use the seed_leads command to create an organization '
+        'to measure.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_id', type=int, help='Id of the organization to measure.')
+        parser.add_argument(
+            '--clients',
+            type=int,
+            action='append',
+            dest='client_counts',
+            help='Number of concurrent clients. Can be repeated.',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Number of requests of every view at every number of clients.',
+        )
+        parser.add_argument('--workers', type=int, default=2, help='Number of server workers.')
+        parser.add_argument(
+            '--cached-reports',
+            action='store_true',
+            help='Serve the reports from the report cache after the first request.',
+        )
+
+    def get_paths(self, organization):
+        """Returns the names and the paths of the measured views."""
+        lead = Lead.objects.filter(organization=organization).order_by('-date_created').first()
+
+        if lead is None:
+            raise CommandError(f'Organization {organization} has no leads')
+
+        kwargs = {'org_id': organization.id}
+        return [
+            ('lead list', reverse('organizations:leads:lead_list', kwargs=kwargs)),
+            ('lead detail', reverse('organizations:leads:lead_detail', kwargs={
+                **kwargs,
+                'pk': lead.id,
+            })),
+            ('general report', reverse('organizations:analytics:general_report', kwargs=kwargs)),
+            ('manager report', reverse('organizations:analytics:manager_report', kwargs=kwargs)),
+            ('period report', reverse('organizations:analytics:period_report', kwargs=kwargs)),
+        ]
+
+    def start_server(self, arguments, workers, cached_reports):
+        """
+        Starts gunicorn and waits until it accepts connections.
+
+        Returns:
+            tuple: The server process and the port it listens on.
+        """
+        port = get_free_port()
+        env = dict(os.environ)
+
+        if not cached_reports:
+            env['ANALYTICS_CACHE_TIMEOUT'] = '0'
+
+        process = subprocess.Popen(
+            ['gunicorn', *arguments, '--bind', f'127.0.0.1:{port}', '--workers', str(workers),
+             '--log-level', 'warning'],
+            cwd=settings.BASE_DIR,
+            env=env,
+        )
+        started_at = time.monotonic()
+
+        while time.monotonic() - started_at < SERVER_START_TIMEOUT:
+            if process.poll() is not None:
+                raise CommandError(f'The server exited with status {process.returncode}')
+
+            try:
+                socket.create_connection(('127.0.0.1', port)).close()
+                return process, port
+            except ConnectionRefusedError:
+                time.sleep(0.1)
+
+        process.terminate()
+        raise CommandError('The server did not start')
+
+    async def load(self, port, path, cookie, client_count, request_count):
+        """
+        Requests the path the given number of times from concurrent clients.
+
+        Returns:
+            tuple: The duration in seconds, the latencies of the successful
+            requests and the number of failed requests.
+        """
+        requests = iter(range(request_count))
+        latencies = []
+        errors = []
+
+        async def client():
+            for _ in requests:
+                started_at = time.perf_counter()
+
+                try:
+                    status = await get(port, path, cookie)
+                except OSError as error:
+                    status = error
+
+                if status == 200:
+                    latencies.append(time.perf_counter() - started_at)
+                else:
+                    errors.append(status)
+
+        started_at = time.perf_counter()
+        await asyncio.gather(*(client() for _ in range(client_count)))
+        return time.perf_counter() - started_at, latencies, len(errors)
+
+    def measure_server(self, port, paths, cookie, options):
+        """Writes the throughput and the latencies of every view at every number of clients."""
+        for _, path in paths:
+            # Warms up the workers and the caches of the organization context.
+            *_, error_count = asyncio.run(
+                self.load(port, path, cookie, options['workers'], options['workers'])
+            )
+
+            if error_count:
+                raise CommandError(f'The server failed to serve {path}')
+
+        for client_count in options['client_counts'] or DEFAULT_CLIENT_COUNTS:
+            for name, path in paths:
+                elapsed, latencies, error_count = asyncio.run(
+                    self.load(port, path, cookie, client_count, options['requests'])
+                )
+                p50, p95 = (
+                    statistics.quantiles(latencies, n=20)[index] * 1000 for index in (9, 18)
+                ) if len(latencies) > 1 else (0, 0)
+                yield (
+                    f'{client_count:>7} {name:<15} {len(latencies) / elapsed:>8.1f} '
+                    f'{p50:>8.1f}ms {p95:>8.1f}ms {error_count:>7}'
+                )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options['org_id'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Organization with id {options["org_id"]} does not exist')
+
+        paths = self.get_paths(organization)
+        user = User.objects.create_user(username=f'benchmark-{uuid.uuid4().hex[:8]}')
+        Membership.objects.create(user=user, organization=organization)
+        client = Client()
+        client.force_login(user)
+        session_key = client.cookies[settings.SESSION_COOKIE_NAME].value
+        cookie = f'{settings.SESSION_COOKIE_NAME}={session_key}'
+
+        try:
+            for server_name, arguments in SERVERS:
+                process, port = self.start_server(
+                    arguments,
+                    options['workers'],
+                    options['cached_reports'],
+                )
+                self.stdout.write(f'{server_name} with {options["workers"]} workers')
+                self.stdout.write(
+                    f'{"Clients":>7} {"View":<15} {"req/s":>8} {"p50":>10} {"p95":>10} '
+                    f'{"Errors":>7}'
+                )
+
+                try:
+                    for row in self.measure_server(port, paths, cookie, options):
+                        self.stdout.write(row)
+                finally:
+                    process.terminate()
+                    process.wait()
+        finally:
+            Session.objects.filter(session_key=session_key).delete()
+            user.delete()
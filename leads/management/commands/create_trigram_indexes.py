@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from leads.models import Lead
+from leads.search import TRIGRAM_INDEXES
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates the pg_trgm extension and the trigram indexes matching parts of lead emails '
+        'and phones, which migration 0011 skips when the extension is not available. '
+        'Restart the web servers afterwards, so that searches use them.'
+    )
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+
+            if cursor.fetchone() is None:
+                raise CommandError(
+                    'The pg_trgm extension is not available on the database server. '
+                    'Install the contrib modules of PostgreSQL and run the command again.'
+                )
+
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+            for index_name, column in TRIGRAM_INDEXES.items():
+                # An interrupted concurrent build leaves an invalid index behind.
+                cursor.execute(
+                    'SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(%s)',
+                    [index_name],
+                )
+
+                if (cursor.fetchone() or [False])[0]:
+                    cursor.execute(f'DROP INDEX CONCURRENTLY "{index_name}"')
+
+                self.stdout.write(f'Creating {index_name}')
+                # The expression matches the one of the icontains lookup.
+                cursor.execute(
+                    f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index_name}" '
+                    f'ON {Lead._meta.db_table} USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+                )
+
+        self.stdout.write(self.style.SUCCESS('Trigram indexes created'))
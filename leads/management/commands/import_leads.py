@@ -0,0 +1,69 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from leads.imports import ROW_READERS, LeadImporter
+from organizations.models import Organization
+
+
+class Command(BaseCommand):
+    help = (
+        'Imports leads into an organization from a CSV file with a header or a JSON Lines file, '
+        'and writes the rejected rows with their errors to a CSV file.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_id', type=int, help='Id of the organization to import leads in.')
+        parser.add_argument('path', help='Path of the file to import.')
+        parser.add_argument(
+            '--format',
+            choices=list(ROW_READERS),
+            help='Format of the file, detected by its extension by default.',
+        )
+        parser.add_argument(
+            '--errors',
+            help='Path of the error file, the imported file path with .errors.csv by default.',
+        )
+        parser.add_argument('--batch-size', type=int, help='Number of leads per transaction.')
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options['org_id'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Organization with id {options["org_id"]} does not exist')
+
+        path = options['path']
+        import_format = options['format'] or os.path.splitext(path)[1].lstrip('.').lower()
+
+        if import_format not in ROW_READERS:
+            raise CommandError(f'Unknown format of {path}, use --format')
+
+        errors_path = options['errors'] or f'{os.path.splitext(path)[0]}.errors.csv'
+        started_at = time.perf_counter()
+
+        def on_progress(progress):
+            elapsed = time.perf_counter() - started_at
+            self.stdout.write(
+                f'{progress.processed} rows, {progress.created} created, '
+                f'{progress.failed} failed, {progress.processed / elapsed:.0f} rows/s'
+            )
+
+        importer = LeadImporter(organization, options['batch_size'], on_progress)
+
+        with open(path, 'rb') as file, \
+                open(errors_path, 'w', encoding='utf-8', newline='') as error_file:
+            progress = importer.run(ROW_READERS[import_format](file), error_file)
+
+        if not progress.failed:
+            os.remove(errors_path)
+
+        elapsed = time.perf_counter() - started_at
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {progress.created} of {progress.processed} rows in {elapsed:.2f}s'
+        ))
+
+        if progress.failed:
+            self.stdout.write(self.style.WARNING(
+                f'{progress.failed} rows were rejected, see {errors_path}'
+            ))
@@ -0,0 +1,72 @@
+import random
+from itertools import islice
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from leads.models import Lead, Status
+from organizations.models import Membership, Organization
+
+
+class Command(BaseCommand):
+    help = (
+        'Creates random leads in an organization for benchmarking, '
+        'spread over the last days, and rebuilds its daily rollups.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_id', type=int, help='Id of the organization to create leads in.')
+        parser.add_argument('--count', type=int, default=1000, help='Number of leads to create.')
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=365,
+            help='Number of days, ending today, the leads are created over.',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def iter_leads(self, organization, count, statuses, manager_ids):
+        """Yields unsaved leads with random prices, statuses and managers."""
+        for number in range(count):
+            yield Lead(
+                first_name='Seed',
+                last_name=f'Lead {number}',
+                order=f'Seed order {number}',
+                price=random.randint(100, 100000),
+                comment='',
+                status=random.choice(statuses) if statuses else None,
+                manager_id=random.choice(manager_ids) if manager_ids else None,
+                organization=organization,
+            )
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options['org_id'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Organization with id {options["org_id"]} does not exist')
+
+        statuses = list(Status.objects.all())
+        manager_ids = list(
+            Membership.objects.filter(organization=organization).values_list('user', flat=True)
+        )
+        leads = self.iter_leads(organization, options['count'], statuses, manager_ids)
+        first_id = None
+
+        with transaction.atomic():
+            while batch := list(islice(leads, options['batch_size'])):
+                created = Lead.objects.bulk_create(batch)
+                first_id = first_id or created[0].id
+
+            if first_id is not None:
+                # date_created is set to today on insert, spread the leads over the range.
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        f'UPDATE {Lead._meta.db_table} '
+                        'SET date_created = date_created - (id %% %s)::integer '
+                        'WHERE id >= %s AND organization_id = %s',
+                        [options['days'], first_id, organization.id],
+                    )
+
+        self.stdout.write(self.style.SUCCESS(f'Created {options["count"]} leads'))
+        call_command('rebuild_lead_rollups', org=organization.id, stdout=self.stdout)
@@ -0,0 +1,77 @@
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+from django.db.models import Max, OuterRef, Subquery
+import django.db.models.deletion
+
+BATCH_SIZE = 10000
+
+
+def set_lead_organizations(apps, schema_editor):
+    """
+    Sets the organization of every lead from its organization name, in batches
+    of consecutive ids, each committed on its own, so that the table is never
+    locked for long. A name shared by several organizations is mapped to the
+    oldest one. Leads whose name matches no organization keep no organization.
+    """
+    Lead = apps.get_model('leads', 'Lead')
+    Organization = apps.get_model('organizations', 'Organization')
+    organization_ids = Organization.objects.filter(
+        name=OuterRef('organization_name'),
+    ).order_by('id').values('id')[:1]
+    max_id = Lead.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        Lead.objects.filter(
+            id__gte=start,
+            id__lt=start + BATCH_SIZE,
+            organization__isnull=True,
+        ).update(organization=Subquery(organization_ids))
+
+
+def set_lead_organization_names(apps, schema_editor):
+    Lead = apps.get_model('leads', 'Lead')
+    Organization = apps.get_model('organizations', 'Organization')
+    organization_names = Organization.objects.filter(
+        id=OuterRef('organization'),
+    ).values('name')[:1]
+    max_id = Lead.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        Lead.objects.filter(
+            id__gte=start,
+            id__lt=start + BATCH_SIZE,
+            organization__isnull=False,
+        ).update(organization_name=Subquery(organization_names))
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('organizations', '0002_alter_membership_role'),
+        ('leads', '0008_alter_lead_organization'),
+    ]
+
+    operations = [
+        migrations.RenameField(
+            model_name='lead',
+            old_name='organization',
+            new_name='organization_name',
+        ),
+        # The index is built concurrently once the organizations are set, so that
+        # neither adding the field nor setting it locks the leads table.
+        migrations.AddField(
+            model_name='lead',
+            name='organization',
+            field=models.ForeignKey(db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='leads', to='organizations.organization'),
+        ),
+        migrations.RunPython(set_lead_organizations, set_lead_organization_names),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization'], name='lead_organization_idx'),
+        ),
+        migrations.RemoveField(
+            model_name='lead',
+            name='organization_name',
+        ),
+    ]
@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('organizations', '0002_alter_membership_role'),
+        ('leads', '0009_lead_organization_foreign_key'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization', 'date_created', 'id'], name='lead_org_date_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization', 'status'], name='lead_org_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization', 'manager'], name='lead_org_manager_idx'),
+        ),
+        # The organization index is redundant with the indexes above.
+        RemoveIndexConcurrently(
+            model_name='lead',
+            name='lead_organization_idx',
+        ),
+    ]
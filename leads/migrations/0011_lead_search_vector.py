@@ -0,0 +1,115 @@
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+from django.db.models import Max
+
+BATCH_SIZE = 10000
+
+# Weights rank name matches first, then the order, the contacts and the comment.
+# Emails are also split into words and phones into digit groups, as well as
+# joined into a single number, so that they match however they are typed.
+CREATE_SEARCH_VECTOR_FUNCTION = '''
+CREATE OR REPLACE FUNCTION leads_lead_search_vector(
+    first_name text, last_name text, "order" text, email text, phone text, comment text
+) RETURNS tsvector AS $$
+    SELECT
+        setweight(to_tsvector('simple', coalesce(first_name, '') || ' ' || coalesce(last_name, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce("order", '')), 'B')
+        || setweight(to_tsvector('simple', concat_ws(
+            ' ',
+            email,
+            regexp_replace(coalesce(email, ''), '[^[:alnum:]]+', ' ', 'g'),
+            regexp_replace(coalesce(phone, ''), '[^0-9]+', ' ', 'g'),
+            regexp_replace(coalesce(phone, ''), '[^0-9]+', '', 'g')
+        )), 'C')
+        || setweight(to_tsvector('simple', coalesce(comment, '')), 'D')
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION leads_lead_search_vector_trigger() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector := leads_lead_search_vector(
+        NEW.first_name, NEW.last_name, NEW."order", NEW.email, NEW.phone, NEW.comment
+    );
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER leads_lead_search_vector_update
+    BEFORE INSERT OR UPDATE OF first_name, last_name, "order", email, phone, comment, search_vector
+    ON leads_lead FOR EACH ROW EXECUTE FUNCTION leads_lead_search_vector_trigger();
+'''
+
+DROP_SEARCH_VECTOR_FUNCTION = '''
+DROP TRIGGER IF EXISTS leads_lead_search_vector_update ON leads_lead;
+DROP FUNCTION IF EXISTS leads_lead_search_vector_trigger();
+DROP FUNCTION IF EXISTS leads_lead_search_vector(text, text, text, text, text, text);
+'''
+
+TRIGRAM_INDEXES = {
+    'lead_email_trgm_idx': 'email',
+    'lead_phone_trgm_idx': 'phone',
+}
+
+
+def set_search_vectors(apps, schema_editor):
+    """Computes the search vectors of the existing leads in batches, each committed on its own."""
+    Lead = apps.get_model('leads', 'Lead')
+    max_id = Lead.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+
+    for start in range(0, max_id + 1, BATCH_SIZE):
+        # Writing the column makes the trigger compute it.
+        Lead.objects.filter(id__gte=start, id__lt=start + BATCH_SIZE).update(search_vector=None)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Creates the trigram indexes used by partial email and phone matches
+    if the pg_trgm extension is available on the server. Searches work
+    without them, but only match whole words of emails and phones. Once
+    the extension is installed, the create_trigram_indexes command creates
+    the indexes of an already migrated database.
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+
+        if cursor.fetchone() is None:
+            return
+
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+        # The expressions match the ones of the icontains lookup.
+        for index_name, column in TRIGRAM_INDEXES.items():
+            cursor.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{index_name}" ON leads_lead '
+                f'USING gin (UPPER("{column}"::text) gin_trgm_ops)'
+            )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        for index_name in TRIGRAM_INDEXES:
+            cursor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS "{index_name}"')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('leads', '0010_lead_organization_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='lead',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunSQL(CREATE_SEARCH_VECTOR_FUNCTION, DROP_SEARCH_VECTOR_FUNCTION),
+        migrations.RunPython(set_search_vectors, migrations.RunPython.noop),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='lead_search_vector_idx'),
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
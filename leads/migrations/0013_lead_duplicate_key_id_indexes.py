@@ -0,0 +1,31 @@
+from django.contrib.postgres.operations import AddIndexConcurrently, RemoveIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('organizations', '0002_alter_membership_role'),
+        ('leads', '0012_lead_duplicate_keys'),
+    ]
+
+    operations = [
+        # The oldest lead having a key is found by reading one entry of these indexes.
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization', 'phone_key', 'id'], name='lead_org_phone_key_id_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='lead',
+            index=models.Index(fields=['organization', 'email_key', 'id'], name='lead_org_email_key_id_idx'),
+        ),
+        RemoveIndexConcurrently(
+            model_name='lead',
+            name='lead_org_phone_key_idx',
+        ),
+        RemoveIndexConcurrently(
+            model_name='lead',
+            name='lead_org_email_key_idx',
+        ),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+
+from organizations.models import Organization
 
 User = get_user_model()
 
@@ -40,9 +44,34 @@ class Lead(models.Model):
     manager = models.ForeignKey(User, blank=True, null=True,
                                 on_delete=models.SET_NULL, default=None)
     status = models.ForeignKey(Status, on_delete=models.SET_NULL, blank=True, null=True)
-    organization = models.CharField(max_length=100, blank=False, null=False, default='NoneOrg')
+    # Nullable only for the leads whose organization name matched no organization
+    # when the name column was converted, see migration 0009. Not indexed on its own,
+    # as every index below starts with it.
+    organization = models.ForeignKey(Organization, null=True, on_delete=models.CASCADE,
+                                     related_name='leads', db_index=False)
     date_created = models.DateField(auto_now_add=True)
     date_updated = models.DateField(auto_now_add=True)
+    # Maintained by a database trigger from the names, the order, the contacts
+    # and the comment, see migration 0011.
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Normalized contacts used to find duplicates, set on every save, see leads.duplicates.
+    phone_key = models.CharField(max_length=20, blank=True, default='', editable=False)
+    email_key = models.CharField(max_length=254, blank=True, default='', editable=False)
+    duplicate_of = models.ForeignKey('self', blank=True, null=True, on_delete=models.SET_NULL,
+                                     related_name='duplicates', editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['organization', 'date_created', 'id'],
+                         name='lead_org_date_created_idx'),
+            models.Index(fields=['organization', 'status'], name='lead_org_status_idx'),
+            models.Index(fields=['organization', 'manager'], name='lead_org_manager_idx'),
+            GinIndex(fields=['search_vector'], name='lead_search_vector_idx'),
+            models.Index(fields=['organization', 'phone_key', 'id'],
+                         name='lead_org_phone_key_id_idx'),
+            models.Index(fields=['organization', 'email_key', 'id'],
+                         name='lead_org_email_key_id_idx'),
+        ]
 
     def __str__(self) -> str:
         """
@@ -0,0 +1,153 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date
+from typing import Any, Optional, Union
+
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.query import QuerySet
+
+from .models import Lead
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+@dataclass
+class KeysetPage:
+    """A page of leads and the cursors of its neighbouring pages, None if there is none."""
+    object_list: list[Union[Lead, dict[str, Any]]]
+    next_cursor: Optional[str]
+    previous_cursor: Optional[str]
+
+
+def encode_cursor(lead: Union[Lead, dict[str, Any]], reverse: bool) -> str:
+    """
+    Returns a cursor pointing at the given lead, a model instance or
+    a dictionary of its values including the creation date and the id.
+
+    A forward cursor points at the leads older than the lead,
+    a reverse cursor at the leads newer than the lead.
+    """
+    if isinstance(lead, dict):
+        position = [lead['date_created'].isoformat(), lead['id'], reverse]
+    else:
+        position = [lead.date_created.isoformat(), lead.id, reverse]
+
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[date, int, bool]:
+    """Returns the creation date and id of the lead the cursor points at and its direction."""
+    try:
+        day, lead_id, reverse = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(day), int(lead_id), bool(reverse)
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as error:
+        raise InvalidCursor(cursor) from error
+
+
+def get_page_size(value: Optional[str]) -> int:
+    """Returns the page size requested by the client, the default one if missing or invalid."""
+    try:
+        page_size = int(value)
+    except (TypeError, ValueError):
+        return settings.LEADS_PAGE_SIZE
+
+    return min(max(page_size, 1), settings.LEADS_MAX_PAGE_SIZE)
+
+
+class KeysetPaginator:
+    """
+    Paginates leads from the newest to the oldest by (date_created, id).
+
+    Pages are selected by comparing the keys with the ones of the lead at the
+    cursor rather than by an offset, so that any page costs the same as the
+    first one and inserted or deleted leads don't shift the pages.
+
+    The queryset may return dictionaries with values(), as long as they
+    include the creation date and the id.
+    """
+    ordering = ('-date_created', '-id')
+
+    def __init__(self, queryset: QuerySet[Lead], page_size: int):
+        self.queryset = queryset
+        self.page_size = page_size
+
+    def get_older_leads(self, day: date, lead_id: int) -> QuerySet[Lead]:
+        """Returns the leads after the given keys in the pagination order."""
+        # The date_created bound lets the (organization, date_created, id) index
+        # start the scan at the cursor.
+        return self.queryset.filter(
+            Q(date_created__lt=day) | Q(date_created=day, id__lt=lead_id),
+            date_created__lte=day,
+        ).order_by(*self.ordering)
+
+    def get_newer_leads(self, day: date, lead_id: int) -> QuerySet[Lead]:
+        """Returns the leads before the given keys, in the reverse pagination order."""
+        return self.queryset.filter(
+            Q(date_created__gt=day) | Q(date_created=day, id__gt=lead_id),
+            date_created__gte=day,
+        ).order_by('date_created', 'id')
+
+    def get_page_queryset(self, cursor: Optional[str] = None) -> tuple[QuerySet[Lead], bool, bool]:
+        """
+        Returns the leads of the page the cursor points at, one more than the
+        page size, in the order they are scanned in, whether they are scanned
+        in the reverse pagination order and whether there is a previous page.
+
+        Raises:
+            InvalidCursor: If the cursor can't be decoded.
+        """
+        if not cursor:
+            return self.queryset.order_by(*self.ordering)[:self.page_size + 1], False, False
+
+        day, lead_id, reverse = decode_cursor(cursor)
+
+        if not reverse:
+            return self.get_older_leads(day, lead_id)[:self.page_size + 1], False, True
+
+        return self.get_newer_leads(day, lead_id)[:self.page_size + 1], True, False
+
+    def get_page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """
+        Returns the page the cursor points at, the first page without cursor.
+
+        Raises:
+            InvalidCursor: If the cursor can't be decoded.
+        """
+        queryset, reverse, has_previous = self.get_page_queryset(cursor)
+        return self.build_page(list(queryset), reverse, has_previous)
+
+    async def aget_page(self, cursor: Optional[str] = None) -> KeysetPage:
+        """Async version of get_page."""
+        queryset, reverse, has_previous = self.get_page_queryset(cursor)
+        return self.build_page([lead async for lead in queryset], reverse, has_previous)
+
+    def build_page(self, leads: list[Lead], reverse: bool, has_previous: bool) -> KeysetPage:
+        """Returns the page of the leads returned by the queryset of get_page_queryset."""
+        if not reverse:
+            return self.get_forward_page(leads, has_previous)
+
+        has_previous = len(leads) > self.page_size
+        object_list = leads[:self.page_size][::-1]
+        return KeysetPage(
+            object_list=object_list,
+            next_cursor=encode_cursor(object_list[-1], reverse=False) if object_list else None,
+            previous_cursor=encode_cursor(object_list[0], reverse=True) if has_previous else None,
+        )
+
+    def get_forward_page(self, leads: list[Lead], has_previous: bool) -> KeysetPage:
+        """Returns the page of the leads fetched in the pagination order, one more than needed."""
+        object_list = leads[:self.page_size]
+        has_next = len(leads) > self.page_size
+        return KeysetPage(
+            object_list=object_list,
+            next_cursor=encode_cursor(object_list[-1], reverse=False) if has_next else None,
+            previous_cursor=(
+                encode_cursor(object_list[0], reverse=True)
+                if has_previous and object_list else None
+            ),
+        )
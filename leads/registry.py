@@ -0,0 +1,131 @@
+import threading
+import time
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Status
+
+VERSION_KEY = 'leads:status_registry:version'
+
+
+class StatusRegistry:
+    """
+    Process-local registry of the statuses, loaded once and reused by every request.
+
+    The registry is invalidated through a version stored in the default cache,
+    which is bumped whenever a status is saved or deleted. The current process
+    sees it right away, other processes check it at most every
+    STATUS_REGISTRY_VERSION_CHECK_INTERVAL seconds, so that looking up the
+    statuses of many leads makes no round trip to the cache. The version only
+    reaches other processes with a shared cache such as redis, so the statuses
+    are also reloaded every STATUS_REGISTRY_TIMEOUT seconds whatever the version.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._version = None
+        self._loaded_at = None
+        self._checked_at = None
+        self._statuses = dict()
+
+    def _get_shared_version(self) -> int:
+        """Returns the version of the statuses in the default cache, initializing it if missing."""
+        version = cache.get(VERSION_KEY)
+
+        if version is None:
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+            version = cache.get(VERSION_KEY)
+
+        return version
+
+    def _load(self, version: int) -> None:
+        """Loads every status from the database."""
+        statuses = {status.id: status for status in Status.objects.order_by('id')}
+
+        with self._lock:
+            self._statuses = statuses
+            self._version = version
+            self._loaded_at = time.monotonic()
+
+    def _get_statuses(self, reload: bool = False) -> dict[int, Status]:
+        """
+        Returns the statuses by id, reloading them if they changed since they were loaded
+        or were loaded more than STATUS_REGISTRY_TIMEOUT seconds ago.
+        """
+        now = time.monotonic()
+        version = self._version
+
+        if (
+            reload
+            or self._checked_at is None
+            or now - self._checked_at >= settings.STATUS_REGISTRY_VERSION_CHECK_INTERVAL
+        ):
+            version = self._get_shared_version()
+            self._checked_at = now
+
+        expired = (
+            self._loaded_at is None
+            or now - self._loaded_at >= settings.STATUS_REGISTRY_TIMEOUT
+        )
+
+        if reload or expired or version != self._version:
+            self._load(version)
+
+        return self._statuses
+
+    def get_status(self, status_id: Optional[int]) -> Optional[Status]:
+        """
+        Returns the status with the given id, None if there is none.
+
+        Unknown ids make the registry reload once, as the status may have been
+        created by another process whose invalidation isn't visible yet.
+        """
+        if status_id is None:
+            return None
+
+        statuses = self._get_statuses()
+
+        if status_id not in statuses:
+            statuses = self._get_statuses(reload=True)
+
+        return statuses.get(status_id)
+
+    def get_group(self, status_id: Optional[int]) -> str:
+        """Returns the group of the status with the given id, an empty string if there is none."""
+        status = self.get_status(status_id)
+        return status.group if status is not None else ''
+
+    def get_statuses(self) -> list[Status]:
+        """Returns all the statuses ordered by id."""
+        return list(self._get_statuses().values())
+
+    def get_choices(self) -> list[tuple[int, str]]:
+        """Returns the ids and names of the statuses as form field choices."""
+        return [(status.id, str(status)) for status in self.get_statuses()]
+
+    def invalidate(self) -> None:
+        """
+        Makes every process reload the statuses, right away and once again
+        when the current transaction is committed, so that statuses loaded
+        by another process before the commit are not kept afterwards.
+        """
+        self._bump_version()
+        transaction.on_commit(self._bump_version)
+
+    def _bump_version(self) -> None:
+        """
+        Increments the version of the statuses stored in the default cache,
+        and makes the current process check it on the next lookup.
+        """
+        self._checked_at = None
+
+        try:
+            cache.incr(VERSION_KEY)
+        except ValueError:
+            cache.add(VERSION_KEY, time.time_ns(), timeout=None)
+
+
+status_registry = StatusRegistry()
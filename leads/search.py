@@ -0,0 +1,118 @@
+import operator
+import re
+from functools import cache, reduce
+from typing import Optional
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.query import QuerySet
+
+from .models import Lead
+
+SEARCH_CONFIG = 'simple'
+# Queries this long with a digit or an @ are also matched as parts of emails and phones.
+CONTACT_FRAGMENT_MIN_LENGTH = 3
+# Indexes of the columns matched as substrings, created by migration 0011 if the pg_trgm
+# extension is available, or later by the create_trigram_indexes command.
+TRIGRAM_INDEXES = {
+    'lead_email_trgm_idx': 'email',
+    'lead_phone_trgm_idx': 'phone',
+}
+# Matches are ranked among the newest this many leads matching the text, so that
+# words found in most leads of an organization don't make every match ranked.
+SEARCH_CANDIDATES_LIMIT = 1000
+# Number of the newest leads of an organization the matches are first looked for in.
+# Larger windows make PostgreSQL scan every match through the search indexes instead.
+SEARCH_RECENT_LEADS = 2 * SEARCH_CANDIDATES_LIMIT
+
+
+def get_search_query(text: str) -> Optional[SearchQuery]:
+    """
+    Returns a full-text query matching the leads with every word of the text,
+    the last one possibly being the beginning of a word as it's still typed.
+    None if the text has no words.
+    """
+    words = re.findall(r'\w+', text.lower())
+
+    if not words:
+        return None
+
+    terms = ' & '.join(words[:-1] + [f'{words[-1]}:*'])
+    return SearchQuery(terms, search_type='raw', config=SEARCH_CONFIG)
+
+
+@cache
+def has_trigram_indexes() -> bool:
+    """Returns True if the email and phone columns have trigram indexes."""
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(cursor, Lead._meta.db_table)
+
+    return all(index_name in constraints for index_name in TRIGRAM_INDEXES)
+
+
+def is_contact_fragment(text: str) -> bool:
+    """Returns True if the text may be a part of an email or a phone number."""
+    return len(text) >= CONTACT_FRAGMENT_MIN_LENGTH and bool(re.search(r'[\d@]', text))
+
+
+def get_candidates(leads: QuerySet[Lead], matching_leads: QuerySet[Lead]) -> list[int]:
+    """
+    Returns the ids of the newest SEARCH_CANDIDATES_LIMIT matching leads,
+    with as few rows read as possible whether few or most leads match.
+    """
+    newest_matching_leads = matching_leads.order_by('-date_created', '-id')
+    recent_leads = leads.order_by('-date_created', '-id').values('id')[:SEARCH_RECENT_LEADS]
+    # Broad queries match enough of the newest leads, found through the date index.
+    candidates = list(newest_matching_leads.filter(id__in=recent_leads).values_list(
+        'id',
+        flat=True,
+    )[:SEARCH_CANDIDATES_LIMIT])
+
+    if len(candidates) == SEARCH_CANDIDATES_LIMIT:
+        return candidates
+
+    # Selective queries are answered from the search indexes alone.
+    candidates = list(matching_leads.values_list('id', flat=True)[:SEARCH_CANDIDATES_LIMIT + 1])
+
+    if len(candidates) <= SEARCH_CANDIDATES_LIMIT:
+        return candidates
+
+    # Queries matching many older leads but few recent ones scan the date index further.
+    return list(newest_matching_leads.values_list('id', flat=True)[:SEARCH_CANDIDATES_LIMIT])
+
+
+def search_leads(leads: QuerySet[Lead], text: str) -> QuerySet[Lead]:
+    """
+    Returns the given leads matching the text, the most relevant first.
+
+    The text is matched against the names, order, email, phone and comment
+    through the search vector and its GIN index. Where the trigram indexes
+    exist, parts of emails and phones are matched as substrings as well.
+
+    When more leads than SEARCH_CANDIDATES_LIMIT match, only the newest ones
+    are ranked, so that broad queries cost about as much as selective ones.
+    Older leads are then only found by narrower queries.
+    """
+    text = text.strip()
+    query = get_search_query(text)
+    matches = []
+
+    if query is not None:
+        matches.append(Q(search_vector=query))
+
+    if is_contact_fragment(text) and has_trigram_indexes():
+        matches.append(Q(email__icontains=text) | Q(phone__icontains=text))
+
+    if not matches:
+        return leads.none()
+
+    if query is not None:
+        rank = SearchRank(F('search_vector'), query)
+    else:
+        rank = Value(0.0, output_field=FloatField())
+
+    candidates = get_candidates(leads, leads.filter(reduce(operator.or_, matches)).order_by())
+    return Lead.objects.filter(id__in=candidates).annotate(
+        rank=rank,
+    ).order_by('-rank', '-date_created', '-id')
@@ -0,0 +1,25 @@
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .duplicates import find_duplicate, set_duplicate_keys
+from .models import Lead, Status
+from .registry import status_registry
+
+
+@receiver(post_save, sender=Status)
+@receiver(post_delete, sender=Status)
+def invalidate_status_registry(sender, instance: Status, **kwargs) -> None:
+    """Makes every process reload the statuses."""
+    status_registry.invalidate()
+
+
+@receiver(pre_save, sender=Lead)
+def set_lead_duplicate_keys(sender, instance: Lead, raw: bool = False, **kwargs) -> None:
+    """Sets the contact keys of the lead and links a new lead to its probable original."""
+    if raw:
+        return
+
+    set_duplicate_keys(instance)
+
+    if instance.pk is None and instance.duplicate_of_id is None:
+        instance.duplicate_of_id = find_duplicate(instance)
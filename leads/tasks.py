@@ -0,0 +1,13 @@
+import uuid
+
+from jobs.tasks import task
+from .imports import run_import
+
+
+@task(max_attempts=1)
+def import_leads(org_id: int, token: str, source_path: str, import_format: str) -> None:
+    """
+    Imports an uploaded file of leads, see run_import. The job is not retried,
+    as the leads inserted before a failure would be inserted again.
+    """
+    run_import(org_id, uuid.UUID(token), source_path, import_format)
@@ -0,0 +1,97 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from organizations.models import Organization, Membership
+from ..models import Lead
+
+User = get_user_model()
+
+
+class LeadAPIFieldsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='FieldsUser')
+        cls.organization = Organization.objects.create(name='FieldsOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        cls.leads = [
+            Lead.objects.create(
+                first_name=f'Ivan {number}',
+                last_name='Petrov',
+                order='Windows',
+                price=100,
+                comment='A long comment',
+                organization=cls.organization,
+            )
+            for number in range(3)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def get(self, name, params, **kwargs):
+        url = reverse(f'organizations:leads_api:{name}', kwargs={
+            'org_id': self.organization.id,
+            **kwargs,
+        })
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+
+        lead_queries = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and 'FROM "leads_lead"' in query['sql']
+        ]
+        return response, lead_queries
+
+    def test_fields_limit_response_and_columns(self):
+        response, queries = self.get('lead_list_create', {
+            'fields': 'id,first_name,status',
+            'page_size': 2,
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0], {
+            'id': self.leads[2].id,
+            'first_name': 'Ivan 2',
+            'status': None,
+        })
+        self.assertIsNotNone(response.data['next'])
+        # The cursor is built without loading the deferred columns.
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('"comment"', queries[0])
+        self.assertNotIn('"price"', queries[0])
+
+    def test_exclude_limits_response_and_columns(self):
+        response, queries = self.get('lead_retrieve_update_destroy', {'exclude': 'comment'},
+                                     pk=self.leads[0].id)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('comment', response.data)
+        self.assertEqual(response.data['first_name'], 'Ivan 0')
+        self.assertNotIn('"comment"', queries[0])
+
+    def test_default_response_does_not_load_internal_columns(self):
+        response, queries = self.get('lead_list_create', {})
+
+        self.assertIn('comment', response.data['results'][0])
+        self.assertNotIn('search_vector', queries[0])
+        self.assertNotIn('phone_key', queries[0])
+
+    def test_search_fields(self):
+        response, queries = self.get('lead_search', {'q': 'ivan', 'fields': 'id,last_name'})
+
+        self.assertEqual(len(response.data), 3)
+        self.assertEqual(set(response.data[0]), {'id', 'last_name'})
+        self.assertNotIn('"comment"', queries[-1])
+
+    def test_unknown_field(self):
+        response, _ = self.get('lead_list_create', {'fields': 'id,search_vector'})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
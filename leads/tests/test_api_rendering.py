@@ -0,0 +1,80 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from leads_api.renderers import ORJSONRenderer
+from leads_api.serializers import LeadSerializer
+from organizations.models import Organization, Membership
+from ..models import Lead, Status
+
+User = get_user_model()
+
+
+class LeadListFastPathTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='FastUser')
+        cls.organization = Organization.objects.create(name='FastOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        status = Status.objects.create(name='Fast', group='Done')
+        cls.leads = [
+            Lead.objects.create(
+                first_name='Иван',
+                last_name=f'Lead {number}',
+                order='Windows "large"',
+                price=100 * number,
+                email='ivan@mail.ru',
+                comment='Line\u2028separator',
+                manager=cls.user if number % 2 else None,
+                status=status if number % 3 else None,
+                organization=cls.organization,
+            )
+            for number in range(5)
+        ]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('organizations:leads_api:lead_list_create', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def render_with_serializer(self, response, leads, **kwargs):
+        data = dict(response.data, results=LeadSerializer(leads, many=True, **kwargs).data)
+        return JSONRenderer().render(data)
+
+    def test_page_matches_serializer_output(self):
+        response = self.client.get(self.url, {'page_size': 3})
+        leads = Lead.objects.filter(id__in=[lead.id for lead in self.leads[2:]])
+
+        self.assertEqual(response['Content-Type'], 'application/json')
+        self.assertEqual(response.content,
+                         self.render_with_serializer(response, leads.order_by('-id')))
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([lead['id'] for lead in response.data['results']],
+                         [self.leads[1].id, self.leads[0].id])
+
+    def test_sparse_page_matches_serializer_output(self):
+        fields = ['first_name', 'manager', 'status']
+        response = self.client.get(self.url, {'fields': ','.join(fields)})
+        leads = Lead.objects.filter(organization=self.organization).order_by('-id')
+
+        self.assertEqual(response.content,
+                         self.render_with_serializer(response, leads, fields=fields))
+
+    def test_renderer_matches_json_renderer(self):
+        data = {
+            'text': 'Line\u2028separator',
+            1: [1.5, None, True],
+            'day': self.leads[0].date_created,
+        }
+
+        self.assertEqual(ORJSONRenderer().render(data), JSONRenderer().render(data))
+        self.assertEqual(
+            ORJSONRenderer().render(data, 'application/json; indent=4'),
+            JSONRenderer().render(data, 'application/json; indent=4'),
+        )
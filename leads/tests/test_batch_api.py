@@ -0,0 +1,144 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from analytics.models import LeadDailyRollup
+from organizations.models import Organization, Membership
+from ..models import Lead, Status
+
+User = get_user_model()
+
+
+class LeadBatchAPITest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='BatchUser')
+        cls.organization = Organization.objects.create(name='BatchOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        cls.other_organization = Organization.objects.create(name='OtherBatchOrg')
+        cls.status = Status.objects.create(name='Batch', group='In progress')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('organizations:leads_api:lead_batch', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def create_lead(self, organization=None, **fields):
+        return Lead.objects.create(
+            first_name='Ivan',
+            last_name='Petrov',
+            order='Windows',
+            price=100,
+            comment='',
+            organization=organization or self.organization,
+            **fields,
+        )
+
+    def get_lead_data(self, number, **fields):
+        return {
+            'first_name': f'Lead {number}',
+            'last_name': 'Batch',
+            'order': 'Doors',
+            'price': 200,
+            'phone': f'+7(900)000-00-{number:02d}',
+            'comment': '',
+            **fields,
+        }
+
+    def post(self, operations):
+        return self.client.post(self.url, operations, format='json')
+
+    def test_batch_applies_operations_and_reports_each(self):
+        updated = self.create_lead(phone='+7(911)222-33-44')
+        deleted = self.create_lead()
+        other = self.create_lead(self.other_organization)
+
+        response = self.post([
+            {'op': 'create', 'data': self.get_lead_data(
+                1, manager=self.user.id, status=self.status.id,
+            )},
+            {'op': 'create', 'data': self.get_lead_data(2, price='abc')},
+            {'op': 'update', 'id': updated.id, 'data': {'price': 300, 'status': self.status.id}},
+            {'op': 'update', 'id': other.id, 'data': {'price': 300}},
+            {'op': 'delete', 'id': deleted.id},
+            {'op': 'delete', 'id': deleted.id},
+            {'op': 'move', 'id': updated.id},
+        ])
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual([result['status'] for result in results],
+                         [201, 400, 200, 404, 204, 400, 400])
+        self.assertEqual(results[0]['data']['manager'], self.user.id)
+        self.assertIn('price', results[1]['errors'])
+        self.assertEqual(results[2]['data']['price'], 300)
+
+        created = Lead.objects.get(id=results[0]['data']['id'])
+        self.assertEqual((created.organization, created.status), (self.organization, self.status))
+        updated.refresh_from_db()
+        self.assertEqual((updated.price, updated.status, updated.first_name),
+                         (300, self.status, 'Ivan'))
+        self.assertFalse(Lead.objects.filter(id=deleted.id).exists())
+        self.assertEqual(Lead.objects.get(id=other.id).price, 100)
+
+        rollups = LeadDailyRollup.objects.filter(organization=self.organization)
+        self.assertEqual(
+            list(rollups.order_by('status_group', 'manager').values_list(
+                'status_group', 'manager', 'lead_count', 'price_sum',
+            )),
+            [('', None, 0, 0), ('In progress', self.user.id, 1, 200),
+             ('In progress', None, 1, 300)],
+        )
+
+    def test_batch_maintains_duplicate_links(self):
+        original = self.create_lead(email='ivan@mail.ru')
+        duplicate = self.create_lead(email='IVAN@mail.ru')
+
+        response = self.post([
+            {'op': 'create', 'data': self.get_lead_data(1, email='ivan@MAIL.ru')},
+            {'op': 'update', 'id': duplicate.id, 'data': {'email': 'new@mail.ru'}},
+            {'op': 'delete', 'id': original.id},
+        ])
+
+        results = response.data['results']
+        self.assertEqual(results[0]['data']['duplicate_of'], original.id)
+        self.assertEqual(Lead.objects.get(id=duplicate.id).email_key, 'new@mail.ru')
+        self.assertIsNone(Lead.objects.get(id=results[0]['data']['id']).duplicate_of_id)
+
+    def test_batch_query_count_does_not_grow_with_operations(self):
+        def count_queries(size):
+            leads = [self.create_lead() for _ in range(2 * size)]
+            operations = [
+                {'op': 'create', 'data': self.get_lead_data(number, manager=self.user.id)}
+                for number in range(size)
+            ] + [
+                {'op': 'update', 'id': lead.id, 'data': {'price': 500}} for lead in leads[:size]
+            ] + [
+                {'op': 'delete', 'id': lead.id} for lead in leads[size:]
+            ]
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.post(operations)
+
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        # The first batch loads the statuses.
+        count_queries(1)
+        self.assertEqual(count_queries(3), count_queries(30))
+
+    def test_batch_rejects_invalid_payload(self):
+        self.assertEqual(self.post({'op': 'create'}).status_code, 400)
+
+        with self.settings(LEADS_API_MAX_BATCH_SIZE=1):
+            response = self.post([{'op': 'delete', 'id': 1}, {'op': 'delete', 'id': 2}])
+
+        self.assertEqual(response.status_code, 400)
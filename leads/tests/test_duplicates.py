@@ -0,0 +1,117 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from organizations.models import Organization, Membership
+from ..duplicates import get_email_key, get_phone_key
+from ..models import Lead
+
+User = get_user_model()
+
+
+class DuplicateKeysTest(TestCase):
+
+    def test_phone_key(self):
+        self.assertEqual(get_phone_key('+7 (911) 222-33-44'), '79112223344')
+        self.assertEqual(get_phone_key('8 911 222 33 44'), '79112223344')
+        self.assertEqual(get_phone_key('9112223344'), '79112223344')
+        self.assertEqual(get_phone_key('222-33-44'), '')
+        self.assertEqual(get_phone_key('+7(900)123-45-67'), '')
+
+    def test_email_key(self):
+        self.assertEqual(get_email_key(' Ivan@Mail.RU '), 'ivan@mail.ru')
+        self.assertEqual(get_email_key(''), '')
+
+
+class DuplicateDetectionTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='DuplicateUser')
+        cls.organization = Organization.objects.create(name='DuplicateOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        cls.original = cls.create_lead(cls.organization, phone='+7(911)222-33-44',
+                                       email='Ivan@mail.ru')
+
+    @classmethod
+    def create_lead(cls, organization, **contacts):
+        return Lead.objects.create(
+            first_name='Ivan',
+            last_name='Petrov',
+            order='Windows',
+            price=100,
+            comment='',
+            organization=organization,
+            **contacts,
+        )
+
+    def test_new_lead_with_same_phone_or_email_is_linked(self):
+        by_phone = self.create_lead(self.organization, phone='89112223344')
+        by_email = self.create_lead(self.organization, email='ivan@MAIL.ru')
+
+        self.assertIsNone(self.original.duplicate_of_id)
+        self.assertEqual(by_phone.duplicate_of_id, self.original.id)
+        self.assertEqual(by_email.duplicate_of_id, self.original.id)
+        self.assertEqual(by_phone.phone_key, '79112223344')
+
+    def test_duplicate_of_duplicate_is_linked_to_original(self):
+        by_phone = self.create_lead(self.organization, phone='89112223344', email='new@mail.ru')
+        by_new_email = self.create_lead(self.organization, email='new@mail.ru')
+
+        self.assertEqual(by_new_email.duplicate_of_id, by_phone.duplicate_of_id)
+        self.assertEqual(by_new_email.duplicate_of_id, self.original.id)
+
+    def test_leads_of_other_organization_and_default_phone_are_not_duplicates(self):
+        other_organization = Organization.objects.create(name='OtherDuplicateOrg')
+        other_lead = self.create_lead(other_organization, phone='+7(911)222-33-44')
+        default_phone_lead = self.create_lead(self.organization)
+        another_default_phone_lead = self.create_lead(self.organization)
+
+        self.assertIsNone(other_lead.duplicate_of_id)
+        self.assertIsNone(default_phone_lead.duplicate_of_id)
+        self.assertIsNone(another_default_phone_lead.duplicate_of_id)
+
+    def test_api_create_links_duplicate(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('organizations:leads_api:lead_list_create', kwargs={
+            'org_id': self.organization.id,
+        })
+        response = client.post(url, {
+            'first_name': 'Ivan',
+            'last_name': 'Petrov',
+            'order': 'Doors',
+            'price': 200,
+            'email': 'ivan@mail.ru',
+            'phone': '+7(999)000-00-00',
+            'comment': '',
+        })
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['duplicate_of'], self.original.id)
+        self.assertNotIn('email_key', response.data)
+
+    def test_backfill_clusters_existing_leads(self):
+        by_email = self.create_lead(self.organization, phone='+7(922)000-00-00',
+                                    email='maria@mail.ru')
+        by_both = self.create_lead(self.organization, phone='+7(922)000-00-00',
+                                   email='IVAN@mail.ru')
+        unrelated = self.create_lead(self.organization, phone='+7(933)000-00-00')
+        Lead.objects.update(phone_key='', email_key='', duplicate_of=None)
+        Lead.objects.filter(id=unrelated.id).update(duplicate_of=self.original)
+
+        call_command('backfill_lead_duplicates', org_ids=[self.organization.id],
+                     stdout=io.StringIO())
+
+        duplicates = dict(Lead.objects.values_list('id', 'duplicate_of'))
+        self.assertEqual(duplicates, {
+            self.original.id: None,
+            by_email.id: self.original.id,
+            by_both.id: self.original.id,
+            unrelated.id: None,
+        })
+        self.assertEqual(Lead.objects.get(id=by_both.id).email_key, 'ivan@mail.ru')
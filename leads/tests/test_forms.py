@@ -1,6 +1,10 @@
+from django.contrib.auth import get_user_model
 from django.test import TestCase
 
 from ..forms import LeadCreateUpdateForm
+from ..models import Status
+
+User = get_user_model()
 
 
 class LeadCreateUpdateFormTest(TestCase):
@@ -38,3 +42,13 @@ class LeadCreateUpdateFormTest(TestCase):
 
     def test_empty_phone(self):
         self.assert_form_invalid({'phone': ''})
+
+    def test_status_choices_are_loaded_once(self):
+        status = Status.objects.create(name='Form status', group='New')
+        LeadCreateUpdateForm(managers=User.objects.none()).as_p()
+
+        with self.assertNumQueries(0):
+            form = LeadCreateUpdateForm(managers=User.objects.none())
+            form.as_p()
+
+        self.assertIn((status.id, 'Form status'), list(form.fields['status'].choices))
@@ -0,0 +1,225 @@
+import csv
+import io
+import json
+import os
+import tempfile
+import uuid
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from analytics.models import LeadDailyRollup
+from jobs.models import Job
+from jobs.worker import Worker
+from organizations.models import Organization, Membership
+from .. import imports
+from ..models import Lead, Status
+
+User = get_user_model()
+
+CSV_HEADER = 'first_name,last_name,order,price,email,phone,comment,manager,status\n'
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class LeadImportTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='Importer')
+        cls.organization = Organization.objects.create(name='ImportOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        cls.status = Status.objects.create(name='Imported', group='In progress')
+        cls.existing = Lead.objects.create(
+            first_name='Old',
+            last_name='Lead',
+            order='Windows',
+            price=100,
+            email='old@mail.ru',
+            phone='+7(911)222-33-44',
+            comment='',
+            organization=cls.organization,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def import_rows(self, rows, batch_size=2):
+        error_file = io.StringIO()
+        importer = imports.LeadImporter(self.organization, batch_size=batch_size)
+        progress = importer.run(rows, error_file)
+        return progress, list(csv.reader(io.StringIO(error_file.getvalue())))
+
+    def test_import_csv(self):
+        file = io.BytesIO((
+            CSV_HEADER
+            + 'Ivan,Petrov,Doors,200,ivan@mail.ru,+7(900)000-00-01,,importer,imported\n'
+            + 'Maria,Ivanova,Windows,abc,maria@mail.ru,+7(900)000-00-02,,,\n'
+            + f'Petr,Sidorov,Roof,300,,+7(900)000-00-03,call,{self.user.id},{self.status.id}\n'
+            + 'Anna,Smirnova,Roof,400,,+7(900)000-00-04,,nobody,\n'
+        ).encode())
+
+        progress, errors = self.import_rows(imports.iter_csv_rows(file))
+
+        self.assertEqual((progress.processed, progress.created, progress.failed), (4, 2, 2))
+        self.assertEqual(progress.status, 'done')
+        imported = Lead.objects.filter(organization=self.organization).exclude(id=self.existing.id)
+        self.assertEqual(
+            list(imported.order_by('id').values_list('first_name', 'manager', 'status')),
+            [('Ivan', self.user.id, self.status.id), ('Petr', self.user.id, self.status.id)],
+        )
+        self.assertEqual([row[:3] for row in errors[1:]], [
+            ['3', 'price: Enter a whole number.', 'Maria'],
+            ['5', 'manager: Unknown manager "nobody".', 'Anna'],
+        ])
+
+    def test_import_jsonl(self):
+        rows = [
+            {'first_name': 'Ivan', 'last_name': 'Petrov', 'order': 'Doors', 'price': 200,
+             'phone': '+7(900)000-00-01', 'comment': '', 'status': 'IMPORTED'},
+            [],
+            {'first_name': 'Maria'},
+        ]
+        file = io.BytesIO('\n'.join(json.dumps(row) for row in rows).encode() + b'\n\nnot json\n')
+
+        progress, errors = self.import_rows(imports.iter_jsonl_rows(file))
+
+        self.assertEqual((progress.processed, progress.created, progress.failed), (4, 1, 3))
+        self.assertEqual(Lead.objects.get(first_name='Ivan').status, self.status)
+        self.assertEqual([row[0] for row in errors[1:]], ['2', '3', '5'])
+
+    def test_empty_price_rejected(self):
+        file = io.BytesIO((CSV_HEADER + 'Ivan,Petrov,Doors,,,+7(900)000-00-01,,,\n').encode())
+
+        progress, errors = self.import_rows(imports.iter_csv_rows(file))
+
+        self.assertEqual((progress.created, progress.failed), (0, 1))
+        self.assertEqual(errors[1][:2], ['2', 'price: This field is required.'])
+
+    def test_rows_of_rejected_batch_inserted_one_at_a_time(self):
+        bulk_create_leads = imports.bulk_create_leads
+
+        def reject_bad_leads(leads):
+            if any(lead.first_name == 'Bad' for lead in leads):
+                raise IntegrityError('Bad lead\nDETAIL: on purpose')
+
+            bulk_create_leads(leads)
+
+        rows = [
+            (line_number, {'first_name': first_name, 'last_name': 'L', 'order': 'O',
+                           'price': 10, 'comment': '', 'phone': f'+7(900)000-00-0{line_number}'})
+            for line_number, first_name in enumerate(['Good', 'Bad', 'Better'], start=2)
+        ]
+
+        with mock.patch.object(imports, 'bulk_create_leads', side_effect=reject_bad_leads):
+            progress, errors = self.import_rows(iter(rows), batch_size=3)
+
+        self.assertEqual((progress.processed, progress.created, progress.failed), (3, 2, 1))
+        self.assertEqual(errors[1][:3], ['3', 'Bad lead', 'Bad'])
+        self.assertEqual(
+            sorted(Lead.objects.exclude(id=self.existing.id).values_list('first_name', flat=True)),
+            ['Better', 'Good'],
+        )
+
+    def test_import_maintains_rollups_and_duplicates(self):
+        rows = [
+            (2, {'first_name': 'A', 'last_name': 'A', 'order': 'A', 'price': 10, 'comment': '',
+                 'phone': '8 911 222 33 44', 'status': str(self.status.id)}),
+            (3, {'first_name': 'B', 'last_name': 'B', 'order': 'B', 'price': 20, 'comment': '',
+                 'phone': '+7(922)000-00-00', 'email': 'new@mail.ru'}),
+            (4, {'first_name': 'C', 'last_name': 'C', 'order': 'C', 'price': 30, 'comment': '',
+                 'phone': '+7(933)000-00-00', 'email': 'NEW@mail.ru'}),
+            (5, {'first_name': 'D', 'last_name': 'D', 'order': 'D', 'price': 40, 'comment': '',
+                 'phone': '+7(922)000-00-00'}),
+        ]
+
+        self.import_rows(iter(rows), batch_size=3)
+
+        duplicates = dict(Lead.objects.values_list('first_name', 'duplicate_of__first_name'))
+        self.assertEqual(duplicates, {'Old': None, 'A': 'Old', 'B': None, 'C': 'B', 'D': 'B'})
+        rollups = LeadDailyRollup.objects.filter(organization=self.organization)
+        self.assertEqual(
+            sorted(rollups.values_list('status_group', 'lead_count', 'price_sum')),
+            [('', 4, 190), ('In progress', 1, 10)],
+        )
+        self.assertTrue(Lead.objects.filter(search_vector__isnull=False, first_name='D').exists())
+
+    def test_import_leads_command(self):
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'leads.csv')
+
+        with open(path, 'w') as file:
+            file.write(CSV_HEADER + 'Ivan,Petrov,Doors,200,,+7(900)000-00-01,,,\n,,,,,,,,\n')
+
+        call_command('import_leads', self.organization.id, path, stdout=io.StringIO())
+
+        self.assertTrue(Lead.objects.filter(first_name='Ivan').exists())
+
+        with open(os.path.join(directory, 'leads.errors.csv')) as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+    def test_upload_queues_import(self):
+        self.client.force_login(self.user)
+        url = reverse('organizations:leads:lead_import', kwargs={'org_id': self.organization.id})
+        file = SimpleUploadedFile(
+            'leads.csv',
+            (CSV_HEADER + 'Ivan,Petrov,Doors,200,,+7(900)000-00-01,,,\n').encode(),
+        )
+
+        response = self.client.post(url, {'file': file})
+
+        job = Job.objects.get()
+        self.assertEqual(job.task, 'leads.tasks.import_leads')
+        self.assertRedirects(response, reverse('organizations:leads:lead_import_status', kwargs={
+            'org_id': self.organization.id,
+            'token': job.kwargs['token'],
+        }))
+        self.assertTrue(default_storage.exists(job.kwargs['source_path']))
+        self.assertContains(self.client.get(response.url), 'Импорт ожидает очереди')
+
+        Worker(['default']).run_once()
+
+        self.assertTrue(Lead.objects.filter(first_name='Ivan').exists())
+        self.assertFalse(default_storage.exists(job.kwargs['source_path']))
+        self.assertContains(self.client.get(response.url), 'Импорт завершен')
+
+    def test_stale_import_failed(self):
+        token = uuid.uuid4()
+        source_path = default_storage.save(
+            os.path.join(imports.get_import_directory(self.organization.id, token), 'source.csv'),
+            ContentFile(CSV_HEADER.encode()),
+        )
+        job = Job.objects.create(task='leads.tasks.import_leads', status=Job.DEAD)
+        progress = imports.ImportProgress(status='running', job_id=job.id)
+        imports.set_import_progress(self.organization.id, token, progress)
+        self.assertEqual(imports.get_import_progress(self.organization.id, token).status, 'running')
+
+        with mock.patch.object(imports.time, 'time', return_value=progress.updated_at + 61):
+            self.assertEqual(
+                imports.get_import_progress(self.organization.id, token).status,
+                'failed',
+            )
+
+        self.assertFalse(default_storage.exists(source_path))
+        self.assertEqual(imports.get_import_progress(self.organization.id, token).status, 'failed')
+
+    def test_import_errors_download(self):
+        self.client.force_login(self.user)
+        token = '00000000-0000-0000-0000-000000000000'
+        url = reverse('organizations:leads:lead_import_errors', kwargs={
+            'org_id': self.organization.id,
+            'token': token,
+        })
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        default_storage.save(imports.get_errors_path(self.organization.id, token),
+                             ContentFile(b'line,errors\n'))
+        response = self.client.get(url)
+        self.assertEqual(b''.join(response.streaming_content), b'line,errors\n')
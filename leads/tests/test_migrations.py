@@ -0,0 +1,45 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class LeadOrganizationMigrationTest(TransactionTestCase):
+    migrate_from = [
+        ('organizations', '0002_alter_membership_role'),
+        ('leads', '0008_alter_lead_organization'),
+        ('analytics', '0001_initial'),
+    ]
+    migrate_to = [('leads', '0009_lead_organization_foreign_key')]
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_organization_names_are_mapped_to_ids(self):
+        apps = self.migrate(self.migrate_from)
+        Organization = apps.get_model('organizations', 'Organization')
+        Lead = apps.get_model('leads', 'Lead')
+        first = Organization.objects.create(name='First')
+        Organization.objects.create(name='First')
+        second = Organization.objects.create(name='Second')
+
+        for name in ('First', 'Second', 'Missing'):
+            Lead.objects.create(
+                first_name='Test',
+                last_name='Lead',
+                order=name,
+                price=100,
+                comment='',
+                organization=name,
+            )
+
+        apps = self.migrate(self.migrate_to)
+        Lead = apps.get_model('leads', 'Lead')
+        organizations = dict(Lead.objects.values_list('order', 'organization'))
+        self.assertEqual(organizations, {'First': first.id, 'Second': second.id, 'Missing': None})
@@ -4,6 +4,7 @@ from django.contrib.auth import get_user_model
 
 from datetime import date
 
+from organizations.models import Organization
 from ..models import Lead, Status
 
 User = get_user_model()
@@ -15,7 +16,8 @@ class LeadModelTest(TestCase):
     def setUpTestData(cls):
         status = Status.objects.create(name='TestStatus')
         user = User.objects.create(username='TestUser')
-        Lead.objects.create(
+        cls.organization = Organization.objects.create(name='Test Organization')
+        cls.lead = Lead.objects.create(
             first_name='TestFirstname',
             last_name='TestLastname',
             order='Test Order',
@@ -25,18 +27,18 @@ class LeadModelTest(TestCase):
             comment='Test comment',
             manager=user,
             status=status,
-            organization='Test Organization',
+            organization=cls.organization,
         )
 
     def test_email_field_validation(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         self.assertEqual(lead.email, 'TestEmail@test.test')
         lead.email = 'invalid_email'
         with self.assertRaises(ValidationError):
             lead.full_clean()
 
     def test_default_values(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         default = lead._meta.get_field('comment').default
         self.assertIsNone(default)
 
@@ -44,13 +46,13 @@ class LeadModelTest(TestCase):
         self.assertIsNone(default)
 
     def test_phone_field_validation(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         lead.phone = ''
         with self.assertRaises(ValidationError):
             lead.full_clean()
 
     def test_values(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         self.assertEqual(lead.first_name, 'TestFirstname')
         self.assertEqual(lead.last_name, 'TestLastname')
         self.assertEqual(lead.order, 'Test Order')
@@ -58,29 +60,29 @@ class LeadModelTest(TestCase):
         self.assertEqual(lead.email, 'TestEmail@test.test')
         self.assertEqual(lead.phone, '+7(999)888-77-66')
         self.assertEqual(lead.comment, 'Test comment')
-        self.assertEqual(lead.organization, 'Test Organization')
+        self.assertEqual(lead.organization, self.organization)
 
     def test_integer_fields(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         self.assertIsInstance(lead.price, int)
 
     def test_related_fields_value_types(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         self.assertIsInstance(lead.manager, User)
         self.assertIsInstance(lead.status, Status)
 
     def test_date_fields_auto_add(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         self.assertIsNotNone(lead.date_created)
         self.assertIsNotNone(lead.date_updated)
 
     def test_date_fields_type(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         self.assertIsInstance(lead.date_created, date)
         self.assertIsInstance(lead.date_updated, date)
 
     def test_null_fields(self):
-        lead = Lead.objects.get(pk=1)
+        lead = Lead.objects.get(pk=self.lead.pk)
         is_null = lead._meta.get_field('manager').null
         self.assertTrue(is_null)
 
@@ -92,9 +94,9 @@ class StatusModelTest(TestCase):
 
     @classmethod
     def setUpTestData(cls):
-        status = Status.objects.create(name='TestStatus', group=Status.GROUP_CHOICES[2][1])
+        cls.status = Status.objects.create(name='TestStatus', group=Status.GROUP_CHOICES[2][1])
 
     def test_values(self):
-        status = Status.objects.get(pk=2)
+        status = Status.objects.get(pk=self.status.pk)
         self.assertEqual(status.name, 'TestStatus')
         self.assertEqual(status.group, Status.GROUP_CHOICES[2][1])
@@ -0,0 +1,138 @@
+from datetime import date, timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from organizations.models import Organization, Membership
+from ..models import Lead
+from ..pagination import InvalidCursor, KeysetPaginator, get_page_size
+
+User = get_user_model()
+
+
+class KeysetPaginationTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='PageUser')
+        cls.organization = Organization.objects.create(name='PageOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+
+        for number in range(7):
+            lead = Lead.objects.create(
+                first_name='Page',
+                last_name=f'Lead {number}',
+                order='Test order',
+                price=100,
+                comment='',
+                organization=cls.organization,
+            )
+            # Two leads a day, so that pages are split within a day too.
+            Lead.objects.filter(pk=lead.pk).update(
+                date_created=date(2023, 7, 1) + timedelta(days=number // 2),
+            )
+
+        cls.leads = list(
+            Lead.objects.filter(organization=cls.organization).order_by('-date_created', '-id')
+        )
+
+
+class KeysetPaginatorTest(KeysetPaginationTestCase):
+
+    def get_paginator(self, page_size=3):
+        return KeysetPaginator(Lead.objects.filter(organization=self.organization), page_size)
+
+    def test_pages_forward_and_backward(self):
+        paginator = self.get_paginator()
+        first_page = paginator.get_page()
+        self.assertEqual(first_page.object_list, self.leads[:3])
+        self.assertIsNone(first_page.previous_cursor)
+
+        second_page = paginator.get_page(first_page.next_cursor)
+        self.assertEqual(second_page.object_list, self.leads[3:6])
+
+        last_page = paginator.get_page(second_page.next_cursor)
+        self.assertEqual(last_page.object_list, self.leads[6:])
+        self.assertIsNone(last_page.next_cursor)
+
+        page = paginator.get_page(last_page.previous_cursor)
+        self.assertEqual(page.object_list, self.leads[3:6])
+
+        page = paginator.get_page(page.previous_cursor)
+        self.assertEqual(page.object_list, self.leads[:3])
+        self.assertIsNone(page.previous_cursor)
+        self.assertEqual(page.next_cursor, first_page.next_cursor)
+
+    def test_cursor_is_stable_after_new_leads(self):
+        paginator = self.get_paginator()
+        cursor = paginator.get_page().next_cursor
+        Lead.objects.create(
+            first_name='New',
+            last_name='Lead',
+            order='Test order',
+            price=100,
+            comment='',
+            organization=self.organization,
+        )
+        self.assertEqual(paginator.get_page(cursor).object_list, self.leads[3:6])
+
+    def test_invalid_cursor(self):
+        for cursor in ('invalid', 'W10=', 'WyJ4IiwgMSwgZmFsc2Vd'):
+            with self.assertRaises(InvalidCursor):
+                self.get_paginator().get_page(cursor)
+
+    @override_settings(LEADS_PAGE_SIZE=20, LEADS_MAX_PAGE_SIZE=100)
+    def test_page_size(self):
+        self.assertEqual(get_page_size(None), 20)
+        self.assertEqual(get_page_size('abc'), 20)
+        self.assertEqual(get_page_size('5'), 5)
+        self.assertEqual(get_page_size('0'), 1)
+        self.assertEqual(get_page_size('1000'), 100)
+
+
+class LeadListPaginationTest(KeysetPaginationTestCase):
+
+    def setUp(self):
+        self.client.force_login(self.user)
+        self.url = reverse('organizations:leads:lead_list', kwargs={'org_id': self.organization.id})
+
+    def test_lead_list_pages(self):
+        response = self.client.get(self.url, {'page_size': 4})
+        self.assertEqual(list(response.context['leads']), self.leads[:4])
+        self.assertIsNone(response.context['previous_page_query'])
+
+        response = self.client.get(f'{self.url}?{response.context["next_page_query"]}')
+        self.assertEqual(list(response.context['leads']), self.leads[4:])
+        self.assertIsNone(response.context['next_page_query'])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
+
+
+class LeadAPIPaginationTest(KeysetPaginationTestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = reverse('organizations:leads_api:lead_list_create', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def test_lead_api_pages(self):
+        response = self.client.get(self.url, {'page_size': 4})
+        ids = [lead['id'] for lead in response.data['results']]
+        self.assertEqual(ids, [lead.id for lead in self.leads[:4]])
+        self.assertIsNone(response.data['previous'])
+
+        response = self.client.get(response.data['next'])
+        ids = [lead['id'] for lead in response.data['results']]
+        self.assertEqual(ids, [lead.id for lead in self.leads[4:]])
+        self.assertIsNone(response.data['next'])
+        self.assertIn('page_size=4', response.data['previous'])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(self.url, {'cursor': 'invalid'})
+        self.assertEqual(response.status_code, 404)
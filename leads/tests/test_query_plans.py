@@ -0,0 +1,149 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from analytics.views import LeadMixin
+from leads_api.views import LeadListCreateAPIView
+from organizations.models import Organization, Membership
+from ..duplicates import get_key_match_query
+from ..models import Lead, Status
+from ..pagination import KeysetPaginator
+from ..search import search_leads
+
+User = get_user_model()
+
+
+class LeadQueryPlanTest(TestCase):
+    """
+    Checks that the queries behind the lead views and analytics read the leads
+    of an organization through an index rather than a sequential scan.
+
+    Sequential scans are disabled while explaining the queries, as the planner
+    prefers them on tables as small as the test ones. A sequential scan in a plan
+    thus means that no index matches the query.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(5):
+            Status.objects.create(name=f'Status {number}', group=Status.GROUP_CHOICES[number][0])
+
+        cls.organization = Organization.objects.create(name='LargeOrg')
+        other_organization = Organization.objects.create(name='OtherOrg')
+
+        # The other organization is larger, so that the leads of one status
+        # or manager in every organization are more than in the large one.
+        for organization, count in ((cls.organization, 5000), (other_organization, 15000)):
+            for number in range(3):
+                user = User.objects.create(username=f'{organization.name}Manager{number}')
+                Membership.objects.create(user=user, organization=organization)
+
+            call_command('seed_leads', organization.id, count=count, stdout=StringIO())
+
+        cls.status = Status.objects.first()
+        cls.manager = User.objects.filter(membership__organization=cls.organization).first()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {Lead._meta.db_table}')
+
+    def setUp(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SET enable_seqscan = off')
+
+    def tearDown(self):
+        with connection.cursor() as cursor:
+            cursor.execute('RESET enable_seqscan')
+
+    def get_lead_scans(self, queryset):
+        """Returns the node types and index names of the plan nodes scanning the Lead table."""
+        plan = json.loads(queryset.explain(format='json'))[0]['Plan']
+        nodes = [plan]
+        scans = []
+
+        while nodes:
+            node = nodes.pop()
+            nodes.extend(node.get('Plans', []))
+
+            if node.get('Relation Name') == Lead._meta.db_table or (
+                node.get('Index Name', '').startswith('lead')
+            ):
+                scans.append((node['Node Type'], node.get('Index Name')))
+
+        return scans
+
+    def assertUsesIndex(self, queryset, index_name):
+        scans = self.get_lead_scans(queryset)
+        self.assertNotIn('Seq Scan', [node_type for node_type, _ in scans])
+        self.assertIn(index_name, [name for _, name in scans])
+
+    def test_lead_list(self):
+        leads = Lead.objects.filter(organization=self.organization).order_by('-date_created', '-id')
+        self.assertUsesIndex(leads[:25], 'lead_org_date_created_idx')
+
+    def test_deep_lead_list_page(self):
+        leads = Lead.objects.filter(organization=self.organization)
+        last_lead = leads.order_by('date_created', 'id').first()
+        paginator = KeysetPaginator(leads, 25)
+        older_leads = paginator.get_older_leads(last_lead.date_created, last_lead.id)
+        self.assertUsesIndex(older_leads[:26], 'lead_org_date_created_idx')
+
+    def test_lead_search(self):
+        # Whether the search vector or the organization index is picked depends
+        # on the size of the organization, see the benchmark_lead_search command.
+        leads = search_leads(Lead.objects.filter(organization=self.organization), '1234')
+        scans = self.get_lead_scans(leads[:50])
+        self.assertNotIn('Seq Scan', [node_type for node_type, _ in scans])
+
+    def test_lead_search_by_contact_fragment(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+
+            if cursor.fetchone() is None:
+                self.skipTest('pg_trgm is not installed')
+
+        leads = search_leads(Lead.objects.filter(organization=self.organization), '123-45')
+        self.assertUsesIndex(leads[:50], 'lead_phone_trgm_idx')
+
+    def test_duplicate_lookup(self):
+        for kind, key in (('phone', '79001234567'), ('email', 'lead@example.com')):
+            query = get_key_match_query(self.organization.id, (kind, key))
+            self.assertUsesIndex(query, f'lead_org_{kind}_key_id_idx')
+
+    def test_lead_api_list(self):
+        request = Request(APIRequestFactory().get('/'))
+        view = LeadListCreateAPIView(request=request, kwargs={'org_id': self.organization.id})
+        scans = self.get_lead_scans(view.get_queryset())
+        self.assertNotIn('Seq Scan', [node_type for node_type, _ in scans])
+
+    def test_leads_created_within_date_range(self):
+        today = timezone.localdate()
+        leads = LeadMixin().get_all_leads(self.organization).filter(
+            date_created__gte=today - timedelta(days=30),
+            date_created__lte=today,
+        )
+        self.assertUsesIndex(leads, 'lead_org_date_created_idx')
+
+    def test_leads_by_status(self):
+        leads = Lead.objects.filter(organization=self.organization, status=self.status)
+        self.assertUsesIndex(leads, 'lead_org_status_idx')
+
+    def test_leads_by_manager(self):
+        leads = Lead.objects.filter(organization=self.organization, manager=self.manager)
+        self.assertUsesIndex(leads, 'lead_org_manager_idx')
+
+    def test_rollup_rebuild(self):
+        leads = Lead.objects.filter(organization=self.organization).values(
+            'date_created',
+            'status__group',
+            'manager',
+        ).order_by()
+        scans = self.get_lead_scans(leads)
+        self.assertNotIn('Seq Scan', [node_type for node_type, _ in scans])
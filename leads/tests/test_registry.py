@@ -0,0 +1,70 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+
+from ..models import Status
+from ..registry import VERSION_KEY, status_registry
+
+
+class StatusRegistryTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.new_status = Status.objects.create(name='Registry new', group='New')
+        cls.done_status = Status.objects.create(name='Registry done', group='Done')
+
+    def setUp(self):
+        # Statuses written by other tests are rolled back without invalidation.
+        status_registry.invalidate()
+
+    def test_statuses_are_loaded_once(self):
+        status_registry.get_group(self.new_status.id)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(status_registry.get_group(self.new_status.id), 'New')
+            self.assertEqual(status_registry.get_group(self.done_status.id), 'Done')
+
+    def test_missing_status(self):
+        self.assertEqual(status_registry.get_group(None), '')
+        self.assertIsNone(status_registry.get_status(0))
+
+    def test_status_change_invalidates_registry(self):
+        status_registry.get_group(self.new_status.id)
+        self.new_status.group = 'Paid'
+        self.new_status.save()
+
+        self.assertEqual(status_registry.get_group(self.new_status.id), 'Paid')
+
+    def test_status_delete_invalidates_registry(self):
+        status_registry.get_group(self.done_status.id)
+        done_status_id = self.done_status.id
+        self.done_status.delete()
+
+        self.assertNotIn(done_status_id, [status.id for status in status_registry.get_statuses()])
+
+    def test_status_created_by_another_process(self):
+        status_registry.get_group(self.new_status.id)
+        # Queryset updates send no signals, like writes of another process
+        # whose invalidation isn't visible yet.
+        status = Status.objects.bulk_create([Status(name='Registry paid', group='Paid')])[0]
+
+        self.assertEqual(status_registry.get_group(status.id), 'Paid')
+
+    def test_status_changed_by_another_process(self):
+        status_registry.get_group(self.new_status.id)
+        # The version bumped by another process isn't visible with a process-local cache.
+        Status.objects.filter(id=self.new_status.id).update(group='Paid')
+        self.assertEqual(status_registry.get_group(self.new_status.id), 'New')
+
+        with override_settings(STATUS_REGISTRY_TIMEOUT=0):
+            self.assertEqual(status_registry.get_group(self.new_status.id), 'Paid')
+
+    def test_version_checked_after_interval(self):
+        status_registry.get_group(self.new_status.id)
+        Status.objects.filter(id=self.new_status.id).update(group='Paid')
+        cache.incr(VERSION_KEY)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(status_registry.get_group(self.new_status.id), 'New')
+
+        with override_settings(STATUS_REGISTRY_VERSION_CHECK_INTERVAL=0):
+            self.assertEqual(status_registry.get_group(self.new_status.id), 'Paid')
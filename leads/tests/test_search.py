@@ -0,0 +1,98 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from organizations.models import Organization, Membership
+from ..models import Lead
+from .. import search as lead_search
+from ..search import search_leads
+
+User = get_user_model()
+
+
+class LeadSearchTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='SearchUser')
+        cls.organization = Organization.objects.create(name='SearchOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        other_organization = Organization.objects.create(name='OtherSearchOrg')
+
+        cls.ivan = cls.create_lead(cls.organization, 'Ivan', 'Petrov', 'Windows', 'ivan@mail.ru',
+                                   '+7(900)123-45-67', '')
+        cls.maria = cls.create_lead(cls.organization, 'Maria', 'Ivanova', 'Doors',
+                                    'maria@yandex.ru', '+7(911)222-33-44',
+                                    'Call back about windows')
+        cls.create_lead(other_organization, 'Ivan', 'Sidorov', 'Windows', 'sidorov@mail.ru',
+                        '+7(900)123-45-68', '')
+
+    @classmethod
+    def create_lead(cls, organization, first_name, last_name, order, email, phone, comment):
+        return Lead.objects.create(
+            first_name=first_name,
+            last_name=last_name,
+            order=order,
+            price=100,
+            email=email,
+            phone=phone,
+            comment=comment,
+            organization=organization,
+        )
+
+    def search(self, text):
+        return list(search_leads(Lead.objects.filter(organization=self.organization), text))
+
+    def test_search_by_name_prefix(self):
+        self.assertEqual(self.search('iva'), [self.ivan, self.maria])
+        self.assertEqual(self.search('Ivan Petr'), [self.ivan])
+
+    def test_search_ranks_names_above_comments(self):
+        self.assertEqual(self.search('windows'), [self.ivan, self.maria])
+
+    def test_search_by_email(self):
+        self.assertEqual(self.search('yandex'), [self.maria])
+        self.assertEqual(self.search('ivan@mail.ru'), [self.ivan])
+
+    def test_search_by_phone(self):
+        self.assertEqual(self.search('+7 (900) 123-45-67'), [self.ivan])
+        self.assertEqual(self.search('79112223344'), [self.maria])
+        self.assertEqual(self.search('45-67'), [self.ivan])
+
+    @mock.patch.object(lead_search, 'SEARCH_CANDIDATES_LIMIT', 1)
+    def test_broad_search_ranks_newest_matches(self):
+        self.assertEqual(self.search('iva'), [self.maria])
+
+        self.create_lead(self.organization, 'Petr', 'Sidorov', 'Roof', '', '', '')
+
+        with mock.patch.object(lead_search, 'SEARCH_RECENT_LEADS', 1):
+            self.assertEqual(self.search('iva'), [self.maria])
+
+    def test_search_vector_is_updated(self):
+        self.ivan.last_name = 'Smirnov'
+        self.ivan.save()
+        self.assertEqual(self.search('smirnov'), [self.ivan])
+        self.assertEqual(self.search('petrov'), [])
+
+    def test_empty_search(self):
+        self.assertEqual(self.search(' !? '), [])
+
+    def test_lead_list_search(self):
+        self.client.force_login(self.user)
+        url = reverse('organizations:leads:lead_list', kwargs={'org_id': self.organization.id})
+        response = self.client.get(url, {'q': 'maria'})
+        self.assertEqual(list(response.context['leads']), [self.maria])
+        self.assertIsNone(response.context.get('next_page_query'))
+
+    def test_lead_api_search(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('organizations:leads_api:lead_search', kwargs={
+            'org_id': self.organization.id,
+        })
+        response = client.get(url, {'q': 'ivan'})
+        self.assertEqual([lead['id'] for lead in response.data], [self.ivan.id, self.maria.id])
+        self.assertNotIn('search_vector', response.data[0])
@@ -29,7 +29,7 @@ class LeadsURLTests(TestCase):
             phone='+70987654321',
             comment='',
             manager=cls.user_org_member,
-            organization=cls.organization.name,
+            organization=cls.organization,
             )
 
     def setUp(self):
@@ -1,3 +1,4 @@
+from asgiref.sync import async_to_sync, sync_to_async
 from django.test import TestCase, RequestFactory
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -15,7 +16,7 @@ class LeadViewsTest(TestCase):
     def setUpTestData(cls):
         cls.user = User.objects.create(username='vs_dev2023')
         cls.organization = Organization.objects.create(name='vs_org')
-        Organization.objects.create(name='SomeOrg')
+        cls.other_organization = Organization.objects.create(name='SomeOrg')
 
         Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
         cls.lead = Lead.objects.create(
@@ -26,7 +27,7 @@ class LeadViewsTest(TestCase):
             email='test@test.test',
             phone='+70987654321',
             comment='',
-            organization=cls.organization.name,
+            organization=cls.organization,
             )
         cls.lead2 = Lead.objects.create(
             first_name='VS2',
@@ -36,7 +37,7 @@ class LeadViewsTest(TestCase):
             email='test@test.test',
             phone='+70987555321',
             comment='',
-            organization=cls.organization.name,
+            organization=cls.organization,
             )
         cls.lead3 = Lead.objects.create(
             first_name='VS3',
@@ -46,7 +47,7 @@ class LeadViewsTest(TestCase):
             email='test@test.test',
             phone='+70987654321',
             comment='',
-            organization='SomeOrg'
+            organization=cls.other_organization
             )
 
     def setUp(self):
@@ -127,10 +128,101 @@ class LeadViewsTest(TestCase):
             url = reverse(url_name, kwargs=kwargs)
             request = self.factory.get(url)
             request.user = self.user
-            response = views.__dict__[view_name].as_view()(request, **kwargs)
+            view = views.__dict__[view_name]
+
+            if view.view_is_async:
+                response = async_to_sync(view.as_view())(request, **kwargs)
+            else:
+                response = view.as_view()(request, **kwargs)
 
             self.assertIn('org_id', response.context_data)
 
             if view_type == 'list':
                 self.assertIn('leads', response.context_data)
             i += 1
+
+    def test_lead_of_other_organization_not_found(self):
+        kwargs = {'org_id': self.organization.id, 'pk': self.lead3.id}
+
+        for view_type in ('detail', 'update', 'delete'):
+            url = reverse(f'organizations:leads:lead_{view_type}', kwargs=kwargs)
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+        response = self.client.post(reverse('organizations:leads:lead_delete', kwargs=kwargs))
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Lead.objects.filter(id=self.lead3.id).exists())
+
+
+class AsyncLeadViewsTest(TestCase):
+    """Serves the async lead views the way ASGI does, so that no query is made in the event loop."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='AsyncViewsUser')
+        cls.outsider = User.objects.create(username='AsyncViewsOutsider')
+        cls.organization = Organization.objects.create(name='AsyncViewsOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        cls.lead = Lead.objects.create(
+            first_name='Async',
+            last_name='Lead',
+            order='Test async views',
+            price=1000,
+            comment='',
+            organization=cls.organization,
+        )
+
+    async def login(self, user):
+        # force_login saves the session, so it can't be called in the event loop.
+        await sync_to_async(self.async_client.force_login)(user)
+
+    def get_url(self, view_type, **kwargs):
+        return reverse(f'organizations:leads:lead_{view_type}', kwargs={
+            'org_id': self.organization.id,
+            **kwargs,
+        })
+
+    async def test_views(self):
+        await self.login(self.user)
+
+        response = await self.async_client.get(self.get_url('list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['leads']), [self.lead])
+
+        response = await self.async_client.get(self.get_url('list'), {'q': 'async'})
+        self.assertEqual(list(response.context['leads']), [self.lead])
+
+        response = await self.async_client.get(self.get_url('detail', pk=self.lead.pk))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Test async views')
+
+    async def test_missing_lead_not_found(self):
+        await self.login(self.user)
+        response = await self.async_client.get(self.get_url('detail', pk=self.lead.pk + 1))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_lead_of_other_organization_not_found(self):
+        await self.login(self.user)
+        other_organization = await Organization.objects.acreate(name='AsyncViewsOtherOrg')
+        other_lead = await Lead.objects.acreate(
+            first_name='Other',
+            last_name='Lead',
+            order='Test other organization',
+            price=1000,
+            comment='',
+            organization=other_organization,
+        )
+        response = await self.async_client.get(self.get_url('detail', pk=other_lead.pk))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_non_member_forbidden(self):
+        await self.login(self.outsider)
+
+        for url in (self.get_url('list'), self.get_url('detail', pk=self.lead.pk)):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 403)
+
+    def test_detail_fetches_status_with_lead(self):
+        self.client.force_login(self.user)
+        # The session, the user, the organization context and the lead with its status.
+        with self.assertNumQueries(4):
+            self.client.get(self.get_url('detail', pk=self.lead.pk))
@@ -7,6 +7,10 @@ app_name = 'leads'
 urlpatterns = [
     path('', views.LeadListView.as_view(), name='lead_list'),
     path('create/', views.LeadCreateView.as_view(), name='lead_create'),
+    path('import/', views.LeadImportView.as_view(), name='lead_import'),
+    path('import/<uuid:token>/', views.LeadImportStatusView.as_view(), name='lead_import_status'),
+    path('import/<uuid:token>/errors/', views.LeadImportErrorsView.as_view(),
+         name='lead_import_errors'),
     path('<int:pk>/', views.LeadDetailView.as_view(), name='lead_detail'),
     path('<int:pk>/update/', views.LeadUpdateView.as_view(), name='lead_update'),
     path('<int:pk>/delete/', views.LeadDeleteView.as_view(), name='lead_delete'),
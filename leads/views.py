@@ -1,13 +1,22 @@
+import os
+
+from asgiref.sync import sync_to_async
 from django.urls import reverse_lazy
 from django.contrib.auth.mixins import PermissionRequiredMixin
+from django.core.files.storage import default_storage
 from django.views import generic
-from django.shortcuts import get_object_or_404
-from django.http import HttpResponseForbidden
+from django.shortcuts import redirect
+from django.http import FileResponse, Http404, HttpResponseForbidden
 from django.contrib.auth import get_user_model
+from django.db.models.query import QuerySet
 
+from . import imports
 from .models import Lead
-from .forms import LeadCreateUpdateForm
-from organizations.models import Organization, Membership
+from .forms import LeadCreateUpdateForm, LeadImportForm
+from .pagination import InvalidCursor, KeysetPaginator, get_page_size
+from .search import search_leads
+from organizations.context import OrganizationContextMixin
+from organizations.models import Membership
 
 User = get_user_model()
 
@@ -15,13 +24,38 @@ User = get_user_model()
 class GetQuerysetAndLeadContextObjectNameMixin:
     """Provides queryset and context object name for Lead model."""
 
-    queryset = Lead.objects.all()
     context_object_name = 'lead'
 
+    def get_queryset(self) -> QuerySet[Lead]:
+        """
+        Returns the leads of the organization in the URL, so that the leads
+        of other organizations are not found.
+        """
+        return Lead.objects.filter(organization_id=self.kwargs['org_id'])
+
 
-class VerifyMembershipMixin(PermissionRequiredMixin):
+class VerifyMembershipMixin(OrganizationContextMixin, PermissionRequiredMixin):
     """Verifies that user has the necessary membership to access a resource."""
 
+    def dispatch(self, request, *args, **kwargs):
+        """Verifies the membership of the user, without blocking the event loop in async views."""
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+
+        return super().dispatch(request, *args, **kwargs)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Async version of dispatch.
+
+        The organization context is loaded in a worker thread first, so that
+        has_permission and the view read it from the request without a query.
+        """
+        if not (await self.aget_organization_context()).is_member:
+            return self.handle_no_permission()
+
+        return await super().dispatch(request, *args, **kwargs)
+
     def has_permission(self) -> bool:
         """
         Checks if user has the necessary membership.
@@ -29,13 +63,7 @@ class VerifyMembershipMixin(PermissionRequiredMixin):
         Returns:
             bool: True if user has necessary membership, False otherwise.
         """
-        user = self.request.user
-        organization = get_object_or_404(Organization, id=self.kwargs['org_id'])
-        try:
-            membership = Membership.objects.get(user=user, organization=organization)
-            return True
-        except Membership.DoesNotExist:
-            return False
+        return self.get_organization_context().is_member
 
     def handle_no_permission(self) -> HttpResponseForbidden:
         """
@@ -59,8 +87,8 @@ class GetContextDataMixin:
         """
         context = super().get_context_data(**kwargs)
         org_id = self.kwargs['org_id']
-        organization = Organization.objects.get(id=org_id)
-        leads = Lead.objects.filter(organization=organization)
+        organization = self.get_organization_context().organization
+        leads = Lead.objects.filter(organization=organization).order_by('-date_created', '-id')
         context['org_id'] = org_id
         context['organization'] = organization
         context['leads'] = leads
@@ -78,7 +106,7 @@ class GetFormKwargsMixin:
             dict: The form kwargs.
         """
         kwargs = super().get_form_kwargs()
-        organization = Organization.objects.get(id=self.kwargs['org_id'])
+        organization = self.get_organization_context().organization
         users = Membership.objects.filter(organization=organization).values('user')
         kwargs['managers'] = User.objects.filter(id__in=users)
         return kwargs
@@ -105,7 +133,7 @@ class LeadCreateView(
         Returns:
             HttpResponseRedirect: The HTTP response after processing the form.
         """
-        organization = Organization.objects.get(id=self.kwargs['org_id'])
+        organization = self.get_organization_context().organization
         form.instance.organization = organization
         return super().form_valid(form)
 
@@ -126,6 +154,60 @@ class LeadListView(GetContextDataMixin, VerifyMembershipMixin, generic.ListView)
     template_name = 'leads/lead_list.html'
     queryset = Lead.objects.all()
 
+    def get_page_query(self, cursor: str) -> str:
+        """Returns the query string of the page the cursor points at."""
+        query = self.request.GET.copy()
+        query['cursor'] = cursor
+        return query.urlencode()
+
+    async def get(self, request, *args, **kwargs):
+        """
+        Renders the leads of the organization fetched with the async ORM.
+
+        Raises:
+            Http404: If the cursor is invalid.
+        """
+        self.object_list = self.get_queryset()
+        context = self.get_context_data(**kwargs)
+        context.update(await self.aget_leads_context(context['leads']))
+        return self.render_to_response(context)
+
+    async def aget_leads_context(self, leads: QuerySet[Lead]) -> dict[str: any]:
+        """
+        Returns the page of the leads requested by the cursor and page_size
+        parameters, or the most relevant ones if the q search parameter is given,
+        with the search query and the query strings of the neighbouring pages.
+
+        Raises:
+            Http404: If the cursor is invalid.
+        """
+        page_size = get_page_size(self.request.GET.get('page_size'))
+        search_query = self.request.GET.get('q', '').strip()
+
+        if search_query:
+            # The search may look up the indexes of the table, once per process.
+            leads = await sync_to_async(search_leads)(leads, search_query)
+            return {
+                'search_query': search_query,
+                'leads': [lead async for lead in leads[:page_size]],
+            }
+
+        paginator = KeysetPaginator(leads, page_size)
+
+        try:
+            page = await paginator.aget_page(self.request.GET.get('cursor'))
+        except InvalidCursor:
+            raise Http404('Invalid cursor')
+
+        return {
+            'search_query': search_query,
+            'leads': page.object_list,
+            'next_page_query': page.next_cursor and self.get_page_query(page.next_cursor),
+            'previous_page_query': (
+                page.previous_cursor and self.get_page_query(page.previous_cursor)
+            ),
+        }
+
 
 class LeadDetailView(
     GetContextDataMixin,
@@ -137,6 +219,24 @@ class LeadDetailView(
 
     template_name = 'leads/lead_detail.html'
 
+    async def get(self, request, *args, **kwargs):
+        """Renders the lead fetched with the async ORM."""
+        self.object = await self.aget_object()
+        context = self.get_context_data(object=self.object)
+        return self.render_to_response(context)
+
+    async def aget_object(self) -> Lead:
+        """
+        Async version of get_object, fetching the status shown by the template as well.
+
+        Raises:
+            Http404: If the lead doesn't exist.
+        """
+        try:
+            return await self.get_queryset().select_related('status').aget(pk=self.kwargs['pk'])
+        except Lead.DoesNotExist:
+            raise Http404('Lead does not exist')
+
 
 class LeadUpdateView(
     GetFormKwargsMixin,
@@ -172,3 +272,76 @@ class LeadDeleteView(
     """A view for deleting a lead."""
 
     template_name = 'leads/lead_delete.html'
+
+
+class LeadImportView(GetContextDataMixin, VerifyMembershipMixin, generic.FormView):
+    """A view for uploading a CSV or JSON Lines file of leads to import in the background."""
+
+    form_class = LeadImportForm
+    template_name = 'leads/lead_import.html'
+
+    def form_valid(self, form):
+        """
+        Starts importing the uploaded file.
+
+        Args:
+            form: The validated form.
+
+        Returns:
+            HttpResponseRedirect: The redirect to the status page of the import.
+        """
+        org_id = self.kwargs['org_id']
+        organization = self.get_organization_context().organization
+        token = imports.start_import(
+            organization,
+            form.cleaned_data['file'],
+            form.cleaned_data['format'],
+        )
+        return redirect('organizations:leads:lead_import_status', org_id=org_id, token=token)
+
+
+class LeadImportStatusView(GetContextDataMixin, VerifyMembershipMixin, generic.TemplateView):
+    """A view for displaying the progress of a lead import."""
+
+    template_name = 'leads/lead_import_status.html'
+
+    def get_context_data(self, **kwargs: dict[str: any]) -> dict[str: any]:
+        """
+        Adds the progress of the import to the context data.
+
+        Returns:
+            dict: The context data.
+
+        Raises:
+            Http404: If the import is unknown.
+        """
+        context = super().get_context_data(**kwargs)
+        progress = imports.get_import_progress(self.kwargs['org_id'], self.kwargs['token'])
+
+        if progress is None:
+            raise Http404('Unknown import')
+
+        context['progress'] = progress
+        return context
+
+
+class LeadImportErrorsView(VerifyMembershipMixin, generic.View):
+    """A view for downloading the rows rejected by a lead import."""
+
+    def get(self, request, *args, **kwargs) -> FileResponse:
+        """
+        Returns the error file of the import.
+
+        Raises:
+            Http404: If the import has no error file.
+        """
+        path = imports.get_errors_path(self.kwargs['org_id'], self.kwargs['token'])
+
+        if not default_storage.exists(path):
+            raise Http404('No error file')
+
+        return FileResponse(
+            default_storage.open(path, 'rb'),
+            as_attachment=True,
+            filename=os.path.basename(path),
+        )
@@ -0,0 +1,76 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.renderers import JSONRenderer
+
+from leads.models import Lead
+from leads_api.renderers import ORJSONRenderer
+from leads_api.serializers import LeadSerializer, get_lead_field_names
+from organizations.models import Organization
+
+DEFAULT_ROW_COUNTS = (1000, 10000, 100000)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the time of listing leads of an organization as JSON with LeadSerializer '
+        'and JSONRenderer, and with values() and ORJSONRenderer as the leads API does. '
+        'Use the seed_leads command to create an organization to measure.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_id', type=int, help='Id of the organization to list.')
+        parser.add_argument(
+            '--rows',
+            type=int,
+            action='append',
+            dest='row_counts',
+            help='Number of listed leads. Can be repeated.',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Number of runs of each path.')
+
+    def measure(self, render, repeat):
+        """Returns the median time of rendering and the rendered content."""
+        timings = []
+
+        for _ in range(repeat):
+            started_at = time.perf_counter()
+            content = render()
+            timings.append(time.perf_counter() - started_at)
+
+        return statistics.median(timings), content
+
+    def handle(self, *args, **options):
+        try:
+            organization = Organization.objects.get(id=options['org_id'])
+        except Organization.DoesNotExist:
+            raise CommandError(f'Organization with id {options["org_id"]} does not exist')
+
+        leads = Lead.objects.filter(organization=organization).order_by('-date_created', '-id')
+        field_names = get_lead_field_names()
+        self.stdout.write(
+            f'{"Rows":>8} {"Serializer":>12} {"rows/s":>10} {"Fast path":>12} {"rows/s":>10} '
+            f'{"Speedup":>8}'
+        )
+
+        for row_count in options['row_counts'] or DEFAULT_ROW_COUNTS:
+            serializer_time, serializer_content = self.measure(
+                lambda: JSONRenderer().render(
+                    LeadSerializer(leads.only(*field_names)[:row_count], many=True).data
+                ),
+                options['repeat'],
+            )
+            fast_time, fast_content = self.measure(
+                lambda: ORJSONRenderer().render(list(leads.values(*field_names)[:row_count])),
+                options['repeat'],
+            )
+
+            if fast_content != serializer_content:
+                raise CommandError(f'The outputs of {row_count} rows differ')
+
+            self.stdout.write(
+                f'{row_count:>8} {serializer_time * 1000:>10.1f}ms '
+                f'{row_count / serializer_time:>10.0f} {fast_time * 1000:>10.1f}ms '
+                f'{row_count / fast_time:>10.0f} {serializer_time / fast_time:>7.1f}x'
+            )
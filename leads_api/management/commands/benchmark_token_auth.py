@@ -0,0 +1,85 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIRequestFactory
+
+from leads.models import Lead
+from leads_api.views import LeadRetrieveUpdateDestroyAPIView
+from organizations.models import Membership
+from users_api.authentication import CachedTokenAuthentication, token_cache
+
+AUTHENTICATION_CLASSES = (TokenAuthentication, CachedTokenAuthentication)
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the time and the number of queries of retrieving a lead through the leads '
+        'API with TokenAuthentication and with CachedTokenAuthentication. '
+        'The token of the first member of the organization is used, and created if missing.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('org_id', type=int, help='Id of the organization of the lead.')
+        parser.add_argument('--requests', type=int, default=1000, help='Number of requests.')
+
+    def get_lead_and_token(self, org_id):
+        """Returns the most recent lead of the organization and the token of its first member."""
+        lead = Lead.objects.filter(organization=org_id).order_by('-id').first()
+        membership = Membership.objects.filter(organization=org_id).order_by('id').first()
+
+        if lead is None or membership is None:
+            raise CommandError(f'Organization with id {org_id} has no leads or no members')
+
+        token, _ = Token.objects.get_or_create(user_id=membership.user_id)
+        return lead, token
+
+    def measure(self, authentication_class, lead, token, request_count):
+        """Returns the median time of a request and the number of queries of the last one."""
+        view = LeadRetrieveUpdateDestroyAPIView.as_view(
+            authentication_classes=[authentication_class],
+        )
+        factory = APIRequestFactory()
+        kwargs = {'org_id': lead.organization_id, 'pk': lead.id}
+        timings = []
+
+        def retrieve():
+            request = factory.get('/', HTTP_AUTHORIZATION=f'Token {token.key}')
+            response = view(request, **kwargs)
+
+            if response.status_code != 200:
+                raise CommandError(f'The request failed with status {response.status_code}')
+
+        # Warms up the caches shared by both classes, such as the organization context.
+        retrieve()
+
+        for _ in range(request_count):
+            started_at = time.perf_counter()
+            retrieve()
+            timings.append(time.perf_counter() - started_at)
+
+        with CaptureQueriesContext(connection) as queries:
+            retrieve()
+
+        return statistics.median(timings), len(queries)
+
+    def handle(self, *args, **options):
+        lead, token = self.get_lead_and_token(options['org_id'])
+        token_cache.invalidate_user(token.user_id)
+        self.stdout.write(f'{"Authentication":<28} {"Median":>10} {"req/s":>8} {"Queries":>8}')
+
+        for authentication_class in AUTHENTICATION_CLASSES:
+            median, query_count = self.measure(
+                authentication_class,
+                lead,
+                token,
+                options['requests'],
+            )
+            self.stdout.write(
+                f'{authentication_class.__name__:<28} {median * 1000:>8.2f}ms '
+                f'{1 / median:>8.0f} {query_count:>8}'
+            )
@@ -1,9 +1,80 @@
+from functools import cache
+from typing import Optional
+
 from rest_framework import serializers
 
 from leads.models import Lead
 
 
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Looks the related object up in the map of the field's objects by id given
+    in the 'preloaded' serializer context, if any, instead of a query per value.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', dict()).get(self.field_name)
+
+        if preloaded is None:
+            return super().to_internal_value(data)
+
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+        try:
+            return preloaded[int(data)]
+        except KeyError:
+            self.fail('does_not_exist', pk_value=data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+
+
+class LeadListSerializer(serializers.ListSerializer):
+    """
+    Validates every item of a list on its own, so that the valid items can be
+    saved while the invalid ones are reported.
+
+    The validated data holds None for invalid items, and item_errors holds
+    the errors of every item, empty for the valid ones.
+    """
+
+    def to_internal_value(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(input_type=type(data).__name__)
+            raise serializers.ValidationError({'non_field_errors': [message]}, code='not_a_list')
+
+        validated_data = []
+        self.item_errors = []
+
+        for item in data:
+            try:
+                validated_data.append(self.child.run_validation(item))
+                self.item_errors.append(dict())
+            except serializers.ValidationError as exc:
+                validated_data.append(None)
+                self.item_errors.append(exc.detail)
+
+        return validated_data
+
+
 class LeadSerializer(serializers.ModelSerializer):
+    serializer_related_field = PreloadedPrimaryKeyRelatedField
+
     class Meta:
         model = Lead
-        fields = '__all__'
+        exclude = ['search_vector', 'phone_key', 'email_key']
+        read_only_fields = ['organization']
+        list_serializer_class = LeadListSerializer
+
+    def __init__(self, *args, fields: Optional[list[str]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+
+@cache
+def get_lead_field_names() -> list[str]:
+    """Returns the names of the fields of LeadSerializer, which are all Lead model fields."""
+    return list(LeadSerializer().fields)
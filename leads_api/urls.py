@@ -6,6 +6,8 @@ app_name = 'leads_api'
 
 urlpatterns = [
     path('leads/', views.LeadListCreateAPIView.as_view(), name='lead_list_create'),
+    path('leads/batch/', views.LeadBatchAPIView.as_view(), name='lead_batch'),
+    path('leads/search/', views.LeadSearchAPIView.as_view(), name='lead_search'),
     path('leads/<int:pk>/', views.LeadRetrieveUpdateDestroyAPIView.as_view(),
          name='lead_retrieve_update_destroy'),
 ]
@@ -1,27 +1,312 @@
-from rest_framework.generics import ListCreateAPIView, RetrieveUpdateDestroyAPIView
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.generics import (
+    GenericAPIView,
+    ListAPIView,
+    ListCreateAPIView,
+    RetrieveUpdateDestroyAPIView,
+)
+from rest_framework.response import Response
 
-from django.shortcuts import get_object_or_404
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
 
+from leads.bulk import bulk_create_leads, bulk_delete_leads, bulk_update_leads
 from leads.models import Lead
-from .serializers import LeadSerializer
-from organizations.models import Organization
+from leads.pagination import get_page_size
+from leads.registry import status_registry
+from leads.search import search_leads
+from .serializers import LeadSerializer, get_lead_field_names
+from organizations.context import get_organization_context
 from .permissions import MembershipPermission
+from .pagination import LeadKeysetPagination
+from .renderers import ORJSONRenderer
+
+User = get_user_model()
+
+BATCH_OPERATIONS = ('create', 'update', 'delete')
 
 
 class GetQuerysetMixin:
+    """
+    Provides the leads of the organization.
+
+    Reads return only the fields listed in the comma-separated fields query
+    parameter, or all but the ones listed in the exclude parameter, and load
+    only the columns of these fields.
+    """
+    # Fields loaded whatever the requested ones, such as the keys of the pagination.
+    always_loaded_fields = ('id',)
+
+    def get_organization(self):
+        return get_organization_context(self.request, self.kwargs['org_id']).organization
 
     def get_queryset(self):
-        org_id = self.kwargs['org_id']
-        organization = get_object_or_404(Organization, id=org_id)
+        organization = self.get_organization()
         queryset = Lead.objects.filter(organization=organization)
-        return queryset
+        return self.load_serialized_fields(queryset)
+
+    def get_serialized_fields(self):
+        """
+        Returns the names of the fields requested with the fields and exclude parameters.
+
+        Raises:
+            ValidationError: If a requested field doesn't exist.
+        """
+        if not hasattr(self, '_serialized_fields'):
+            field_names = get_lead_field_names()
+            params = self.request.query_params
+            fields = [name for name in params.get('fields', '').split(',') if name]
+            exclude = [name for name in params.get('exclude', '').split(',') if name]
+
+            for param, names in (('fields', fields), ('exclude', exclude)):
+                unknown = [name for name in names if name not in field_names]
+
+                if unknown:
+                    raise ValidationError({param: [f'Unknown fields: {", ".join(unknown)}.']})
+
+            self._serialized_fields = [
+                name for name in field_names
+                if (not fields or name in fields) and name not in exclude
+            ]
+
+        return self._serialized_fields
+
+    def load_serialized_fields(self, queryset):
+        """Defers the columns of the fields that are not returned, on reads."""
+        if self.request.method not in SAFE_METHODS:
+            return queryset
+
+        return queryset.only(*self.get_serialized_fields(), *self.always_loaded_fields)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.request.method in SAFE_METHODS:
+            kwargs.setdefault('fields', self.get_serialized_fields())
+
+        return super().get_serializer(*args, **kwargs)
 
 
 class LeadListCreateAPIView(GetQuerysetMixin, ListCreateAPIView):
     serializer_class = LeadSerializer
     permission_classes = [MembershipPermission]
+    pagination_class = LeadKeysetPagination
+    renderer_classes = [ORJSONRenderer, BrowsableAPIRenderer]
+    always_loaded_fields = ('id', 'date_created')
+
+    def list(self, request, *args, **kwargs):
+        """
+        Returns a page of leads.
+
+        JSON pages are built from values() rather than LeadSerializer: the
+        serialized fields of the leads are plain column values, so the rows
+        are returned as they are, without building model instances and fields.
+        """
+        if request.accepted_renderer.format != 'json':
+            return super().list(request, *args, **kwargs)
+
+        fields = self.get_serialized_fields()
+        keys = [name for name in self.always_loaded_fields if name not in fields]
+        rows = self.filter_queryset(self.get_queryset()).values(*fields, *keys)
+        page = self.paginate_queryset(rows)
+
+        if keys:
+            page = [{name: row[name] for name in fields} for row in page]
+
+        return self.get_paginated_response(page)
+
+    def perform_create(self, serializer):
+        serializer.save(organization=self.get_organization())
 
 
 class LeadRetrieveUpdateDestroyAPIView(GetQuerysetMixin, RetrieveUpdateDestroyAPIView):
     serializer_class = LeadSerializer
     permission_classes = [MembershipPermission]
+
+
+class LeadSearchAPIView(GetQuerysetMixin, ListAPIView):
+    """Returns the leads matching the q parameter, the most relevant first."""
+    serializer_class = LeadSerializer
+    permission_classes = [MembershipPermission]
+    pagination_class = None
+
+    def get_queryset(self):
+        page_size = get_page_size(self.request.query_params.get('page_size'))
+        search_query = self.request.query_params.get('q', '')
+        leads = search_leads(super().get_queryset(), search_query)
+        return self.load_serialized_fields(leads)[:page_size]
+
+
+class LeadBatchAPIView(GetQuerysetMixin, GenericAPIView):
+    """
+    Applies a list of lead operations in one transaction and returns the result of each.
+
+    Operations look like {"op": "create", "data": {...}}, {"op": "update", "id": 1,
+    "data": {...}} and {"op": "delete", "id": 1}, updates are partial. Invalid
+    operations are reported and skipped, the valid ones are applied with a few
+    bulk queries whatever their number.
+    """
+    serializer_class = LeadSerializer
+    permission_classes = [MembershipPermission]
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['preloaded'] = getattr(self, 'preloaded', dict())
+        return context
+
+    def get_operation_errors(self, operation, lead_ids):
+        """Returns the errors of the operation's structure, adding the id it changes to lead_ids."""
+        if not isinstance(operation, dict):
+            return {'non_field_errors': ['Expected an object.']}
+
+        op = operation.get('op')
+
+        if op not in BATCH_OPERATIONS:
+            return {'op': [f'Expected one of: {", ".join(BATCH_OPERATIONS)}.']}
+
+        errors = dict()
+        lead_id = operation.get('id')
+
+        if op != 'create' and (not isinstance(lead_id, int) or isinstance(lead_id, bool)):
+            errors['id'] = ['A valid integer is required.']
+        elif op != 'create' and lead_id in lead_ids:
+            errors['id'] = ['The lead is changed by another operation of the batch.']
+        elif op != 'create':
+            lead_ids.add(lead_id)
+
+        if op != 'delete' and not isinstance(operation.get('data'), dict):
+            errors['data'] = ['Expected an object.']
+
+        return errors
+
+    def preload(self, items):
+        """Loads the managers and the statuses the items reference with a single query."""
+        manager_ids = set()
+
+        for item in items:
+            try:
+                manager_ids.add(int(item.get('manager')))
+            except (TypeError, ValueError):
+                pass
+
+        self.preloaded = {
+            'manager': User.objects.in_bulk(manager_ids),
+            'status': {status.id: status for status in status_registry.get_statuses()},
+        }
+
+    def get_result(self, operation, status, **result):
+        """Returns the result of the operation."""
+        if isinstance(operation, dict) and operation.get('op') in BATCH_OPERATIONS:
+            result = {'op': operation['op'], 'id': operation.get('id'), **result}
+
+        return {**result, 'status': status}
+
+    def validate_items(self, operations, indexes, results, **kwargs):
+        """
+        Validates the data of the operations with LeadSerializer in many mode,
+        storing the results of the invalid ones.
+
+        Returns:
+            list: The index and the validated data of every valid operation.
+        """
+        serializer = self.get_serializer(
+            data=[operations[index]['data'] for index in indexes],
+            many=True,
+            **kwargs,
+        )
+        serializer.is_valid(raise_exception=True)
+        valid_items = []
+
+        for index, data, errors in zip(indexes, serializer.validated_data, serializer.item_errors):
+            if errors:
+                results[index] = self.get_result(operations[index], 400, errors=errors)
+            else:
+                valid_items.append((index, data))
+
+        return valid_items
+
+    def lock_leads(self, operations, indexes, results):
+        """Locks the leads the operations change, storing the results of missing ones."""
+        leads = self.get_queryset().select_for_update().in_bulk(
+            [operations[index]['id'] for index in indexes]
+        )
+
+        for index in indexes:
+            if operations[index]['id'] not in leads:
+                results[index] = self.get_result(operations[index], 404, errors={
+                    'id': ['Not found.'],
+                })
+
+        return leads
+
+    def set_saved_results(self, operations, results, saved, status):
+        """Stores the serialized leads as the results of the operations that saved them."""
+        serializer = LeadSerializer([lead for _, lead in saved], many=True)
+
+        for (index, _), data in zip(saved, serializer.data):
+            results[index] = self.get_result(operations[index], status, data=data)
+
+    def apply(self, operations, results):
+        """Applies the structurally valid operations, storing their results."""
+        organization = self.get_organization()
+        indexes = {op: [] for op in BATCH_OPERATIONS}
+
+        for index, operation in enumerate(operations):
+            if results[index] is None:
+                indexes[operation['op']].append(index)
+
+        leads = self.lock_leads(operations, indexes['update'] + indexes['delete'], results)
+        updates = [index for index in indexes['update'] if results[index] is None]
+        deletes = [index for index in indexes['delete'] if results[index] is None]
+        self.preload([operations[index]['data'] for index in indexes['create'] + updates])
+        created = [
+            (index, Lead(organization=organization, **data))
+            for index, data in self.validate_items(operations, indexes['create'], results)
+        ]
+        updated = []
+        updated_fields = set()
+
+        for index, data in self.validate_items(operations, updates, results, partial=True):
+            lead = leads[operations[index]['id']]
+
+            for field_name, value in data.items():
+                setattr(lead, field_name, value)
+
+            updated.append((index, lead))
+            updated_fields.update(data)
+
+        bulk_create_leads([lead for _, lead in created])
+        bulk_update_leads([lead for _, lead in updated], sorted(updated_fields))
+        bulk_delete_leads([operations[index]['id'] for index in deletes])
+        self.set_saved_results(operations, results, created, 201)
+        self.set_saved_results(operations, results, updated, 200)
+
+        for index in deletes:
+            results[index] = self.get_result(operations[index], 204)
+
+    def post(self, request, *args, **kwargs):
+        operations = request.data
+        max_batch_size = settings.LEADS_API_MAX_BATCH_SIZE
+
+        if not isinstance(operations, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of operations.']})
+
+        if len(operations) > max_batch_size:
+            raise ValidationError({
+                'non_field_errors': [f'Expected at most {max_batch_size} operations.'],
+            })
+
+        results = [None] * len(operations)
+        lead_ids = set()
+
+        for index, operation in enumerate(operations):
+            errors = self.get_operation_errors(operation, lead_ids)
+
+            if errors:
+                results[index] = self.get_result(operation, 400, errors=errors)
+
+        with transaction.atomic():
+            self.apply(operations, results)
+
+        return Response({'results': results})
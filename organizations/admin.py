@@ -1,7 +1,8 @@
 from django.contrib import admin
-from .models import Organization, Membership, MembershipInvitation
+from .models import InvitationEmail, Organization, Membership, MembershipInvitation
 
 
 admin.site.register(Organization)
 admin.site.register(Membership)
 admin.site.register(MembershipInvitation)
+admin.site.register(InvitationEmail)
@@ -0,0 +1,193 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F, FilteredRelation, Q
+from django.http import Http404, HttpRequest
+
+from .models import Organization, Membership
+
+ORGANIZATION_KEY = 'organizations:organization:{org_id}'
+MEMBERSHIP_KEY = 'organizations:membership:{org_id}:{user_id}'
+
+
+@dataclass(frozen=True)
+class OrganizationContext:
+    """The organization of an <org_id> route and the membership of the requesting user in it."""
+    organization: Organization
+    membership: Optional[Membership]
+
+    @property
+    def role(self) -> Optional[str]:
+        """Returns the role of the user in the organization, None for non-members."""
+        return self.membership.role if self.membership is not None else None
+
+    @property
+    def is_member(self) -> bool:
+        """Returns True if the user is a member of the organization."""
+        return self.membership is not None
+
+    @property
+    def is_owner(self) -> bool:
+        """Returns True if the user is an owner of the organization."""
+        return self.role == 'owner'
+
+
+def build_organization_context(
+    org_id: int,
+    name: str,
+    membership_id: Optional[int],
+    role: Optional[str],
+    user,
+) -> OrganizationContext:
+    """Returns the context of the organization and of the user's membership, if any."""
+    db = Organization.objects.db
+    organization = Organization.from_db(db, ['id', 'name'], [org_id, name])
+    membership = None
+
+    if membership_id is not None:
+        membership = Membership.from_db(
+            db,
+            ['id', 'user_id', 'organization_id', 'role'],
+            [membership_id, user.pk, org_id, role],
+        )
+        membership.user = user
+        membership.organization = organization
+
+    return OrganizationContext(organization=organization, membership=membership)
+
+
+def get_cached_organization_context(org_id: int, user) -> Optional[OrganizationContext]:
+    """Returns the context stored in the shared cache, None if any part of it is missing."""
+    organization_key = ORGANIZATION_KEY.format(org_id=org_id)
+    membership_key = MEMBERSHIP_KEY.format(org_id=org_id, user_id=user.pk)
+    cached = cache.get_many([organization_key, membership_key])
+
+    if organization_key not in cached or membership_key not in cached:
+        return None
+
+    membership_id, role = cached[membership_key]
+    return build_organization_context(org_id, cached[organization_key], membership_id, role, user)
+
+
+def load_organization_context(org_id: int, user) -> OrganizationContext:
+    """
+    Loads the organization and the user's membership in it.
+
+    The name of the organization and the role of every user in it are kept
+    in the shared cache, so that steady-state requests of authenticated users
+    make no query. The entries are invalidated by the Organization and
+    Membership signal receivers and expire after
+    ORGANIZATIONS_CONTEXT_CACHE_TIMEOUT seconds in any case.
+
+    Raises:
+        Http404: If the organization doesn't exist.
+    """
+    org_id = int(org_id)
+
+    if user.is_authenticated:
+        context = get_cached_organization_context(org_id, user)
+
+        if context is not None:
+            return context
+
+    user_id = user.pk if user.is_authenticated else None
+    row = Organization.objects.filter(id=org_id).annotate(
+        user_membership=FilteredRelation('membership', condition=Q(membership__user=user_id)),
+    ).values('name', membership_id=F('user_membership__id'),
+             membership_role=F('user_membership__role')).first()
+
+    if row is None:
+        raise Http404('Organization does not exist')
+
+    if user.is_authenticated:
+        cache.set_many({
+            ORGANIZATION_KEY.format(org_id=org_id): row['name'],
+            MEMBERSHIP_KEY.format(org_id=org_id, user_id=user_id): (
+                row['membership_id'],
+                row['membership_role'],
+            ),
+        }, timeout=settings.ORGANIZATIONS_CONTEXT_CACHE_TIMEOUT)
+
+    return build_organization_context(
+        org_id,
+        row['name'],
+        row['membership_id'],
+        row['membership_role'],
+        user,
+    )
+
+
+def invalidate_organization(org_id: int) -> None:
+    """
+    Removes the cached organization right away and once again when the current
+    transaction is committed, so that one cached by a concurrent request before
+    the commit is not kept afterwards.
+    """
+    key = ORGANIZATION_KEY.format(org_id=org_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def invalidate_membership(org_id: int, user_id: int) -> None:
+    """Removes the cached membership of the user, see invalidate_organization."""
+    key = MEMBERSHIP_KEY.format(org_id=org_id, user_id=user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
+
+
+def get_organization_context(request, org_id: int) -> OrganizationContext:
+    """
+    Returns the organization context of the request, loaded once per request.
+
+    The request may be a Django or a REST framework request. The context is
+    loaded again if the user changes, as REST framework authenticates the
+    user after the view is entered.
+
+    Raises:
+        Http404: If the organization doesn't exist.
+    """
+    http_request: HttpRequest = getattr(request, '_request', request)
+    user = request.user
+    key = (int(org_id), user.pk)
+    cached = getattr(http_request, '_organization_context', None)
+
+    if cached is None or cached[0] != key:
+        cached = (key, load_organization_context(org_id, user))
+        http_request._organization_context = cached
+
+    return cached[1]
+
+
+async def aget_organization_context(request, org_id: int) -> OrganizationContext:
+    """
+    Async version of get_organization_context.
+
+    The user, the session and the context are loaded in a worker thread, so
+    that async views may then read request.user and call get_organization_context
+    without querying the database from the event loop.
+
+    Raises:
+        Http404: If the organization doesn't exist.
+    """
+    return await sync_to_async(get_organization_context)(request, org_id)
+
+
+class OrganizationContextMixin:
+    """Provides the organization of the <org_id> route and the user's membership in it."""
+
+    def get_organization_context(self) -> OrganizationContext:
+        """
+        Returns the organization context of the request, loaded once per request.
+
+        Raises:
+            Http404: If the organization doesn't exist.
+        """
+        return get_organization_context(self.request, self.kwargs['org_id'])
+
+    async def aget_organization_context(self) -> OrganizationContext:
+        """Async version of get_organization_context."""
+        return await aget_organization_context(self.request, self.kwargs['org_id'])
@@ -1,5 +1,14 @@
+import csv
+import io
+import re
+
 from django import forms
-from .models import Organization, MembershipInvitation
+from django.conf import settings
+from django.core.validators import validate_email
+
+from .models import Organization
+
+EMAIL_SEPARATORS = re.compile(r'[\s,;]+')
 
 
 class OrganizationCreateForm(forms.ModelForm):
@@ -11,7 +20,59 @@ class OrganizationCreateForm(forms.ModelForm):
         }
 
 
-class InvitationForm(forms.ModelForm):
-    class Meta:
-        model = MembershipInvitation
-        fields = ['email', ]
+class InvitationForm(forms.Form):
+    """
+    Form of the emails of the users to invite, pasted or uploaded as a CSV file.
+
+    Every cell of the file containing @ is taken as an email, so that files
+    with headers or other columns can be uploaded as they are.
+    """
+    emails = forms.CharField(
+        label='Email',
+        widget=forms.Textarea(attrs={'rows': 4}),
+        required=False,
+        help_text='Один или несколько email через запятую, пробел или с новой строки.',
+    )
+    file = forms.FileField(label='CSV файл с email', required=False)
+
+    def get_file_emails(self, file) -> list[str]:
+        """Returns the cells of the CSV file containing @."""
+        try:
+            lines = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+            return [
+                cell.strip() for row in csv.reader(lines) for cell in row if '@' in cell
+            ]
+        except (UnicodeDecodeError, csv.Error):
+            raise forms.ValidationError('Не удалось прочитать CSV файл.')
+
+    def clean(self):
+        """Returns the unique lower-cased emails in the order they are given."""
+        cleaned_data = super().clean()
+        emails = EMAIL_SEPARATORS.split(cleaned_data.get('emails', ''))
+
+        if cleaned_data.get('file'):
+            emails += self.get_file_emails(cleaned_data['file'])
+
+        emails = list(dict.fromkeys(email.lower() for email in emails if email))
+        invalid_emails = []
+
+        for email in emails:
+            try:
+                validate_email(email)
+            except forms.ValidationError:
+                invalid_emails.append(email)
+
+        if invalid_emails:
+            raise forms.ValidationError(f'Некорректные email: {", ".join(invalid_emails)}')
+
+        if not emails:
+            raise forms.ValidationError('Укажите хотя бы один email.')
+
+        if len(emails) > settings.ORGANIZATIONS_MAX_INVITATIONS:
+            raise forms.ValidationError(
+                f'Можно пригласить не более {settings.ORGANIZATIONS_MAX_INVITATIONS} '
+                f'пользователей за раз.'
+            )
+
+        cleaned_data['emails'] = emails
+        return cleaned_data
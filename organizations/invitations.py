@@ -0,0 +1,183 @@
+import logging
+from datetime import timedelta
+from typing import Callable
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .models import InvitationEmail, Membership, MembershipInvitation, Organization
+
+logger = logging.getLogger(__name__)
+
+User = get_user_model()
+
+INVITATION_SUBJECT = 'Organization {organization} invites you to join it'
+INVITATION_BODY = 'To accept the invitation click the link below:\n\n{link}'
+SENDER = 'noreply@example.com'
+
+
+def get_invitation_errors(organization: Organization, emails: list[str]) -> list[str]:
+    """
+    Returns the errors of the lower-cased emails that can't be invited: the ones
+    of no user and the ones of members, with one query for each.
+    """
+    user_ids = dict(
+        User.objects.annotate(email_lower=Lower('email')).filter(
+            email_lower__in=emails,
+        ).values_list('email_lower', 'id')
+    )
+    member_ids = set(Membership.objects.filter(
+        organization=organization,
+        user__in=user_ids.values(),
+    ).values_list('user', flat=True))
+    unknown_emails = [email for email in emails if email not in user_ids]
+    member_emails = [email for email in emails if user_ids.get(email) in member_ids]
+    errors = []
+
+    if unknown_emails:
+        errors.append(f'Пользователей с такими email не существует: {", ".join(unknown_emails)}')
+
+    if member_emails:
+        errors.append(
+            f'Эти пользователи уже состоят в вашей организации: {", ".join(member_emails)}'
+        )
+
+    return errors
+
+
+def create_invitations(
+    organization: Organization,
+    emails: list[str],
+    get_link: Callable[[MembershipInvitation], str],
+) -> list[MembershipInvitation]:
+    """
+    Replaces the previous invitations of the emails to the organization with new
+    ones and writes their emails to the outbox, in the same transaction.
+    """
+    invitations = [
+        MembershipInvitation(organization=organization, email=email) for email in emails
+    ]
+
+    with transaction.atomic():
+        MembershipInvitation.objects.annotate(email_lower=Lower('email')).filter(
+            organization=organization,
+            email_lower__in=emails,
+        ).delete()
+        MembershipInvitation.objects.bulk_create(invitations)
+        InvitationEmail.objects.bulk_create(
+            InvitationEmail(
+                invitation=invitation,
+                recipient=invitation.email,
+                subject=INVITATION_SUBJECT.format(organization=organization),
+                body=INVITATION_BODY.format(link=get_link(invitation)),
+            )
+            for invitation in invitations
+        )
+
+    return invitations
+
+
+def get_retry_delay(attempts: int) -> timedelta:
+    """Returns the delay before the next attempt after the given number of failed attempts."""
+    return timedelta(seconds=settings.ORGANIZATIONS_INVITATION_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def set_failed(email: InvitationEmail, error: Exception) -> None:
+    """Records the failed attempt of the email and schedules the next one."""
+    email.next_attempt_at = timezone.now() + get_retry_delay(email.attempts)
+    email.last_error = f'{type(error).__name__}: {error}'
+    email.save(update_fields=['next_attempt_at', 'last_error'])
+    logger.warning('Failed to send the invitation email %s: %s', email.id, email.last_error)
+
+
+def set_sent(email: InvitationEmail) -> None:
+    """Records that the email has been sent."""
+    email.sent_at = timezone.now()
+    email.save(update_fields=['sent_at'])
+
+
+def send_emails(emails: list[InvitationEmail]) -> None:
+    """
+    Sends the emails over a single connection, recording every email as sent
+    or failed as soon as it's done, so that a crash only resends the email
+    being sent.
+    """
+    connection = get_connection()
+
+    try:
+        connection.open()
+    except Exception as error:
+        for email in emails:
+            set_failed(email, error)
+        return
+
+    try:
+        for email in emails:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                SENDER,
+                [email.recipient],
+                connection=connection,
+            )
+
+            try:
+                message.send()
+            except Exception as error:
+                set_failed(email, error)
+            else:
+                set_sent(email)
+    finally:
+        connection.close()
+
+
+def claim_invitation_emails(batch_size: int) -> list[InvitationEmail]:
+    """
+    Claims a batch of the due emails of the outbox in a short transaction.
+
+    The attempt is counted and the next one is postponed by
+    ORGANIZATIONS_INVITATION_CLAIM_TIMEOUT seconds before the emails are sent,
+    so that other workers skip them, and the ones of a worker that crashed
+    are sent again once the timeout has passed.
+    """
+    with transaction.atomic():
+        emails = list(InvitationEmail.objects.select_for_update(skip_locked=True).filter(
+            sent_at__isnull=True,
+            next_attempt_at__lte=timezone.now(),
+            attempts__lt=settings.ORGANIZATIONS_INVITATION_MAX_ATTEMPTS,
+        ).order_by('next_attempt_at')[:batch_size])
+        claimed_until = timezone.now() + timedelta(
+            seconds=settings.ORGANIZATIONS_INVITATION_CLAIM_TIMEOUT,
+        )
+
+        for email in emails:
+            email.attempts += 1
+            email.next_attempt_at = claimed_until
+
+        InvitationEmail.objects.bulk_update(emails, ['attempts', 'next_attempt_at'])
+
+    return emails
+
+
+def deliver_invitation_emails(batch_size: int) -> tuple[int, int]:
+    """
+    Sends a batch of the due emails of the outbox.
+
+    The emails are claimed first and sent outside of any transaction, so that
+    a slow SMTP server holds no lock and workers can run concurrently.
+
+    Returns:
+        tuple: The numbers of sent and failed emails.
+    """
+    emails = claim_invitation_emails(batch_size)
+
+    if not emails:
+        return 0, 0
+
+    send_emails(emails)
+    sent_count = sum(email.sent_at is not None for email in emails)
+    return sent_count, len(emails) - sent_count
@@ -0,0 +1,46 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from organizations.invitations import deliver_invitation_emails
+
+
+class Command(BaseCommand):
+    help = (
+        'Sends the invitation emails of the outbox in batches, one SMTP connection per batch, '
+        'retrying failed emails with an exponential backoff. Runs until interrupted, unless '
+        '--once is given. Several workers can run at the same time.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=settings.ORGANIZATIONS_INVITATION_BATCH_SIZE,
+            help='Number of emails sent over one connection.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Number of seconds to wait when no email is due.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Send the due emails and exit.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent_count, failed_count = deliver_invitation_emails(options['batch_size'])
+
+            if sent_count or failed_count:
+                self.stdout.write(f'Sent {sent_count} invitation emails, {failed_count} failed')
+
+            if sent_count + failed_count < options['batch_size']:
+                if options['once']:
+                    return
+
+                time.sleep(options['interval'])
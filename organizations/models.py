@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 import uuid
 
@@ -24,3 +25,38 @@ class MembershipInvitation(models.Model):
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE)
     email = models.EmailField()
     token = models.UUIDField(default=uuid.uuid4, editable=False)
+
+
+class InvitationEmail(models.Model):
+    """
+    Outbox entry of the email of an invitation, written in the transaction
+    that creates the invitation and sent by the 'deliver_invitations' command.
+
+    Failed emails are retried with an exponential backoff until they are sent
+    or ORGANIZATIONS_INVITATION_MAX_ATTEMPTS attempts have failed.
+    """
+    invitation = models.ForeignKey(MembershipInvitation, on_delete=models.CASCADE,
+                                   related_name='emails')
+    recipient = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveIntegerField(default=0)
+    sent_at = models.DateTimeField(blank=True, null=True)
+    last_error = models.TextField(blank=True, default='')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['next_attempt_at'], condition=models.Q(sent_at__isnull=True),
+                         name='invitation_email_pending_idx'),
+        ]
+
+    def __str__(self) -> str:
+        """
+        Returns a human-readable string representation of the InvitationEmail Model object.
+
+        Returns:
+            str: Containing the recipient and the subject.
+        """
+        return f'{self.recipient} {self.subject}'
@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .context import invalidate_membership, invalidate_organization
+from .models import Organization, Membership
+
+
+@receiver(post_save, sender=Organization)
+@receiver(post_delete, sender=Organization)
+def invalidate_cached_organization(sender, instance: Organization, **kwargs) -> None:
+    """Makes the requests load the organization again."""
+    invalidate_organization(instance.id)
+
+
+@receiver(post_save, sender=Membership)
+@receiver(post_delete, sender=Membership)
+def invalidate_cached_membership(sender, instance: Membership, **kwargs) -> None:
+    """Makes the requests of the member load their role again."""
+    invalidate_membership(instance.organization_id, instance.user_id)
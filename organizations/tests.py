@@ -1,3 +1,263 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from leads.models import Lead
+from .invitations import deliver_invitation_emails
+from .models import InvitationEmail, Organization, Membership, MembershipInvitation
+
+User = get_user_model()
+
+
+class OrganizationContextTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='ctx_owner')
+        cls.manager = User.objects.create(username='ctx_manager')
+        cls.outsider = User.objects.create(username='ctx_outsider')
+        cls.organization = Organization.objects.create(name='ctx_org')
+        Membership.objects.create(user=cls.owner, organization=cls.organization, role='owner')
+        Membership.objects.create(user=cls.manager, organization=cls.organization)
+        Lead.objects.create(
+            first_name='Ctx',
+            last_name='Lead',
+            order='Context',
+            price=100,
+            comment='',
+            organization=cls.organization,
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def login(self, user):
+        self.client.force_login(user)
+        self.client.force_authenticate(user)
+
+    def get_url(self, name, org_id=None):
+        return reverse(f'organizations:{name}', kwargs={'org_id': org_id or self.organization.id})
+
+    def assertOrganizationLoadedOnce(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        organization_queries = [
+            query for query in context.captured_queries
+            if 'FROM "organizations_organization"' in query['sql']
+        ]
+        self.assertEqual(len(organization_queries), 1, organization_queries)
+
+    def test_organization_loaded_once_per_request(self):
+        self.login(self.owner)
+
+        for name in (
+            'leads:lead_list',
+            'leads:lead_create',
+            'analytics:general_report',
+            'leads_api:lead_list_create',
+            'organization_detail',
+            'organization_invite',
+        ):
+            with self.subTest(name=name):
+                cache.clear()
+                self.assertOrganizationLoadedOnce(self.get_url(name))
+
+    def test_cached_context_makes_no_query(self):
+        self.login(self.owner)
+        url = self.get_url('leads_api:lead_list_create')
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([
+            query for query in context.captured_queries
+            if 'organizations_' in query['sql']
+        ])
+
+    def test_membership_changes_invalidate_cache(self):
+        self.login(self.manager)
+        invite_url = self.get_url('organization_invite')
+        self.assertEqual(self.client.get(invite_url).status_code, 403)
+
+        membership = Membership.objects.get(user=self.manager, organization=self.organization)
+        membership.role = 'owner'
+        membership.save()
+        self.assertEqual(self.client.get(invite_url).status_code, 200)
+
+        membership.delete()
+        self.assertEqual(self.client.get(invite_url).status_code, 403)
+
+        Membership.objects.create(user=self.manager, organization=self.organization)
+        self.assertEqual(self.client.get(self.get_url('leads:lead_list')).status_code, 200)
+
+    def test_organization_changes_invalidate_cache(self):
+        self.login(self.owner)
+        url = self.get_url('organization_detail')
+        self.client.get(url)
+
+        self.organization.name = 'ctx_renamed'
+        self.organization.save()
+        self.assertContains(self.client.get(url), 'ctx_renamed')
+
+        self.organization.delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_missing_organization(self):
+        self.login(self.owner)
+
+        for name in ('leads:lead_list', 'leads_api:lead_list_create', 'organization_invite'):
+            with self.subTest(name=name):
+                response = self.client.get(self.get_url(name, org_id=self.organization.id + 100))
+                self.assertEqual(response.status_code, 404)
+
+    def test_non_member_forbidden(self):
+        self.login(self.outsider)
+
+        for name in ('leads:lead_list', 'leads_api:lead_list_create', 'organization_invite'):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(self.get_url(name)).status_code, 403)
+
+    def test_non_owner_cannot_invite(self):
+        self.login(self.manager)
+        self.assertEqual(self.client.get(self.get_url('organization_invite')).status_code, 403)
+        self.assertEqual(self.client.get(self.get_url('organization_detail')).status_code, 200)
+
+
+class InvitationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = User.objects.create(username='inv_owner', email='owner@example.com')
+        cls.organization = Organization.objects.create(name='inv_org')
+        Membership.objects.create(user=cls.owner, organization=cls.organization, role='owner')
+        cls.users = [
+            User.objects.create(username=f'inv_user{i}', email=f'User{i}@example.com')
+            for i in range(5)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.owner)
+        self.url = reverse('organizations:organization_invite', kwargs={
+            'org_id': self.organization.id,
+        })
+
+    def invite(self, emails='', file=None):
+        data = {'emails': emails}
+
+        if file is not None:
+            data['file'] = SimpleUploadedFile('emails.csv', file.encode(), 'text/csv')
+
+        return self.client.post(self.url, data)
+
+    def test_invite_list(self):
+        response = self.invite('user0@example.com, User1@example.com\nuser0@example.com')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            sorted(MembershipInvitation.objects.values_list('email', flat=True)),
+            ['user0@example.com', 'user1@example.com'],
+        )
+        self.assertEqual(InvitationEmail.objects.count(), 2)
+        self.assertEqual(len(mail.outbox), 0)
+
+        email = InvitationEmail.objects.get(recipient='user1@example.com')
+        self.assertIn(str(email.invitation.token), email.body)
+
+    def test_invite_csv(self):
+        file = 'name,email\nUser 2,user2@example.com\nUser 3,User3@example.com\n'
+        response = self.invite(file=file)
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(MembershipInvitation.objects.count(), 2)
+
+    def test_lookup_query_count_does_not_depend_on_emails_count(self):
+        self.client.get(self.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.invite('user0@example.com')
+
+        MembershipInvitation.objects.all().delete()
+
+        with self.assertNumQueries(len(queries)):
+            self.invite(' '.join(user.email for user in self.users))
+
+        self.assertEqual(InvitationEmail.objects.count(), len(self.users))
+
+    def test_unknown_and_member_emails_rejected(self):
+        response = self.invite('user0@example.com nobody@example.com owner@example.com')
+        self.assertEqual(response.status_code, 200)
+        errors = response.context['form'].errors['emails']
+        self.assertIn('nobody@example.com', errors[0])
+        self.assertIn('owner@example.com', errors[1])
+        self.assertFalse(MembershipInvitation.objects.exists())
+
+    def test_invalid_emails_rejected(self):
+        for emails in ('', 'user0@example.com not-an-email'):
+            with self.subTest(emails=emails):
+                self.assertEqual(self.invite(emails).status_code, 200)
+                self.assertFalse(MembershipInvitation.objects.exists())
+
+    def test_reinvite_replaces_pending_invitation(self):
+        self.invite('user0@example.com')
+        old_invitation = MembershipInvitation.objects.get()
+        self.invite('user0@example.com')
+        self.assertNotEqual(MembershipInvitation.objects.get().token, old_invitation.token)
+        self.assertEqual(InvitationEmail.objects.count(), 1)
+
+    def test_deliver(self):
+        self.invite('user0@example.com user1@example.com')
+
+        with patch('django.core.mail.backends.locmem.EmailBackend.open') as open_connection:
+            self.assertEqual(deliver_invitation_emails(batch_size=10), (2, 0))
+
+        self.assertEqual(open_connection.call_count, 1)
+        self.assertEqual(sorted(message.to[0] for message in mail.outbox), [
+            'user0@example.com',
+            'user1@example.com',
+        ])
+        self.assertFalse(InvitationEmail.objects.filter(sent_at__isnull=True).exists())
+        self.assertEqual(deliver_invitation_emails(batch_size=10), (0, 0))
+
+    def test_failed_delivery_retried_later(self):
+        self.invite('user0@example.com')
+
+        with patch('django.core.mail.EmailMessage.send', side_effect=OSError('SMTP is down')):
+            self.assertEqual(deliver_invitation_emails(batch_size=10), (0, 1))
+
+        email = InvitationEmail.objects.get()
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP is down', email.last_error)
+        self.assertEqual(deliver_invitation_emails(batch_size=10), (0, 0))
+
+        InvitationEmail.objects.update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_invitation_emails(batch_size=10), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_crash_resends_only_unrecorded_email(self):
+        self.invite('user0@example.com user1@example.com')
+
+        # The worker dies while sending the second email.
+        with patch('django.core.mail.EmailMessage.send', side_effect=[1, KeyboardInterrupt]):
+            with self.assertRaises(KeyboardInterrupt):
+                deliver_invitation_emails(batch_size=10)
+
+        self.assertEqual(InvitationEmail.objects.filter(sent_at__isnull=True).count(), 1)
+        # The unrecorded email stays claimed until the claim timeout has passed.
+        self.assertEqual(deliver_invitation_emails(batch_size=10), (0, 0))
 
-# Create your tests here.
+        InvitationEmail.objects.filter(sent_at__isnull=True).update(next_attempt_at=timezone.now())
+        self.assertEqual(deliver_invitation_emails(batch_size=10), (1, 0))
+        self.assertEqual(len(mail.outbox), 1)
@@ -16,6 +16,8 @@ urlpatterns = [
     path('<int:org_id>/leads/', include(('leads.urls', 'leads'), namespace='leads')),
     path('<int:org_id>/analytics/', include(('analytics.urls', 'analytics'),
                                             namespace='analytics')),
+    path('<int:org_id>/analytics/api/', include(('analytics_api.urls', 'analytics_api'),
+                                                namespace='analytics_api')),
     path('<int:org_id>/leads-api/', include(('leads_api.urls', 'leads_api'),
                                             namespace='leads_api')),
 ]
@@ -5,11 +5,12 @@ from django.forms import Form
 from django.http import HttpResponseForbidden, HttpResponseRedirect
 from django.urls import reverse_lazy
 from django.shortcuts import get_object_or_404, render, redirect
-from django.core.mail import send_mail
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
 from django.views import generic
 from django.contrib.auth import get_user_model
 
+from . import invitations
+from .context import OrganizationContextMixin
 from .forms import OrganizationCreateForm, InvitationForm
 from .models import Organization, Membership, MembershipInvitation
 from leads.views import VerifyMembershipMixin
@@ -17,7 +18,7 @@ from leads.views import VerifyMembershipMixin
 User = get_user_model()
 
 
-class VerifyOwnershipMixin(PermissionRequiredMixin):
+class VerifyOwnershipMixin(OrganizationContextMixin, PermissionRequiredMixin):
     """Verifies that user has the necessary membership to access a resource."""
 
     def has_permission(self) -> bool:
@@ -27,14 +28,7 @@ class VerifyOwnershipMixin(PermissionRequiredMixin):
         Returns:
             bool: True if user has necessary membership, False otherwise.
         """
-        user = self.request.user
-        organization = get_object_or_404(Organization, id=self.kwargs['org_id'])
-        membership = Membership.objects.filter(user=user, organization=organization).first()
-
-        if membership.role == 'owner':
-            return True
-
-        return False
+        return self.get_organization_context().is_owner
 
     def handle_no_permission(self) -> HttpResponseForbidden:
         """
@@ -102,17 +96,15 @@ class OrganizationDetailView(VerifyMembershipMixin, generic.DetailView):
     def get_object(self, queryset: QuerySet[Any] | None = ...) -> Model:
         """Returns the object the view is displaying."""
 
-        org_id = self.kwargs['org_id']
-        return get_object_or_404(self.get_queryset(), id=org_id)
+        return self.get_organization_context().organization
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """Provides data for the context dictionary."""
 
         context = super().get_context_data(**kwargs)
         org_id = self.kwargs['org_id']
-        user = self.request.user
         memberships = Membership.objects.filter(organization=org_id)
-        user_is_owner = get_object_or_404(memberships, user=user).role == 'owner'
+        user_is_owner = self.get_organization_context().is_owner
         user_ids = memberships.values_list('user', flat=True)
         members = User.objects.filter(id__in=user_ids)
         context['members'] = members
@@ -132,52 +124,34 @@ class OrganizationInviteView(VerifyOwnershipMixin, generic.FormView):
 
         context = context = super().get_context_data(**kwargs)
         org_id = self.kwargs['org_id']
-        organization = Organization.objects.get(id=org_id)
+        organization = self.get_organization_context().organization
         context['org_id'] = org_id
         context['organization'] = organization
         return context
 
     def form_valid(self, form):
         """
-        Creates and sends the invitation to user if submitted form is valid
-        and all conditions are met.
+        Creates the invitations of the submitted emails and writes their emails
+        to the outbox if all the emails belong to users who are not members yet.
         """
-        email = form.cleaned_data['email']
-        organization = get_object_or_404(Organization, id=self.kwargs['org_id'])
+        emails = form.cleaned_data['emails']
+        organization = self.get_organization_context().organization
+        errors = invitations.get_invitation_errors(organization, emails)
 
-        try:
-            user = User.objects.get(email__iexact=email)
-        except User.DoesNotExist:
-            form.add_error('email', 'Пользователя с таким email не существует')
+        if errors:
+            for error in errors:
+                form.add_error('emails', error)
             return self.form_invalid(form)
 
-        try:
-            membership = Membership.objects.get(user=user, organization=organization)
-            form.add_error('email', 'Этот пользователь уже состоит в вашей организации')
-            return self.form_invalid(form)
-        except Membership.DoesNotExist:
-            # Deleting old invitation if exists
-            old_invitation = MembershipInvitation.objects.filter(
-                organization=organization,
-                email=email
-                ).first()
-            if old_invitation:
-                old_invitation.delete()
-
-            # Creating and sending new invitation
-            invitation = MembershipInvitation.objects.create(organization=organization, email=email)
-            link = self.request.build_absolute_uri(reverse_lazy(
-                "organizations:organization_join",
-                kwargs={"token": invitation.token}
-                ))
-            send_mail(
-                f'Organization {organization} invites you to join it',
-                f'To accept the invitation click the link below:\n\n{link}',
-                'noreply@example.com',
-                [email],
-                fail_silently=False,
-                )
-            return super().form_valid(form)
+        invitations.create_invitations(
+            organization,
+            emails,
+            lambda invitation: self.request.build_absolute_uri(reverse_lazy(
+                'organizations:organization_join',
+                kwargs={'token': invitation.token},
+            )),
+        )
+        return super().form_valid(form)
 
 
 class OrganizationJoinView(LoginRequiredMixin, generic.TemplateView):
@@ -3,14 +3,39 @@ ASGI config for pycrm project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+It is served by gunicorn with the uvicorn worker class, see the Dockerfile.
+Async views such as users_api's obtain_auth_token, the lead list and detail
+views and the analytics reports wait for password hashing or the database
+without holding a worker, so a slow report doesn't block a whole process.
+Every process serves at most ASGI_MAX_CONCURRENT_REQUESTS requests at once.
+The benchmark_servers command compares it with pycrm.wsgi under load.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
 
+import asyncio
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'pycrm.settings')
 
-application = get_asgi_application()
+
+class ConcurrencyLimiter:
+    """An ASGI application passing at most the given number of HTTP requests at once to the app."""
+
+    def __init__(self, app, limit: int):
+        self.app = app
+        self.semaphore = asyncio.Semaphore(limit)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        async with self.semaphore:
+            await self.app(scope, receive, send)
+
+
+application = ConcurrencyLimiter(get_asgi_application(), settings.ASGI_MAX_CONCURRENT_REQUESTS)
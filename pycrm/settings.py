@@ -23,6 +23,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
+    'django.contrib.postgres',
     'whitenoise.runserver_nostatic',
     'django.contrib.staticfiles',
     'jquery',
@@ -38,6 +39,8 @@ INSTALLED_APPS = [
     'rest_framework.authtoken',
     'leads_api',
     'users_api',
+    'analytics_api',
+    'jobs',
     'adminlte3',
 ]
 
@@ -89,6 +92,68 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# CACHE_BACKEND is one of 'locmem', 'file' or 'redis'. CACHE_LOCATION is the directory
+# for the file-based cache and the server URL (e.g. redis://localhost:6379/0) for redis,
+# which can be any Redis protocol compatible server. The analytics report cache, its
+# invalidation and its statistics must be shared by the web server, the workers and the
+# management commands, so deployments running more than one process need 'redis'
+# (docker-compose sets it). The locmem default only suits a single runserver process.
+
+CACHE_BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'redis': 'django.core.cache.backends.redis.RedisCache',
+}
+
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[os.getenv('CACHE_BACKEND', 'locmem')],
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Number of seconds the organizations and the roles of their members are kept in the
+# default cache to authorize requests. They are invalidated on change, but only in the
+# current process with the locmem backend, so other processes may use them until expiry.
+ORGANIZATIONS_CONTEXT_CACHE_TIMEOUT = int(os.getenv('ORGANIZATIONS_CONTEXT_CACHE_TIMEOUT', 300))
+
+# Number of seconds every process keeps the statuses loaded, and the number of seconds
+# between the checks of their version in the default cache. They are invalidated on change,
+# right away in the current process and at the next check in the other processes with a
+# shared cache. With the locmem backend other processes, including the workers, may use
+# stale status groups until expiry.
+STATUS_REGISTRY_TIMEOUT = int(os.getenv('STATUS_REGISTRY_TIMEOUT', 60))
+STATUS_REGISTRY_VERSION_CHECK_INTERVAL = int(
+    os.getenv('STATUS_REGISTRY_VERSION_CHECK_INTERVAL', 5)
+)
+
+ANALYTICS_CACHE_ALIAS = 'default'
+ANALYTICS_CACHE_TIMEOUT = int(os.getenv('ANALYTICS_CACHE_TIMEOUT', 60 * 60 * 24))
+
+# Largest number of days a period report can span, longer ranges are rejected.
+ANALYTICS_PERIOD_MAX_DAYS = int(os.getenv('ANALYTICS_PERIOD_MAX_DAYS', 3660))
+
+# Period reports spanning more days than this are exported to XLSX in the background
+# by the workers of the default jobs queue, and the number of seconds the exported files
+# are kept. Older ones are not served and are deleted by the delete_expired_exports command.
+ANALYTICS_EXPORT_BACKGROUND_DAYS = int(os.getenv('ANALYTICS_EXPORT_BACKGROUND_DAYS', 366))
+ANALYTICS_EXPORT_MAX_AGE = int(os.getenv('ANALYTICS_EXPORT_MAX_AGE', 60 * 60 * 24))
+
+# Number of leads per page of the lead list and the leads API, and the largest
+# number a client can request with the page_size parameter.
+LEADS_PAGE_SIZE = int(os.getenv('LEADS_PAGE_SIZE', 50))
+LEADS_MAX_PAGE_SIZE = int(os.getenv('LEADS_MAX_PAGE_SIZE', 500))
+
+# Largest number of operations accepted by the batch endpoint of the leads API.
+LEADS_API_MAX_BATCH_SIZE = int(os.getenv('LEADS_API_MAX_BATCH_SIZE', 1000))
+
+# Number of leads inserted per transaction by the lead import. Imports of uploaded
+# files are run in the background by the workers of the default jobs queue.
+LEADS_IMPORT_BATCH_SIZE = int(os.getenv('LEADS_IMPORT_BATCH_SIZE', 1000))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -108,9 +173,33 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
-PASSWORD_HASHERS = [
-    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
-]
+# PASSWORD_HASHER_PROFILE selects the hasher of new passwords, 'pbkdf2' or 'scrypt'.
+# The other hasher only verifies existing passwords, which are hashed again with
+# the selected one on the next login, as are PBKDF2 passwords hashed with a number
+# of iterations other than USERS_PBKDF2_ITERATIONS.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': [
+        'users.hashers.PBKDF2PasswordHasher',
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+    ],
+    'scrypt': [
+        'django.contrib.auth.hashers.ScryptPasswordHasher',
+        'users.hashers.PBKDF2PasswordHasher',
+    ],
+}
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[os.getenv('PASSWORD_HASHER_PROFILE', 'pbkdf2')]
+USERS_PBKDF2_ITERATIONS = int(os.getenv('USERS_PBKDF2_ITERATIONS', 600000))
+
+# Number of passwords hashed at the same time by the async token view of every process
+# served through ASGI. Requests hashing more passwords wait for their turn instead of
+# taking the CPU of other requests. Sync code hashes in its own thread.
+USERS_PASSWORD_HASHING_WORKERS = int(os.getenv('USERS_PASSWORD_HASHING_WORKERS', 2))
+
+# Number of requests served at the same time by every ASGI worker process. Every
+# request runs its sync code in a thread with a database connection of its own,
+# so requests beyond it wait for their turn rather than exhausting the connections
+# of the database. Keep the number of workers times this below max_connections.
+ASGI_MAX_CONCURRENT_REQUESTS = int(os.getenv('ASGI_MAX_CONCURRENT_REQUESTS', 20))
 
 
 LANGUAGE_CODE = 'en-us'
@@ -132,6 +221,11 @@ STATICFILES_DIRS = (
     os.path.join(BASE_DIR, 'static'),
 )
 
+# Uploaded and generated files
+
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_URL = '/media/'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
@@ -150,10 +244,41 @@ CRISPY_TEMPLATE_PACK = 'bootstrap4'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'users_api.authentication.CachedTokenAuthentication',
     ],
 }
 
+# Number of recently verified API tokens kept by every process, and the number of
+# seconds they are kept. Deleted tokens and the tokens of deactivated users or users
+# with a new password are forgotten right away by the current process, and by the other
+# processes within USERS_API_TOKEN_VERSION_CHECK_INTERVAL seconds with a shared cache
+# such as redis. With the locmem backend other processes keep them until expiry.
+USERS_API_TOKEN_CACHE_SIZE = int(os.getenv('USERS_API_TOKEN_CACHE_SIZE', 10000))
+USERS_API_TOKEN_CACHE_TIMEOUT = int(os.getenv('USERS_API_TOKEN_CACHE_TIMEOUT', 60))
+USERS_API_TOKEN_VERSION_CHECK_INTERVAL = int(
+    os.getenv('USERS_API_TOKEN_VERSION_CHECK_INTERVAL', 5)
+)
+
+# Largest number of emails invited at once, and the number of invitation emails sent
+# over one SMTP connection by the deliver_invitations command. Failed emails are retried
+# after ORGANIZATIONS_INVITATION_RETRY_DELAY seconds, doubled after every failed attempt.
+# Emails claimed by a worker are not sent by others for ORGANIZATIONS_INVITATION_CLAIM_TIMEOUT
+# seconds, which must exceed the time of sending a batch.
+ORGANIZATIONS_MAX_INVITATIONS = int(os.getenv('ORGANIZATIONS_MAX_INVITATIONS', 500))
+ORGANIZATIONS_INVITATION_BATCH_SIZE = int(os.getenv('ORGANIZATIONS_INVITATION_BATCH_SIZE', 100))
+ORGANIZATIONS_INVITATION_MAX_ATTEMPTS = int(os.getenv('ORGANIZATIONS_INVITATION_MAX_ATTEMPTS', 8))
+ORGANIZATIONS_INVITATION_RETRY_DELAY = int(os.getenv('ORGANIZATIONS_INVITATION_RETRY_DELAY', 60))
+ORGANIZATIONS_INVITATION_CLAIM_TIMEOUT = int(
+    os.getenv('ORGANIZATIONS_INVITATION_CLAIM_TIMEOUT', 600)
+)
+
+# Number of attempts of background jobs before they are left dead, the number of seconds
+# before the second attempt, doubled after every failed attempt, and the number of seconds
+# after which a running job is considered abandoned by its worker and queued again.
+JOBS_MAX_ATTEMPTS = int(os.getenv('JOBS_MAX_ATTEMPTS', 5))
+JOBS_RETRY_DELAY = int(os.getenv('JOBS_RETRY_DELAY', 30))
+JOBS_LEASE_TIMEOUT = int(os.getenv('JOBS_LEASE_TIMEOUT', 600))
+
 # Email Settings
 EMAIL_HOST = 'smtp.gmail.com'
 EMAIL_PORT = '587'
@@ -0,0 +1,15 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2 with the number of iterations of the USERS_PBKDF2_ITERATIONS setting.
+
+    Passwords hashed with another number of iterations still match and are
+    hashed again on the next login.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.USERS_PBKDF2_ITERATIONS
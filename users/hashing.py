@@ -0,0 +1,97 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import hashers, get_user_model
+from django.contrib.auth.base_user import AbstractBaseUser
+
+# Password hashing is CPU-bound, but hashlib releases the GIL while hashing,
+# so a few threads hash in parallel while leaving the other cores to requests.
+# Only the async functions use it: sync callers run in a request worker or
+# in a worker thread already, which would wait for the executor anyway.
+executor = ThreadPoolExecutor(
+    max_workers=settings.USERS_PASSWORD_HASHING_WORKERS,
+    thread_name_prefix='password-hashing',
+)
+
+
+def make_password(password: Optional[str]) -> str:
+    """Returns the hash of the password, computed in the calling thread."""
+    return hashers.make_password(password)
+
+
+def check_password(
+    password: Optional[str],
+    encoded: str,
+    setter: Optional[Callable[[str], None]] = None,
+) -> bool:
+    """
+    Returns True if the password matches the hash, checked in the calling thread.
+
+    As with django.contrib.auth.hashers.check_password, the setter is called
+    with the password if it matches a hash made with outdated parameters or
+    with a hasher other than the preferred one.
+    """
+    return hashers.check_password(password, encoded, setter)
+
+
+async def amake_password(password: Optional[str]) -> str:
+    """Returns the hash of the password without blocking the event loop, see make_password."""
+    return await asyncio.wrap_future(executor.submit(hashers.make_password, password))
+
+
+async def acheck_password(user: AbstractBaseUser, password: Optional[str]) -> bool:
+    """
+    Returns True if the password of the user matches, without blocking the event loop.
+
+    Passwords hashed with outdated parameters or with a hasher other than
+    the preferred one are hashed again and saved, as User.check_password does.
+    """
+    must_update = []
+    matches = await asyncio.wrap_future(executor.submit(
+        hashers.check_password,
+        password,
+        user.password,
+        must_update.append,
+    ))
+
+    if matches and must_update:
+        user.password = await amake_password(password)
+        await sync_to_async(user.save)(update_fields=['password'])
+
+    return matches
+
+
+def get_user(username: str) -> Optional[AbstractBaseUser]:
+    """Returns the user with the given username, None if there is none."""
+    User = get_user_model()
+    return User._default_manager.filter(**{User.USERNAME_FIELD: username}).first()
+
+
+async def aauthenticate(
+    username: Optional[str],
+    password: Optional[str],
+) -> Optional[AbstractBaseUser]:
+    """
+    Returns the active user with the given credentials, None if they are invalid,
+    without blocking the event loop while the password is checked.
+
+    This mirrors ModelBackend, the only authentication backend of the project,
+    including hashing the password when the user doesn't exist, so that the
+    response time doesn't tell whether a username exists.
+    """
+    if not username or not password:
+        return None
+
+    user = await sync_to_async(get_user)(username)
+
+    if user is None:
+        await amake_password(password)
+        return None
+
+    if await acheck_password(user, password) and user.is_active:
+        return user
+
+    return None
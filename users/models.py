@@ -1,5 +1,24 @@
 from django.contrib.auth.models import AbstractUser
 
+from . import hashing
+
 
 class User(AbstractUser):
-    pass
+
+    def set_password(self, raw_password):
+        """Sets the hash of the password."""
+        self.password = hashing.make_password(raw_password)
+        self._password = raw_password
+
+    def check_password(self, raw_password):
+        """
+        Returns True if the password matches. Passwords hashed with outdated
+        parameters are hashed again and saved.
+        """
+        def setter(raw_password):
+            self.set_password(raw_password)
+            # Password hash upgrades shouldn't be considered password changes.
+            self._password = None
+            self.save(update_fields=['password'])
+
+        return hashing.check_password(raw_password, self.password, setter)
@@ -1,3 +1,52 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.test import TestCase, override_settings
+from django.urls import reverse
 
-# Create your tests here.
+User = get_user_model()
+
+
+@override_settings(USERS_PBKDF2_ITERATIONS=1000)
+class PasswordHashingTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='HashUser', password='correct-horse')
+
+    def get_hash_parameters(self):
+        self.user.refresh_from_db()
+        return identify_hasher(self.user.password).decode(self.user.password)
+
+    def login(self, password='correct-horse'):
+        return self.client.post(reverse('users:login'), {
+            'username': 'HashUser',
+            'password': password,
+        })
+
+    def test_login(self):
+        self.assertEqual(self.login().status_code, 302)
+        self.assertEqual(self.login('wrong').status_code, 200)
+
+    def test_rehash_on_login_with_new_iterations(self):
+        with self.settings(USERS_PBKDF2_ITERATIONS=2000):
+            self.assertEqual(self.login().status_code, 302)
+
+        self.assertEqual(self.get_hash_parameters()['iterations'], 2000)
+
+    def test_rehash_on_login_with_new_profile(self):
+        with self.settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.ScryptPasswordHasher',
+            'users.hashers.PBKDF2PasswordHasher',
+        ]):
+            self.assertEqual(self.login().status_code, 302)
+            self.assertEqual(self.get_hash_parameters()['algorithm'], 'scrypt')
+
+        self.assertEqual(self.login().status_code, 302)
+
+    def test_no_rehash_on_failed_login(self):
+        password = self.user.password
+
+        with self.settings(USERS_PBKDF2_ITERATIONS=2000):
+            self.login('wrong')
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.password, password)
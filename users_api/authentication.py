@@ -0,0 +1,145 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+USER_VERSION_KEY = 'users_api:token_cache:user:{user_id}:version'
+
+
+class TokenCache:
+    """
+    Process-local LRU of recently verified tokens and their users.
+
+    Entries expire after USERS_API_TOKEN_CACHE_TIMEOUT seconds. The tokens
+    of a user are invalidated through a version of the user stored in the
+    default cache, which is bumped whenever a token of the user is deleted
+    or the user is deactivated or changes password. The current process
+    forgets them right away. Other processes check the version of a cached
+    token at most every USERS_API_TOKEN_VERSION_CHECK_INTERVAL seconds, so
+    that most requests make no round trip to the cache, and only see it
+    with a shared cache such as redis, otherwise they keep the tokens until
+    they expire.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_version(self, user_id: int) -> int:
+        """Returns the version of the user's tokens, initializing it if missing."""
+        key = USER_VERSION_KEY.format(user_id=user_id)
+        version = cache.get(key)
+
+        if version is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            version = cache.get(key)
+
+        return version
+
+    def get(self, key: str) -> Optional[Token]:
+        """
+        Returns the token with its user, None if the token is not cached,
+        has expired or its user's tokens were invalidated since it was cached.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                return None
+
+            token, expires_at, version, checked_at = entry
+
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+
+        if now - checked_at < settings.USERS_API_TOKEN_VERSION_CHECK_INTERVAL:
+            return token
+
+        if self.get_version(token.user_id) != version:
+            with self._lock:
+                self._entries.pop(key, None)
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = (token, expires_at, version, now)
+
+        return token
+
+    def set(self, token: Token, version: int) -> None:
+        """
+        Caches the token with its user and the version of the user's tokens,
+        evicting the least recently used tokens.
+
+        The version is read after the token is loaded, as the user isn't known
+        before. A change of the user committed in between is thus only noticed
+        once the token expires.
+        """
+        with self._lock:
+            now = time.monotonic()
+            expires_at = now + settings.USERS_API_TOKEN_CACHE_TIMEOUT
+            self._entries[token.key] = (token, expires_at, version, now)
+            self._entries.move_to_end(token.key)
+
+            while len(self._entries) > settings.USERS_API_TOKEN_CACHE_SIZE:
+                self._entries.popitem(last=False)
+
+    def forget_user(self, user_id: int) -> None:
+        """Removes the user's tokens from the cache of the current process."""
+        with self._lock:
+            keys = [key for key, entry in self._entries.items() if entry[0].user_id == user_id]
+
+            for key in keys:
+                del self._entries[key]
+
+    def invalidate_user(self, user_id: int) -> None:
+        """
+        Makes every process forget the user's tokens, right away and once again
+        when the current transaction is committed, so that tokens loaded by
+        another process before the commit are not kept afterwards.
+        """
+        self.forget_user(user_id)
+        self._bump_version(user_id)
+        transaction.on_commit(lambda: self._bump_version(user_id))
+
+    def _bump_version(self, user_id: int) -> None:
+        """Increments the version of the user's tokens stored in the default cache."""
+        key = USER_VERSION_KEY.format(user_id=user_id)
+
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+token_cache = TokenCache()
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps recently verified tokens in token_cache,
+    so that repeated calls with the same token make no query.
+    """
+
+    def authenticate_credentials(self, key: str) -> tuple[object, Token]:
+        """Returns the user of the token and the token, from the cache if possible."""
+        token = token_cache.get(key)
+
+        if token is None:
+            _, token = super().authenticate_credentials(key)
+            token_cache.set(token, token_cache.get_version(token.user_id))
+
+        # Requests get their own copy, so that attributes set on the user don't leak.
+        return copy.copy(token.user), token
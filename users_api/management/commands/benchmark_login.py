@@ -0,0 +1,97 @@
+import asyncio
+import statistics
+import time
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.authtoken.views import obtain_auth_token
+from rest_framework.test import APIRequestFactory
+
+from users_api.views import ObtainAuthTokenView
+
+User = get_user_model()
+
+PROBE_INTERVAL = 0.01
+
+
+class Command(BaseCommand):
+    help = (
+        'Compares the login throughput of the token endpoint of rest_framework.authtoken, '
+        'run as ASGI runs sync views, with the async ObtainAuthTokenView, and the latency '
+        'of a trivial sync view served during the login burst. A temporary user is created '
+        'with the configured password hasher and deleted afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--logins', type=int, default=50, help='Number of logins.')
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=10,
+            help='Number of logins in progress at the same time.',
+        )
+
+    async def burst(self, view, credentials, login_count, concurrency):
+        """
+        Runs the logins and a probe calling a trivial sync view every PROBE_INTERVAL.
+
+        Returns:
+            tuple: The duration of the burst in seconds and the probe latencies.
+        """
+        factory = APIRequestFactory()
+        semaphore = asyncio.Semaphore(concurrency)
+        done = asyncio.Event()
+        latencies = []
+
+        async def login():
+            async with semaphore:
+                response = await view(factory.post('/', credentials, format='json'))
+
+            if response.status_code != 200:
+                raise CommandError(f'The login failed with status {response.status_code}')
+
+        async def probe():
+            while not done.is_set():
+                started_at = time.perf_counter()
+                await sync_to_async(lambda: None)()
+                latencies.append(time.perf_counter() - started_at)
+                await asyncio.sleep(PROBE_INTERVAL)
+
+        probe_task = asyncio.create_task(probe())
+        started_at = time.perf_counter()
+        await asyncio.gather(*(login() for _ in range(login_count)))
+        elapsed = time.perf_counter() - started_at
+        done.set()
+        await probe_task
+        return elapsed, latencies
+
+    def handle(self, *args, **options):
+        password = uuid.uuid4().hex
+        username = f'benchmark-{uuid.uuid4().hex[:8]}'
+        user = User.objects.create_user(username=username, password=password)
+        credentials = {'username': user.username, 'password': password}
+        views = (
+            ('rest_framework obtain_auth_token', sync_to_async(obtain_auth_token)),
+            ('ObtainAuthTokenView', ObtainAuthTokenView.as_view()),
+        )
+        self.stdout.write(
+            f'{"View":<34} {"logins/s":>9} {"probe p50":>10} {"probe max":>10}'
+        )
+
+        try:
+            for name, view in views:
+                elapsed, latencies = asyncio.run(self.burst(
+                    view,
+                    credentials,
+                    options['logins'],
+                    options['concurrency'],
+                ))
+                self.stdout.write(
+                    f'{name:<34} {options["logins"] / elapsed:>9.1f} '
+                    f'{statistics.median(latencies) * 1000:>8.1f}ms '
+                    f'{max(latencies) * 1000:>8.1f}ms'
+                )
+        finally:
+            user.delete()
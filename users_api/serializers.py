@@ -9,3 +9,7 @@ class UserSerializer(serializers.ModelSerializer):
         model = User
         fields = ['username', 'email', 'first_name', 'last_name', 'password', ]
         extra_kwargs = {'password': {'write_only': True}, }
+
+    def create(self, validated_data):
+        """Creates the user with the password hashed once, never saving the raw password."""
+        return User.objects.create_user(**validated_data)
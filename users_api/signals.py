@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import pre_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+
+User = get_user_model()
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance: Token, **kwargs) -> None:
+    """Makes every process stop accepting the deleted token."""
+    token_cache.invalidate_user(instance.user_id)
+
+
+@receiver(pre_save, sender=User)
+def invalidate_changed_user_tokens(sender, instance: User, update_fields=None, **kwargs) -> None:
+    """
+    Makes every process load the user's tokens again when the user is activated,
+    deactivated or changes password. Logins and password hash upgrades, which
+    save last_login and password without setting a new password, are ignored.
+    """
+    if instance._state.adding:
+        return
+
+    if instance._password is not None and (update_fields is None or 'password' in update_fields):
+        token_cache.invalidate_user(instance.pk)
+        return
+
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+
+    was_active = User.objects.filter(pk=instance.pk).values_list('is_active', flat=True).first()
+
+    if was_active is not None and was_active != instance.is_active:
+        token_cache.invalidate_user(instance.pk)
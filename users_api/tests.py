@@ -1,3 +1,183 @@
-from django.test import TestCase
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from leads.models import Lead
+from organizations.models import Organization, Membership
+from .authentication import USER_VERSION_KEY
+
+User = get_user_model()
+
+
+class CachedTokenAuthenticationTest(TestCase):
+    client_class = APIClient
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create(username='TokenUser')
+        cls.organization = Organization.objects.create(name='TokenOrg')
+        Membership.objects.create(user=cls.user, organization=cls.organization, role='owner')
+        cls.lead = Lead.objects.create(
+            first_name='Token',
+            last_name='Lead',
+            order='Token order',
+            price=100,
+            comment='',
+            organization=cls.organization,
+        )
+
+    def setUp(self):
+        self.token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.url = reverse('organizations:leads_api:lead_retrieve_update_destroy', kwargs={
+            'org_id': self.organization.id,
+            'pk': self.lead.id,
+        })
+
+    def get_auth_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        return [
+            query for query in context.captured_queries
+            if 'authtoken_token' in query['sql'] or 'FROM "users_user"' in query['sql']
+        ]
+
+    def test_cached_token_makes_no_query(self):
+        self.assertEqual(len(self.get_auth_queries()), 1)
+        self.assertEqual(self.get_auth_queries(), [])
+
+    def test_deleted_token_rejected(self):
+        self.client.get(self.url)
+        self.token.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_deactivated_user_rejected(self):
+        self.client.get(self.url)
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+
+    def test_new_password_rejects_cached_token(self):
+        self.client.get(self.url)
+        self.user.set_password('new-password')
+        self.user.save()
+        self.assertEqual(len(self.get_auth_queries()), 1)
+
+    def test_login_keeps_cached_tokens(self):
+        self.client.get(self.url)
+        self.user.save(update_fields=['last_login'])
+        self.assertEqual(self.get_auth_queries(), [])
+
+    def test_other_changes_keep_cached_tokens(self):
+        self.client.get(self.url)
+        self.user.first_name = 'Renamed'
+        self.user.save()
+        # A password hash upgrade saves the password without setting a new one.
+        self.user.save(update_fields=['password'])
+        User.objects.create(username='OtherTokenUser').delete()
+        self.assertEqual(self.get_auth_queries(), [])
+
+    def test_other_user_deactivated_keeps_cached_tokens(self):
+        other_user = User.objects.create(username='OtherTokenUser')
+        Token.objects.create(user=other_user)
+        self.client.get(self.url)
+        other_user.is_active = False
+        other_user.save()
+        other_user.auth_token.delete()
+        self.assertEqual(self.get_auth_queries(), [])
+
+    def test_version_bumped_by_other_process_checked_after_interval(self):
+        self.client.get(self.url)
+        cache.incr(USER_VERSION_KEY.format(user_id=self.user.id))
+        self.assertEqual(self.get_auth_queries(), [])
+
+        with override_settings(USERS_API_TOKEN_VERSION_CHECK_INTERVAL=0):
+            self.assertEqual(len(self.get_auth_queries()), 1)
+
+    @override_settings(USERS_API_TOKEN_CACHE_SIZE=1)
+    def test_least_recently_used_token_evicted(self):
+        other_user = User.objects.create(username='OtherTokenUser')
+        other_token = Token.objects.create(user=other_user)
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {other_token.key}')
+        self.client.get(self.url)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(len(self.get_auth_queries()), 1)
+
+    @override_settings(USERS_API_TOKEN_CACHE_TIMEOUT=0)
+    def test_expired_token_loaded_again(self):
+        self.client.get(self.url)
+        self.assertEqual(len(self.get_auth_queries()), 1)
+
+
+@override_settings(USERS_PBKDF2_ITERATIONS=1000)
+class ObtainAuthTokenTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='AsyncUser', password='correct-horse')
+        self.url = reverse('users_api:get_auth_token')
+        # API clients post without CSRF tokens.
+        self.client = Client(enforce_csrf_checks=True)
+        self.credentials = {'username': 'AsyncUser', 'password': 'correct-horse'}
+
+    def test_token_returned(self):
+        response = self.client.post(self.url, self.credentials)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'token': Token.objects.get(user=self.user).key})
+
+        response = self.client.post(
+            self.url,
+            self.credentials,
+            content_type='application/json',
+        )
+        self.assertEqual(response.json(), {'token': Token.objects.get(user=self.user).key})
+
+    def test_invalid_credentials(self):
+        for data in (
+            {'username': 'AsyncUser', 'password': 'wrong'},
+            {'username': 'NoSuchUser', 'password': 'correct-horse'},
+        ):
+            with self.subTest(data=data):
+                response = self.client.post(self.url, data)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('non_field_errors', response.json())
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.post(self.url, self.credentials)
+        self.assertEqual(response.status_code, 400)
+
+    def test_missing_fields(self):
+        response = self.client.post(self.url, {'username': 'AsyncUser'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()), ['password'])
+
+    def test_rehash_on_login(self):
+        with self.settings(USERS_PBKDF2_ITERATIONS=2000):
+            self.client.post(self.url, self.credentials)
+
+        self.user.refresh_from_db()
+        self.assertEqual(identify_hasher(self.user.password).decode(
+            self.user.password)['iterations'], 2000)
+
+    def test_signup_hashes_password_once(self):
+        # The username uniqueness check and the insert, with the hashed password.
+        with self.assertNumQueries(2):
+            response = self.client.post(reverse('users_api:user_signup'), {
+                'username': 'SignupUser',
+                'email': 'signup@example.com',
+                'password': 'correct-horse',
+            })
+
+        self.assertEqual(response.status_code, 201)
+        user = User.objects.get(username='SignupUser')
+        self.assertEqual(identify_hasher(user.password).algorithm, 'pbkdf2_sha256')
+        self.assertTrue(user.check_password('correct-horse'))